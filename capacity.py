@@ -10,59 +10,1265 @@ app = marimo.App(
 
 
 @app.cell(hide_code=True)
-async def _():
+def install_packages():
     # Only install packages in WebAssembly environment
+    import asyncio as _asyncio
+    from time import perf_counter as _perf_counter
+
+    install_times = {}
     try:
         import micropip
 
-        # Install required packages
-        packages = [
-            "polars",
-            "altair",
-            "numpy",
-            "pyarrow"
-        ]
-
-        for pkg in packages:
-            print(f"Installing {pkg}...")
+        async def _install(pkg):
+            start = _perf_counter()
             await micropip.install(pkg)
+            install_times[pkg] = _perf_counter() - start
 
-        print("✅ All packages installed.")
+        # Install all packages concurrently in the background; the text slides only need
+        # marimo, and the chart packages cell awaits this just before the first chart slide
+        packages_ready = _asyncio.ensure_future(
+            _asyncio.gather(*(_install(pkg) for pkg in ["polars", "altair", "numpy"]))
+        )
     except ImportError:
         # Running locally, packages should already be installed
         print("Running in local mode, skipping micropip installation")
-    return
+        packages_ready = None
+    return install_times, packages_ready
 
 
 @app.cell(hide_code=True)
-def _():
-    # Import required libraries
+def imports():
+    # Import required libraries (standard library and marimo; chart packages load later)
     import marimo as mo
-    import altair as alt
-    import polars as pl
-    import numpy as np
-    import math
-    import warnings
-    warnings.filterwarnings("ignore", message=".*narwhals.*is_pandas_dataframe.*")
-    return alt, math, mo, np, pl
+    import heapq
+    from pathlib import Path
+    from typing import NamedTuple
+    return NamedTuple, Path, heapq, mo
+
+
+@app.cell(hide_code=True)
+def queueing_engine(NamedTuple, np):
+    # Queueing engine — vectorized M/M/s metrics shared by all slides
+    class QueueMetrics(NamedTuple):
+        """M/M/s steady-state metrics; times are in the units of 1/λ (hours here)."""
+        rho: np.ndarray
+        p_wait: np.ndarray
+        L: np.ndarray
+        Lq: np.ndarray
+        W: np.ndarray
+        Wq: np.ndarray
+
+    def _log_gamma(x):
+        """log Γ(x) for x > 0: Stirling's series at x + 8, shifted back with Γ(x + 1) = xΓ(x)."""
+        z = x + 8
+        z2 = z * z
+        series = (1 / 12 - (1 / 360 - (1 / 1260 - 1 / (1680 * z2)) / z2) / z2) / z
+        stirling = (z - 0.5) * np.log(z) - z + 0.5 * np.log(2 * np.pi) + series
+        return stirling - np.log(x * (x + 1) * (x + 2) * (x + 3)) - np.log((x + 4) * (x + 5) * (x + 6) * (x + 7))
+
+    def log_incomplete_gamma(x, y, tol=1e-15, max_iter=100_000, upper_only=False):
+        """(log γ(x, y), log Γ(x, y)), both scaled by e^y·y^(-x), for x > 0 and y ≥ 0.
+
+        For y < x + 1 the lower function comes from the series
+        e^y·y^(-x)·γ(x, y) = Σ_k y^k / (x(x + 1)···(x + k)), whose terms only shrink;
+        otherwise the upper one comes from Lentz's continued fraction. The other one
+        is e^g·Γ(x) minus it, with g = y − x·log(y), formed as g + log Γ(x) + log(1 − ·),
+        so neither overflows where e^y·y^(-x) would. With upper_only=True the series
+        stops once its terms no longer change the upper function, and the lower one is
+        then only approximate.
+        """
+        x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+        shape = x.shape
+        x, y = x.ravel(), y.ravel()
+        lower, upper = np.empty(x.size), np.empty(x.size)
+        with np.errstate(divide="ignore"):
+            log_full = y - x * np.log(y) + _log_gamma(x)  # log of e^y·y^(-x)·Γ(x)
+
+        # Series: the working arrays shrink to the unconverged entries every 8 terms
+        idx = np.flatnonzero(y < x + 1)
+        xs, ys, pos = x[idx], y[idx], idx
+        term, total = np.ones(idx.size), np.ones(idx.size)
+        # The series reaches x·e^g·Γ(x), so with upper_only that bounds the digits needed
+        with np.errstate(over="ignore"):
+            floor = xs * np.exp(log_full[idx]) if upper_only else np.zeros(idx.size)
+        series = np.empty(x.size)
+        k = 0
+        while pos.size:
+            ratio = np.empty(pos.size)
+            for _ in range(8):
+                k += 1
+                np.add(xs, k, out=ratio)
+                np.divide(ys, ratio, out=ratio)
+                term *= ratio
+                total += term
+            done = (term <= tol * np.maximum(total, floor)) | (k >= max_iter)
+            series[pos[done]] = total[done] / xs[done]
+            keep = ~done
+            xs, ys, pos, term, total, floor = xs[keep], ys[keep], pos[keep], term[keep], total[keep], floor[keep]
+        lower[idx] = np.log(series[idx])
+        upper[idx] = log_full[idx] + np.log1p(-series[idx] * np.exp(-log_full[idx]))
+
+        # Continued fraction (modified Lentz), shrinking the same way
+        idx = np.flatnonzero(y >= x + 1)
+        tiny = 1e-300
+        xs, pos = x[idx], idx
+        b = y[idx] + 1 - xs
+        c = np.full(idx.size, 1 / tiny)
+        d = 1 / b
+        h = d.copy()
+        fraction = np.empty(x.size)
+        k = 0
+        while pos.size:
+            k += 1
+            an = -k * (k - xs)
+            b += 2
+            d = an * d + b
+            d = 1 / np.where(np.abs(d) < tiny, tiny, d)
+            c = b + an / c
+            c = np.where(np.abs(c) < tiny, tiny, c)
+            step = d * c
+            h *= step
+            done = (np.abs(step - 1) <= tol) | (k >= max_iter)
+            if done.any():
+                fraction[pos[done]] = h[done]
+                keep = ~done
+                xs, pos, b, c, d, h = xs[keep], pos[keep], b[keep], c[keep], d[keep], h[keep]
+        upper[idx] = np.log(fraction[idx])
+        lower[idx] = log_full[idx] + np.log1p(-fraction[idx] * np.exp(-log_full[idx]))
+        return lower.reshape(shape), upper.reshape(shape)
+
+    def erlang_b(s, a, recursion_max_s=64):
+        """Erlang-B blocking probability B(s, a) for offered load a = λ/μ.
+
+        Up to s = recursion_max_s it uses the recursion B(k) = a·B(k-1) / (k + a·B(k-1)),
+        which stays in [0, 1] and never forms a**s or s!; scenarios are sorted by s so
+        step k only touches those with s ≥ k. Larger s use the closed form
+        1/B = a·e^a·a^(-(s+1))·Γ(s + 1, a) in log space, whose cost does not grow with s.
+        """
+        s, a = np.broadcast_arrays(np.asarray(s, dtype=np.int64), np.asarray(a, dtype=float))
+        shape = s.shape
+        s, a = s.ravel(), a.ravel()
+        out = np.empty(s.size)
+        large = s > recursion_max_s
+        small = slice(None)
+        if large.any():
+            closed = np.flatnonzero(large & (a > 0))
+            out[large & (a <= 0)] = 0.0
+            out[closed] = np.exp(-np.log(a[closed]) - log_incomplete_gamma(s[closed] + 1, a[closed], upper_only=True)[1])
+            small = np.flatnonzero(~large)
+
+        s_small, a_small = s[small], a[small]
+        order = np.argsort(-s_small, kind="stable")
+        a_sorted = a_small[order]
+        b = np.ones(s_small.size)
+        max_s = int(s_small.max()) if s_small.size else 0
+        # active[k-1] = number of scenarios with s >= k (a prefix of the sorted order)
+        active = np.searchsorted(-s_small[order], -np.arange(1, max_s + 1), side="right")
+        for k in range(1, max_s + 1):
+            n = active[k - 1]
+            ab = a_sorted[:n] * b[:n]
+            b[:n] = ab / (k + ab)
+        out_small = np.empty_like(b)
+        out_small[order] = b
+        out[small] = out_small
+        return out.reshape(shape)
+
+    def erlang_c(s, rho):
+        """Erlang-C probability of waiting C(s, ρ) for an M/M/s queue (1 if ρ ≥ 1)."""
+        s, rho = np.broadcast_arrays(np.asarray(s, dtype=np.int64), np.asarray(rho, dtype=float))
+        stable = rho < 1
+        a = np.where(stable, s * rho, 0.0)
+        b = erlang_b(s, a)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            c = b / (1 - rho * (1 - b))
+        return np.where(stable, c, 1.0)
+
+    def mms_metrics(lam, mu, s):
+        """Vectorized M/M/s metrics for broadcastable arrays of λ, μ and s.
+
+        Unstable scenarios (ρ ≥ 1) get P(wait) = 1 and infinite L, Lq, W, Wq.
+        """
+        lam, mu, s = np.broadcast_arrays(
+            np.asarray(lam, dtype=float), np.asarray(mu, dtype=float), np.asarray(s, dtype=np.int64)
+        )
+        capacity = s * mu
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rho = np.where(capacity > 0, lam / capacity, np.inf)
+            stable = rho < 1
+            p_wait = erlang_c(s, rho)
+            # Wq = C / (sμ - λ) avoids dividing by λ, so λ = 0 gives Wq = 0
+            Wq = np.where(stable, p_wait / (capacity - lam), np.inf)
+            W = np.where(stable, Wq + 1 / mu, np.inf)
+            Lq = np.where(stable, lam * Wq, np.inf)
+            L = np.where(stable, Lq + lam / mu, np.inf)
+        return QueueMetrics(rho, p_wait, L, Lq, W, Wq)
+
+    def ggs_metrics(lam, mu, s, cv_s=1.0, cv_a=1.0):
+        """Approximate G/G/s metrics (Allen–Cunneen; Kingman's formula for s = 1).
+
+        Scales the M/M/s queue by (CVa² + CVs²)/2, so CVa = CVs = 1 is exact M/M/s.
+        P(wait) is reported from the M/M/s model.
+        """
+        lam, mu = np.asarray(lam, dtype=float), np.asarray(mu, dtype=float)
+        m = mms_metrics(lam, mu, s)
+        factor = (np.asarray(cv_a, dtype=float) ** 2 + np.asarray(cv_s, dtype=float) ** 2) / 2
+        stable = m.rho < 1
+        Wq = np.where(stable, m.Wq * factor, np.inf)
+        Lq = np.where(stable, m.Lq * factor, np.inf)
+        L = np.where(stable, Lq + lam / mu, np.inf)
+        W = np.where(stable, Wq + 1 / mu, np.inf)
+        return QueueMetrics(m.rho, m.p_wait, L, Lq, W, Wq)
+    return QueueMetrics, erlang_b, erlang_c, ggs_metrics, log_incomplete_gamma, mms_metrics
+
+
+@app.cell(hide_code=True)
+def priority_engine(NamedTuple, erlang_c, mms_metrics, np):
+    # Priority engine — per-class waits when some customers are served first (fast lanes)
+    class PriorityMetrics(NamedTuple):
+        """Per-class priority-queue metrics; the last axis runs over classes, highest priority first."""
+        rho: np.ndarray  # σ_k: load of class k and all classes above it
+        Wq: np.ndarray
+        W: np.ndarray
+
+    def priority_mms_metrics(lam, mu, s, preemptive=False):
+        """Vectorized M/M/s priority metrics; lam[..., k] is the arrival rate of class k.
+
+        All classes share one exponential service rate; μ and s broadcast against
+        lam's leading axes, so many class splits are evaluated at once. Without
+        preemption, Cobham's formula gives Wq_k = C(s, ρ) / (sμ(1 - σ_{k-1})(1 - σ_k)).
+        With preemption, classes 0..k form an M/M/s queue of their own, and class k
+        accounts for what its arrivals add to that queue's L. Either way the λ-weighted
+        mean of Wq equals the FCFS M/M/s wait. Classes with σ_k ≥ 1 get infinite
+        waits while the classes above them stay finite; under preemption a class
+        with λ = 0 has no defined wait (NaN).
+        """
+        lam = np.asarray(lam, dtype=float)
+        lam, mu, s = np.broadcast_arrays(
+            lam, np.asarray(mu, dtype=float)[..., None], np.asarray(s, dtype=np.int64)[..., None]
+        )
+        cum_lam = np.cumsum(lam, axis=-1)
+        capacity = s * mu
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sigma = cum_lam / capacity
+            stable = sigma < 1
+            if preemptive:
+                L = mms_metrics(cum_lam, mu, s).L
+                L_above = np.concatenate([np.zeros_like(L[..., :1]), L[..., :-1]], axis=-1)
+                W = np.where(stable, (L - L_above) / lam, np.inf)
+                Wq = W - 1 / mu
+            else:
+                sigma_above = sigma - lam / capacity
+                p_wait = erlang_c(s[..., -1:], sigma[..., -1:])
+                Wq = np.where(stable, p_wait / (capacity * (1 - sigma_above) * (1 - sigma)), np.inf)
+                W = Wq + 1 / mu
+        return PriorityMetrics(sigma, Wq, W)
+
+    def priority_mg1_metrics(lam, mu, cv_s=1.0, preemptive=False):
+        """Vectorized M/G/1 priority metrics with a service rate and CV per class.
+
+        lam, mu and cv_s broadcast together, the last axis over classes. With the
+        mean residual work R_k = Σ_{j≤k} λ_j E[S_j²] / 2, non-preemptive waits are
+        Wq_k = R_K / ((1 - σ_{k-1})(1 - σ_k)) over all K classes; preemptive-resume
+        uses R_k and adds the interruptions of class k's own service by higher
+        classes, σ_{k-1} / (μ_k(1 - σ_{k-1})).
+        """
+        lam, mu, cv_s = np.broadcast_arrays(
+            np.asarray(lam, dtype=float), np.asarray(mu, dtype=float), np.asarray(cv_s, dtype=float)
+        )
+        sigma = np.cumsum(lam / mu, axis=-1)
+        sigma_above = sigma - lam / mu
+        residual = np.cumsum(lam * (1 + cv_s ** 2) / mu ** 2, axis=-1) / 2
+        stable = sigma < 1
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if preemptive:
+                Wq = residual / ((1 - sigma_above) * (1 - sigma)) + sigma_above / (mu * (1 - sigma_above))
+            else:
+                Wq = residual[..., -1:] / ((1 - sigma_above) * (1 - sigma))
+            Wq = np.where(stable, Wq, np.inf)
+        return PriorityMetrics(sigma, Wq, Wq + 1 / mu)
+    return PriorityMetrics, priority_mg1_metrics, priority_mms_metrics
+
+
+@app.cell(hide_code=True)
+def abandonment_engine(NamedTuple, erlang_b, log_incomplete_gamma, mms_metrics, np):
+    # Abandonment engine — Erlang-A (M/M/s+M): impatient customers keep overloaded queues finite
+    class AbandonmentMetrics(NamedTuple):
+        """M/M/s+M steady-state metrics; times are in the units of 1/λ (hours here)."""
+        rho: np.ndarray
+        p_wait: np.ndarray
+        p_abandon: np.ndarray
+        Lq: np.ndarray
+        Wq: np.ndarray
+        throughput: np.ndarray
+
+    def log_erlang_a_ratio(x, y):
+        """log A(x, y) with A = x·e^y·y^(-x)·γ(x, y), γ the lower incomplete gamma function."""
+        return np.log(x) + log_incomplete_gamma(x, y)[0]
+
+    def erlang_a_metrics(lam, mu, s, theta):
+        """Vectorized Erlang-A metrics for broadcastable arrays of λ, μ, s ≥ 1 and patience rate θ.
+
+        Customers abandon after an exponential patience with mean 1/θ, so the queue is
+        finite for every ρ. With E = Erlang-B(s, λ/μ) and A = A(sμ/θ, λ/θ),
+        P(wait) = A·E / (1 + (A - 1)·E), P(abandon | wait) = 1/(ρA) + 1 - 1/ρ,
+        Wq = P(abandon)/θ over all arrivals, and λ(1 - P(abandon)) customers are served.
+        θ = 0 gives the M/M/s metrics (infinite waits when ρ ≥ 1).
+        """
+        lam, mu, s, theta = np.broadcast_arrays(
+            np.asarray(lam, dtype=float), np.asarray(mu, dtype=float),
+            np.asarray(s, dtype=np.int64), np.asarray(theta, dtype=float),
+        )
+        rho = lam / (s * mu)
+        patient = theta <= 0
+        th = np.where(patient, 1.0, theta)
+        inv_a = np.exp(-log_erlang_a_ratio(s * mu / th, lam / th))
+        e = erlang_b(s, lam / mu)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            p_wait = np.where(lam > 0, e / (e + (1 - e) * inv_a), 0.0)
+            p_abandon_waiting = np.clip(np.where(lam > 0, inv_a / rho + 1 - 1 / rho, 0.0), 0, 1)
+        p_abandon = p_wait * p_abandon_waiting
+        Wq = p_abandon / th
+        if patient.any():
+            m = mms_metrics(lam, mu, s)
+            p_wait = np.where(patient, m.p_wait, p_wait)
+            p_abandon = np.where(patient, 0.0, p_abandon)
+            Wq = np.where(patient, m.Wq, Wq)
+        return AbandonmentMetrics(rho, p_wait, p_abandon, lam * Wq, Wq, lam * (1 - p_abandon))
+    return AbandonmentMetrics, erlang_a_metrics, log_erlang_a_ratio
+
+
+@app.cell(hide_code=True)
+def staffing_solver(mms_metrics, np):
+    # Staffing solver — smallest s meeting a service target, for many intervals at once
+    def min_staff(lam, mu, *, max_wq=None, max_wait_prob=None, wait_time=0.0, max_rho=1.0, beta=1.0):
+        """Smallest number of servers per interval that meets every given target.
+
+        Targets: utilization strictly below max_rho, average wait Wq ≤ max_wq, and
+        service level P(Wq > wait_time) ≤ max_wait_prob. All metrics fall monotonically
+        in s, so each interval is bracketed between the ρ bound and a square-root
+        staffing guess a + β√a (doubled until feasible) and then bisected.
+        """
+        if max_wq is not None and max_wq <= 0:
+            raise ValueError("max_wq must be positive")
+        if max_wait_prob is not None and max_wait_prob <= 0:
+            raise ValueError("max_wait_prob must be positive")
+        if not 0 < max_rho <= 1:
+            raise ValueError("max_rho must be in (0, 1]")
+
+        lam, mu = np.broadcast_arrays(np.asarray(lam, dtype=float), np.asarray(mu, dtype=float))
+        shape = lam.shape
+        lam, mu = lam.ravel(), mu.ravel()
+        a = lam / mu
+
+        def meets(idx, s):
+            m = mms_metrics(lam[idx], mu[idx], s)
+            ok = m.rho < max_rho
+            if max_wq is not None:
+                ok &= m.Wq <= max_wq
+            if max_wait_prob is not None:
+                # P(Wq > t) = C(s, ρ) · exp(-(sμ - λ) t)
+                ok &= m.p_wait * np.exp(-(s * mu[idx] - lam[idx]) * wait_time) <= max_wait_prob
+            return ok
+
+        # Invariant: lo is infeasible (ρ ≥ max_rho), hi is feasible
+        lo = np.floor(a / max_rho).astype(np.int64)
+        hi = np.maximum(np.ceil(a + beta * np.sqrt(a)).astype(np.int64), lo + 1)
+        idx = np.arange(lam.size)
+        while idx.size:
+            bad = idx[~meets(idx, hi[idx])]
+            lo[bad] = hi[bad]
+            hi[bad] *= 2
+            idx = bad
+
+        idx = np.flatnonzero(hi - lo > 1)
+        while idx.size:
+            mid = (lo[idx] + hi[idx]) // 2
+            ok = meets(idx, mid)
+            hi[idx[ok]] = mid[ok]
+            lo[idx[~ok]] = mid[~ok]
+            idx = idx[hi[idx] - lo[idx] > 1]
+        return hi.reshape(shape)
+    return (min_staff,)
+
+
+@app.cell(hide_code=True)
+def shift_planner(NamedTuple, heapq, np):
+    # Shift planner — cheapest mix of shifts whose coverage meets a per-block requirement
+    class ShiftPlan(NamedTuple):
+        """Staff hired per candidate shift, resulting staff on duty per block, total cost."""
+        counts: np.ndarray
+        coverage: np.ndarray
+        cost: float
+
+    def plan_shifts(required, shifts, block_cost=1.0, shift_cost=0.0):
+        """Cheapest staff count per shift such that every block has at least `required` on duty.
+
+        `shifts` lists candidate shifts as (first_block, n_blocks). A shift costs the sum
+        of the per-block cost table `block_cost` over the blocks it covers plus a fixed
+        `shift_cost`. Because shifts cover consecutive blocks, differencing adjacent
+        coverage constraints turns the problem into a min-cost flow on block boundaries:
+        a shift is an arc start → end, surplus staff is a free arc one boundary back.
+        Successive shortest paths (Dijkstra with potentials) give the exact optimum.
+        """
+        required = np.asarray(required, dtype=np.int64)
+        n_blocks = required.size
+        start, length = np.asarray(shifts, dtype=np.int64).reshape(-1, 2).T
+        end = start + length
+        if (start < 0).any() or (length < 1).any() or (end > n_blocks).any():
+            raise ValueError("every shift must lie within the blocks and cover at least one")
+        covers = np.cumsum(np.bincount(start, minlength=n_blocks + 1) - np.bincount(end, minlength=n_blocks + 1))
+        uncovered = np.flatnonzero((covers[:-1] == 0) & (required > 0))
+        if uncovered.size:
+            raise ValueError(f"blocks {uncovered.tolist()} need staff but no shift covers them")
+        cum_cost = np.concatenate([[0.0], np.cumsum(np.broadcast_to(np.asarray(block_cost, dtype=float), (n_blocks,)))])
+        costs = cum_cost[end] - cum_cost[start] + shift_cost
+
+        # Residual graph: graph[u] holds arcs [head, capacity, cost, index of the reverse arc]
+        source, sink = n_blocks + 1, n_blocks + 2
+        graph = [[] for _ in range(n_blocks + 3)]
+
+        def add_arc(u, v, capacity, cost):
+            graph[u].append([v, capacity, cost, len(graph[v])])
+            graph[v].append([u, 0, -cost, len(graph[u]) - 1])
+            return graph[u][-1]
+
+        shift_arcs = [add_arc(a, e, np.inf, c) for a, e, c in zip(start.tolist(), end.tolist(), costs.tolist())]
+        for b in range(1, n_blocks + 1):
+            add_arc(b, b - 1, np.inf, 0.0)
+        # Boundary b gains (or loses) required[b] - required[b - 1] staff
+        for b, d in enumerate(np.diff(required, prepend=0, append=0).tolist()):
+            if d > 0:
+                add_arc(source, b, d, 0.0)
+            elif d < 0:
+                add_arc(b, sink, -d, 0.0)
+
+        potential = [0.0] * len(graph)
+        while True:
+            dist = [np.inf] * len(graph)
+            prev = [None] * len(graph)
+            dist[source] = 0.0
+            heap = [(0.0, source)]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d > dist[u]:
+                    continue
+                for i, (v, capacity, cost, _) in enumerate(graph[u]):
+                    nd = d + cost + potential[u] - potential[v]
+                    if capacity > 0 and nd < dist[v] - 1e-9:
+                        dist[v], prev[v] = nd, (u, i)
+                        heapq.heappush(heap, (nd, v))
+            if dist[sink] == np.inf:
+                break
+            # Capping at the sink distance keeps every reduced cost non-negative
+            potential = [p + min(d, dist[sink]) for p, d in zip(potential, dist)]
+            path, v = [], sink
+            while v != source:
+                u, i = prev[v]
+                path.append(graph[u][i])
+                v = u
+            push = min(arc[1] for arc in path)
+            for arc in path:
+                arc[1] -= push
+                graph[arc[0]][arc[3]][1] += push
+
+        counts = np.array([graph[arc[0]][arc[3]][1] for arc in shift_arcs], dtype=np.int64)
+        coverage = np.cumsum(
+            np.bincount(start, counts, minlength=n_blocks + 1) - np.bincount(end, counts, minlength=n_blocks + 1)
+        )[:-1].astype(np.int64)
+        return ShiftPlan(counts, coverage, float(counts @ costs))
+    return ShiftPlan, plan_shifts
+
+
+@app.cell(hide_code=True)
+def erlang_tables(QueueMetrics, ggs_metrics, mo, np):
+    # Erlang-C lookup table — precomputed by scripts/build_erlang_table.py, interpolated at runtime
+    import io as _io
+
+    def load_erlang_table(location):
+        """Load the (3, s_max, n_rho) float32 table, or None if it has not been built.
+
+        Local files are memory-mapped; in the browser the fetched bytes are viewed
+        in place (np.frombuffer) instead of being copied into a new array.
+        """
+        text = str(location)
+        if not text.startswith(("http://", "https://")):
+            try:
+                return np.load(text, mmap_mode="r")
+            except FileNotFoundError:
+                return None
+        import urllib.request as _request
+        try:
+            with _request.urlopen(text) as response:
+                buf = response.read()
+        except OSError:
+            return None
+        header = _io.BytesIO(buf)
+        version = np.lib.format.read_magic(header)
+        if version == (1, 0):
+            shape, _, dtype = np.lib.format.read_array_header_1_0(header)
+        else:
+            shape, _, dtype = np.lib.format.read_array_header_2_0(header)
+        return np.frombuffer(buf, dtype=dtype, count=int(np.prod(shape)), offset=header.tell()).reshape(shape)
+
+    def erlang_table_lookup(table, s, rho):
+        """Interpolate (P(wait), Lq·(1-ρ), μW·(1-ρ)) linearly in ρ at integer s.
+
+        Row s-1 holds ρ_k = k / n_rho; callers must keep 1 ≤ s ≤ s_max, 0 ≤ ρ < ρ_last.
+        The scaled columns stay bounded as ρ → 1, so interpolation error stays small.
+        """
+        n_rho = table.shape[2]
+        x = np.asarray(rho, dtype=float) * n_rho
+        k = np.minimum(x.astype(np.int64), n_rho - 2)
+        frac = x - k
+        row = np.asarray(s, dtype=np.int64) - 1
+        lo = table[:, row, k].astype(float)
+        hi = table[:, row, k + 1].astype(float)
+        return lo + (hi - lo) * frac
+
+    erlang_table = load_erlang_table(mo.notebook_location() / "public" / "erlang_table.npy")
+
+    def table_metrics(lam, mu, s, cv_s=1.0):
+        """ggs_metrics served from the lookup table wherever the grid covers (s, ρ).
+
+        With the default grid (s ≤ 50, ρ step 0.001) the error is below 1e-5 in
+        P(wait), 1e-4 · max(Lq, 1) in Lq and 1e-5 relative in W; the build script
+        checks and prints these bounds.
+        """
+        lam, mu, s, cv_s = np.broadcast_arrays(
+            np.asarray(lam, dtype=float), np.asarray(mu, dtype=float),
+            np.asarray(s, dtype=np.int64), np.asarray(cv_s, dtype=float),
+        )
+        if erlang_table is None:
+            return ggs_metrics(lam, mu, s, cv_s)
+        s_max, n_rho = erlang_table.shape[1:]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rho = lam / (s * mu)
+        inside = (s >= 1) & (s <= s_max) & (rho >= 0) & (rho <= (n_rho - 1) / n_rho)
+        out = np.stack(ggs_metrics(*(v[~inside] for v in (lam, mu, s, cv_s))), axis=0) if not inside.all() else None
+
+        lam_i, mu_i, rho_i = lam[inside], mu[inside], rho[inside]
+        p_wait, lq_scaled, w_scaled = erlang_table_lookup(erlang_table, s[inside], rho_i)
+        factor = (1 + cv_s[inside] ** 2) / 2  # CVa = 1, as in ggs_metrics' default
+        Lq = lq_scaled / (1 - rho_i) * factor
+        Wq = np.maximum(w_scaled / (mu_i * (1 - rho_i)) - 1 / mu_i, 0) * factor
+
+        result = np.empty((len(QueueMetrics._fields),) + lam.shape)
+        result[:, inside] = np.stack([rho_i, p_wait, Lq + lam_i / mu_i, Lq, Wq + 1 / mu_i, Wq])
+        if out is not None:
+            result[:, ~inside] = out
+        return QueueMetrics(*result)
+    return erlang_table, erlang_table_lookup, load_erlang_table, table_metrics
+
+
+@app.cell(hide_code=True)
+def memo_layer(QueueMetrics, np, table_metrics):
+    # Memoization layer — bounded cache of per-scenario metrics shared by the slides
+    from collections import OrderedDict as _OrderedDict
+    from threading import Lock as _Lock
+
+    class MetricsCache:
+        """Bounded cache of queue metrics keyed on (λ, μ, s, CVs).
+
+        Array inputs are split into scenarios; only the misses are evaluated, in one
+        vectorized call. Arrays with more scenarios than the cache holds would only
+        evict each other, so they go straight to `fn` and leave the cache untouched.
+        `policy` is "lru" (hits refresh an entry) or "fifo". Calls are serialized by a
+        lock, since lazy slides are built ahead on a thread while cells keep running.
+        """
+
+        def __init__(self, fn, maxsize: int = 4096, policy: str = "lru"):
+            if policy not in ("lru", "fifo"):
+                raise ValueError(f"Unknown eviction policy: {policy!r}")
+            if maxsize < 1:
+                raise ValueError("maxsize must be at least 1")
+            self.fn = fn
+            self.maxsize = maxsize
+            self.policy = policy
+            self._store = _OrderedDict()
+            self._lock = _Lock()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+        def __call__(self, lam, mu, s, cv_s=1.0) -> QueueMetrics:
+            lam, mu, s, cv_s = np.broadcast_arrays(
+                np.asarray(lam, dtype=float), np.asarray(mu, dtype=float),
+                np.asarray(s, dtype=np.int64), np.asarray(cv_s, dtype=float),
+            )
+            if lam.size > self.maxsize:
+                return QueueMetrics(*self.fn(lam, mu, s, cv_s))
+            keys = list(zip(lam.ravel().tolist(), mu.ravel().tolist(), s.ravel().tolist(), cv_s.ravel().tolist()))
+            with self._lock:
+                found = {k: self._store[k] for k in keys if k in self._store}
+                missing = list(dict.fromkeys(k for k in keys if k not in found))
+                self.hits += len(keys) - len(missing)
+                self.misses += len(missing)
+                if self.policy == "lru":
+                    for k in found:
+                        self._store.move_to_end(k)
+                if missing:
+                    cols = np.array(missing, dtype=float).T
+                    fresh = np.column_stack(self.fn(cols[0], cols[1], cols[2].astype(np.int64), cols[3]))
+                    for k, row in zip(missing, fresh.tolist()):
+                        found[k] = self._store[k] = tuple(row)
+                    while len(self._store) > self.maxsize:
+                        self._store.popitem(last=False)
+                        self.evictions += 1
+            rows = [found[k] for k in keys]
+            table = np.array(rows, dtype=float).reshape(lam.shape + (len(QueueMetrics._fields),))
+            return QueueMetrics(*np.moveaxis(table, -1, 0))
+
+        def info(self) -> dict:
+            with self._lock:
+                return {
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "size": len(self._store), "maxsize": self.maxsize, "policy": self.policy,
+                }
+
+        def clear(self) -> None:
+            with self._lock:
+                self._store.clear()
+                self.hits = self.misses = self.evictions = 0
+
+    # One cache per session, shared by every slide (G/G/s with CVa = 1 as in the slides)
+    queue_cache = MetricsCache(table_metrics)
+    return MetricsCache, queue_cache
+
+
+@app.cell(hide_code=True)
+def des_engine(NamedTuple, heapq, np):
+    # Discrete-event simulator — heap-based G/G/s queue to check the closed-form slides
+    from collections import deque as _deque
+
+    class SimResult(NamedTuple):
+        """Simulated metrics: L, Lq, utilization time-averaged; W, Wq averaged per customer."""
+        L: float
+        Lq: float
+        W: float
+        Wq: float
+        utilization: float
+        customers: int
+        events: int
+
+    ARRIVAL, DEPARTURE = 0, 1
+
+    class Event:
+        """Event record: an arrival, or a departure with its customer's arrival and service-start times."""
+        __slots__ = ("kind", "arrived", "started")
+
+        def __init__(self, kind, arrived=0.0, started=0.0):
+            self.kind = kind
+            self.arrived = arrived
+            self.started = started
+
+    # A single arrival record is reused; the heap orders (time, seq, event) tuples in C,
+    # with seq keeping simultaneous events FIFO
+    _ARRIVAL_EVENT = Event(ARRIVAL)
+
+    # Samplers take (rng, n) and return n draws, so the simulator can pull them in blocks
+    def exponential(rate):
+        """Exponential times with the given rate (CV = 1)."""
+        return lambda rng, n: rng.exponential(1 / rate, n)
+
+    def deterministic(value):
+        """Constant times (CV = 0)."""
+        return lambda rng, n: np.full(n, float(value))
+
+    def gamma_cv(mean, cv):
+        """Gamma times with the given mean and coefficient of variation."""
+        if cv == 0:
+            return deterministic(mean)
+        shape = 1 / cv ** 2
+        return lambda rng, n: rng.gamma(shape, mean / shape, n)
+
+    def lognormal_cv(mean, cv):
+        """Lognormal times with the given mean and coefficient of variation."""
+        if cv == 0:
+            return deterministic(mean)
+        sigma2 = np.log1p(cv ** 2)
+        return lambda rng, n: rng.lognormal(np.log(mean) - sigma2 / 2, np.sqrt(sigma2), n)
+
+    def _draws(sampler, rng, block=65536):
+        while True:
+            yield from sampler(rng, block).tolist()
+
+    def simulate_queue(interarrival, service, s=1, n_customers=100_000, warmup=0.1, seed=None):
+        """Simulate a FCFS G/G/s queue until n_customers have been served after warm-up.
+
+        The first `warmup` fraction of arrivals only fills the system; statistics
+        start when the first measured customer arrives.
+        """
+        rng = np.random.default_rng(seed)
+        next_gap = _draws(interarrival, rng).__next__
+        next_service = _draws(service, rng).__next__
+        push, pop = heapq.heappush, heapq.heappop
+
+        heap = [(next_gap(), 0, _ARRIVAL_EVENT)]
+        seq = 1
+        queue = _deque()
+        busy = 0
+        n_warm = int(warmup * n_customers)
+        arrivals = served = events = 0
+        # t_last stays infinite (no area accumulates) until the first measured arrival
+        t_start = t_last = float("inf")
+        area_busy = area_queue = sum_w = sum_wq = 0.0
+
+        while served < n_customers:
+            t, _, ev = pop(heap)
+            events += 1
+            dt = t - t_last
+            if dt > 0:
+                area_busy += busy * dt
+                area_queue += len(queue) * dt
+                t_last = t
+
+            if ev.kind == ARRIVAL:
+                arrivals += 1
+                if arrivals == n_warm + 1:
+                    t_start = t_last = t
+                push(heap, (t + next_gap(), seq, _ARRIVAL_EVENT))
+                seq += 1
+                if busy < s:
+                    busy += 1
+                    push(heap, (t + next_service(), seq, Event(DEPARTURE, t, t)))
+                    seq += 1
+                else:
+                    queue.append(t)
+            else:
+                if ev.arrived >= t_start:
+                    served += 1
+                    sum_w += t - ev.arrived
+                    sum_wq += ev.started - ev.arrived
+                if queue:
+                    push(heap, (t + next_service(), seq, Event(DEPARTURE, queue.popleft(), t)))
+                    seq += 1
+                else:
+                    busy -= 1
+
+        horizon = t_last - t_start
+        return SimResult(
+            L=(area_busy + area_queue) / horizon,
+            Lq=area_queue / horizon,
+            W=sum_w / served,
+            Wq=sum_wq / served,
+            utilization=area_busy / (s * horizon),
+            customers=served,
+            events=events,
+        )
+    return (
+        Event,
+        SimResult,
+        deterministic,
+        exponential,
+        gamma_cv,
+        lognormal_cv,
+        simulate_queue,
+    )
+
+
+@app.cell(hide_code=True)
+def lindley_engine(SimResult, np):
+    # Lindley simulator — vectorized single-server G/G/1 queue streamed in chunks
+    def simulate_lindley(interarrival, service, n_customers=1_000_000, warmup=0.1, chunk=1 << 20, seed=None):
+        """Simulate a FCFS G/G/1 queue with the Lindley recursion Wq' = max(0, Wq + S - A).
+
+        Within a chunk, Wq_i = P_i - min(-w0, min_{k≤i} P_k) with P the running sum of
+        S_k - A_{k+1} and w0 the wait carried in from the previous chunk, so memory is
+        O(chunk) for any n_customers. L and Lq follow from Little's Law; `events`
+        counts one arrival and one departure per measured customer.
+        """
+        rng = np.random.default_rng(seed)
+        n_warm = int(warmup * n_customers)
+        total = n_warm + n_customers
+        done = 0
+        w0 = 0.0
+        sum_wq = sum_service = sum_gap = 0.0
+        while done < total:
+            n = min(chunk, total - done)
+            gaps = interarrival(rng, n)  # gaps[i]: time from customer i to customer i + 1
+            services = service(rng, n)
+            x = services - gaps
+            p = np.empty(n)
+            p[0] = 0.0
+            np.cumsum(x[:-1], out=p[1:])
+            wq = p - np.minimum(-w0, np.minimum.accumulate(p))
+            w0 = max(0.0, wq[-1] + x[-1])
+            measured = slice(min(max(n_warm - done, 0), n), None)
+            sum_wq += float(wq[measured].sum())
+            sum_service += float(services[measured].sum())
+            sum_gap += float(gaps[measured].sum())
+            done += n
+
+        lam = n_customers / sum_gap
+        Wq = sum_wq / n_customers
+        W = Wq + sum_service / n_customers
+        return SimResult(
+            L=lam * W,
+            Lq=lam * Wq,
+            W=W,
+            Wq=Wq,
+            utilization=sum_service / sum_gap,
+            customers=n_customers,
+            events=2 * n_customers,
+        )
+    return (simulate_lindley,)
+
+
+@app.cell(hide_code=True)
+def day_simulator(NamedTuple, np):
+    # Day simulator — M(t)/M/s(t) over the whole day, queues carried across time blocks
+    class DayResult(NamedTuple):
+        """Per-block averages over the simulated days, by the block a customer arrived in."""
+        Wq: np.ndarray
+        p_wait: np.ndarray
+        arrivals: np.ndarray
+        overtime: float
+
+    def simulate_day(arrival_rates, staffing, mu, n_days=1000, block_length=1.0, seed=None):
+        """Simulate n_days of a FCFS queue with piecewise-constant λ(t) and s(t).
+
+        Arrivals thin a Poisson process of rate max λ. Customers waiting at a block
+        boundary stay in line; a server whose shift ends finishes its customer first,
+        and the last block's staff clear the queue after closing (`overtime` is the
+        mean time from closing to the last departure). All days run side by side, one
+        customer index at a time: each customer takes the server that can start first.
+        """
+        rates = np.asarray(arrival_rates, dtype=float)
+        staff = np.asarray(staffing, dtype=np.int64)
+        if staff.shape != rates.shape or staff.min() < 1:
+            raise ValueError("staffing needs one value of at least 1 per block")
+        n_blocks = rates.size
+        horizon = n_blocks * block_length
+        rng = np.random.default_rng(seed)
+
+        def block_of(t):
+            return np.minimum((t // block_length).astype(np.int64), n_blocks - 1)
+
+        # Thinning: candidates at rate max λ, kept with probability λ(t) / max λ
+        lam_max = rates.max()
+        counts = rng.poisson(lam_max * horizon, n_days)
+        candidates = rng.uniform(0, horizon, (n_days, int(counts.max(initial=0))))
+        keep = np.arange(candidates.shape[1]) < counts[:, None]
+        keep &= rng.uniform(0, lam_max, candidates.shape) < rates[block_of(candidates)]
+        arrivals = np.sort(np.where(keep, candidates, np.inf), axis=1)[:, : int(keep.sum(axis=1).max(initial=0))]
+        services = rng.exponential(1 / mu, arrivals.shape)
+
+        # Server k works block b if staff[b] > k; next_start[k, b] is when it is next on duty
+        servers = np.arange(staff.max())
+        on_duty = staff[None, :] > servers[:, None]
+        next_start = np.full((servers.size, n_blocks + 1), np.inf)
+        for b in range(n_blocks - 1, -1, -1):
+            next_start[:, b] = np.where(on_duty[:, b], b * block_length, next_start[:, b + 1])
+
+        free = np.zeros((n_days, servers.size))
+        waits = np.full(arrivals.shape, np.nan)
+        days = np.arange(n_days)
+        for n in range(arrivals.shape[1]):
+            a = arrivals[:, n]
+            valid = np.isfinite(a)
+            ready = np.maximum(free, np.where(valid, a, 0.0)[:, None])
+            b = block_of(ready)
+            start = np.where(on_duty[servers, b], ready, next_start[servers, b])
+            k = start.argmin(axis=1)
+            first = start[days, k]
+            free[days, k] = np.where(valid, first + services[:, n], free[days, k])
+            waits[:, n] = np.where(valid, first - a, np.nan)
+
+        measured = np.isfinite(arrivals)
+        block = block_of(np.where(measured, arrivals, 0.0))[measured]
+        n_arrivals = np.bincount(block, minlength=n_blocks)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            Wq = np.bincount(block, weights=waits[measured], minlength=n_blocks) / n_arrivals
+            p_wait = np.bincount(block, weights=waits[measured] > 1e-12, minlength=n_blocks) / n_arrivals
+        overtime = float(np.maximum(free.max(axis=1, initial=0.0) - horizon, 0).mean())
+        return DayResult(Wq, p_wait, n_arrivals / n_days, overtime)
+    return DayResult, simulate_day
+
+
+@app.cell(hide_code=True)
+def transient_solver(NamedTuple, np):
+    # Transient solver — forward equations of the M(t)/M/s(t) birth-death chain over the day
+    class TransientResult(NamedTuple):
+        """Curves on the output grid `t` (hours since opening); P(wait) = P(N(t) ≥ s(t))."""
+        t: np.ndarray
+        L: np.ndarray
+        Lq: np.ndarray
+        p_wait: np.ndarray
+
+    def solve_transient(arrival_rates, staffing, mu, block_length=1.0, steps_per_block=12, tol=1e-10):
+        """Integrate dp/dt = pQ(t) from an empty system with piecewise-constant λ and s.
+
+        Q is tridiagonal (births λ, deaths μ·min(n, s)), so each step applies
+        uniformization, p·exp(QΔ) = Σ_k Poisson(k; ΛΔ) p·(I + Q/Λ)^k, using only
+        banded vector updates. Output steps are split so that ΛΔ ≤ 300, where the
+        Poisson weight e^(-ΛΔ) cannot underflow. States are truncated at N, the
+        expected arrivals of the whole day plus six standard deviations.
+
+        Staff leave at once when s drops: customers in service beyond the new s go
+        back to the queue. simulate_day instead lets a leaving server finish its
+        customer, so the two differ just after a drop in staffing.
+        """
+        rates = np.asarray(arrival_rates, dtype=float)
+        staff = np.asarray(staffing, dtype=np.int64)
+        if staff.shape != rates.shape or staff.min() < 1:
+            raise ValueError("staffing needs one value of at least 1 per block")
+        total = rates.sum() * block_length
+        n_states = int(total + 6 * np.sqrt(total)) + 20
+        n = np.arange(n_states)
+        dt = block_length / steps_per_block
+
+        p = np.zeros(n_states)
+        p[0] = 1.0
+        t_out = [0.0]
+        curves = [(0.0, 0.0, 0.0)]
+        for b, (lam, s) in enumerate(zip(rates, staff)):
+            birth = np.where(n < n_states - 1, lam, 0.0)
+            death = mu * np.minimum(n, s)
+            rate = lam + mu * s  # uniformization constant ≥ every state's total outflow
+            n_sub = max(1, int(np.ceil(rate * dt / 300)))
+            h = dt / n_sub
+            # The Poisson(ΛΔ) mass beyond mean + 10 sd + 50 is far below any useful tol
+            max_terms = int(rate * h + 10 * np.sqrt(rate * h)) + 50
+            for step in range(1, steps_per_block + 1):
+                for _ in range(n_sub):
+                    term = p
+                    weight = np.exp(-rate * h)
+                    acc = weight * term
+                    k, mass = 0, weight
+                    while 1 - mass > tol:
+                        k += 1
+                        if k > max_terms:
+                            raise RuntimeError(f"uniformization did not reach tol={tol:g} in {max_terms} terms")
+                        flow = -(birth + death) * term
+                        flow[1:] += birth[:-1] * term[:-1]
+                        flow[:-1] += death[1:] * term[1:]
+                        term = term + flow / rate
+                        weight *= rate * h / k
+                        acc += weight * term
+                        mass += weight
+                    p = acc / acc.sum()
+                t_out.append(b * block_length + step * dt)
+                curves.append((p @ n, p @ np.maximum(n - s, 0), p[s:].sum()))
+        L, Lq, p_wait = np.array(curves).T
+        return TransientResult(np.array(t_out), L, Lq, p_wait)
+    return TransientResult, solve_transient
+
+
+@app.cell(hide_code=True)
+def arrival_log(Path, np, pl):
+    # Arrival-log ingestion — raw timestamps → mean arrivals per hour in each time block
+    from io import BytesIO as _BytesIO
+
+    def open_log(location):
+        """A LazyFrame over the CSV/Parquet log at `location`, or None if it does not exist.
+
+        Local files are scanned lazily. In the browser the notebook location is a URL,
+        so the file is fetched and read from memory, as in load_erlang_table.
+        """
+        text = str(location)
+        parquet = text.endswith(".parquet")
+        if not text.startswith(("http://", "https://")):
+            if not Path(text).exists():
+                return None
+            return pl.scan_parquet(text) if parquet else pl.scan_csv(text, try_parse_dates=True)
+        import urllib.request
+
+        try:
+            with urllib.request.urlopen(text) as response:
+                buf = _BytesIO(response.read())
+        except OSError:
+            return None
+        return (pl.read_parquet(buf) if parquet else pl.read_csv(buf, try_parse_dates=True)).lazy()
+
+    def estimate_arrival_rates(source, timestamp="timestamp", *, by=None, open_hour=8, close_hour=18, block_minutes=60):
+        """Estimate λ per time block of the opening hours from a log with one row per arrival.
+
+        `source` is a CSV or Parquet path (globs allowed) or a LazyFrame. The scan stays
+        lazy and the streaming engine reduces it to arrivals per day and block, so memory
+        grows with the number of days, not rows. `by` names columns (e.g. a season) to
+        estimate separately. λ averages over the distinct dates seen in each group.
+        """
+        if isinstance(source, pl.LazyFrame):
+            log = source
+        elif str(source).endswith(".parquet"):
+            log = pl.scan_parquet(source)
+        else:
+            log = pl.scan_csv(source, try_parse_dates=True)
+        keys = [by] if isinstance(by, str) else list(by or [])
+        ts = pl.col(timestamp)
+        if log.collect_schema()[timestamp] == pl.String:
+            ts = ts.str.to_datetime()
+        n_blocks = (close_hour - open_hour) * 60 // block_minutes
+        minute = ts.dt.hour().cast(pl.Int32) * 60 + ts.dt.minute().cast(pl.Int32) - open_hour * 60
+
+        daily = (
+            log.select(*keys, date=ts.dt.date(), minute=minute)
+            .filter(pl.col("minute").is_between(0, n_blocks * block_minutes, closed="left"))
+            .group_by(*keys, "date", block=pl.col("minute") // block_minutes)
+            .agg(arrivals=pl.len())
+            .collect(engine="streaming")
+        )
+        n_days = pl.col("date").n_unique()
+        days = daily.group_by(keys).agg(days=n_days) if keys else daily.select(days=n_days)
+        counts = daily.group_by(*keys, "block").agg(pl.col("arrivals").sum())
+        return (
+            days.join(pl.DataFrame({"block": np.arange(n_blocks, dtype=np.int32)}), how="cross")
+            .join(counts, on=[*keys, "block"], how="left")
+            .with_columns(
+                start_hour=open_hour + pl.col("block") * block_minutes / 60,
+                arrivals=pl.col("arrivals").fill_null(0),
+            )
+            .with_columns(rate=pl.col("arrivals") / pl.col("days") / (block_minutes / 60))
+            .select(*keys, "block", "start_hour", "days", "arrivals", "rate")
+            .sort(*keys, "block")
+        )
+    return estimate_arrival_rates, open_log
+
+
+@app.cell(hide_code=True)
+def service_log(np, pl):
+    # Service-time statistics — μ, CV² and quantiles per group from duration logs, mergeable
+    from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
+
+    _ZERO = -(2 ** 31)  # bucket for durations ≤ 0
+
+    def _pooled(keys, expr):
+        return expr.over(keys) if keys else expr
+
+    def _combine(table, keys):
+        """Chan's parallel update: pool the rows sharing `keys` into one (n, mean, M2)."""
+        mean = _pooled(keys, (pl.col("n") * pl.col("mean")).sum() / pl.col("n").sum())
+        stats = [
+            pl.col("n").sum(),
+            pl.col("_mean").first().alias("mean"),
+            (pl.col("m2") + pl.col("n") * (pl.col("mean") - pl.col("_mean")) ** 2).sum().alias("m2"),
+        ]
+        table = table.with_columns(_mean=mean)
+        return table.group_by(keys).agg(stats) if keys else table.select(stats)
+
+    class ServiceStats:
+        """Mergeable per-group service-time summary: Welford moments on a log-bucket sketch.
+
+        Durations (minutes, or a Duration column) fall into buckets b = ⌈log_γ x⌉ with
+        γ = (1 + α)/(1 − α), and every (group, bucket) keeps count, mean and M2. Merging
+        summaries of other chunks, files or processes combines matching rows with Chan's
+        parallel update, which equals one pass over all rows; the bucket counts give
+        quantiles within relative error α.
+        """
+
+        def __init__(self, by=("counter", "hour"), rel_error=0.01):
+            self.by = [by] if isinstance(by, str) else list(by)
+            self.rel_error = rel_error
+            self.gamma = (1 + rel_error) / (1 - rel_error)
+            self.table = None  # [*by, bucket, n, mean, m2]
+
+        def update(self, source, duration="duration", timestamp="timestamp"):
+            """Add a CSV/Parquet path, DataFrame or LazyFrame, streamed in one pass; returns self."""
+            if isinstance(source, pl.DataFrame):
+                log = source.lazy()
+            elif isinstance(source, pl.LazyFrame):
+                log = source
+            elif str(source).endswith(".parquet"):
+                log = pl.scan_parquet(source)
+            else:
+                log = pl.scan_csv(source, try_parse_dates=True)
+            schema = log.collect_schema()
+            x = pl.col(duration)
+            if isinstance(schema[duration], pl.Duration):
+                x = x.dt.total_microseconds() / 60e6
+            columns = [pl.col(k) for k in self.by if k != "hour" or k in schema]
+            if "hour" in self.by and "hour" not in schema:
+                ts = pl.col(timestamp).str.to_datetime() if schema[timestamp] == pl.String else pl.col(timestamp)
+                columns.append(ts.dt.hour().alias("hour"))
+            bucket = pl.when(x > 0).then((x.log() / np.log(self.gamma)).ceil()).otherwise(_ZERO).cast(pl.Int32)
+            chunk = (
+                log.select(*columns, x.cast(pl.Float64).alias("x"), bucket.alias("bucket"))
+                .group_by(*self.by, "bucket")
+                .agg(n=pl.len(), mean=pl.col("x").mean(), m2=pl.col("x").var(ddof=0) * pl.len())
+                .collect(engine="streaming")
+            )
+            self._absorb(chunk)
+            return self
+
+        def merge(self, other):
+            """Fold another summary with the same grouping and rel_error into this one; returns self."""
+            if other.by != self.by or other.rel_error != self.rel_error:
+                raise ValueError("can only merge summaries with the same grouping and rel_error")
+            if other.table is not None:
+                self._absorb(other.table)
+            return self
+
+        def _absorb(self, chunk):
+            chunk = chunk.select(*self.by, "bucket", pl.col("n").cast(pl.Int64), "mean", "m2")
+            merged = chunk if self.table is None else pl.concat([self.table, chunk])
+            self.table = _combine(merged, [*self.by, "bucket"])
+
+        def summary(self, quantiles=(0.5, 0.9, 0.95)):
+            """One row per group: n, mean and std (minutes), cv2, cv, mu (per hour) and quantiles."""
+            if self.table is None:
+                raise ValueError("no durations added yet")
+            moments = _combine(self.table, self.by).with_columns(std=(pl.col("m2") / pl.col("n")).sqrt())
+            moments = moments.with_columns(
+                cv2=pl.col("m2") / pl.col("n") / pl.col("mean") ** 2,
+                cv=pl.col("std") / pl.col("mean"),
+                mu=60 / pl.col("mean"),
+            ).drop("m2")
+            # The bucket holding the q-th ranked duration, reported at its centre 2γ^b/(γ + 1)
+            value = pl.when(pl.col("bucket") == _ZERO).then(0.0).otherwise(
+                2 * self.gamma ** pl.col("bucket").cast(pl.Float64) / (self.gamma + 1)
+            )
+            ranked = self.table.sort("bucket").with_columns(
+                value=value,
+                rank=_pooled(self.by, pl.col("n").cum_sum()),
+                total=_pooled(self.by, pl.col("n").sum()),
+            )
+            picks = [pl.col("value").filter(pl.col("rank") >= q * pl.col("total")).first().alias(f"p{q * 100:g}") for q in quantiles]
+            sketch = ranked.group_by(self.by).agg(picks) if self.by else ranked.select(picks)
+            out = moments.join(sketch, on=self.by) if self.by else pl.concat([moments, sketch], how="horizontal")
+            return out.sort(self.by) if self.by else out
+
+    def read_service_stats(sources, *, by=("counter", "hour"), rel_error=0.01, max_workers=None, **columns):
+        """Summarize several log files concurrently (Polars releases the GIL) and merge them."""
+        def one(source):
+            return ServiceStats(by, rel_error).update(source, **columns)
+        with _ThreadPoolExecutor(max_workers) as pool:
+            parts = list(pool.map(one, sources))
+        total = ServiceStats(by, rel_error)
+        for part in parts:
+            total.merge(part)
+        return total
+    return ServiceStats, read_service_stats
+
+
+@app.cell(hide_code=True)
+def static_charts(mo):
+    # Static chart specs — prebuilt by scripts/build_static_charts.py, shown without the chart packages
+    from functools import cache as _cache
+    from json import dumps as _dumps, load as _load, loads as _loads
+
+    class VegaLite:
+        """A Vega-Lite spec (dict) rendered by marimo's frontend, as an Altair chart would be."""
+
+        def __init__(self, spec):
+            self.spec = spec
+
+        def _mime_(self):
+            major = self.spec.get("$schema", "/v6.").rsplit("/v", 1)[1].split(".")[0]
+            return f"application/vnd.vegalite.v{major}+json", _dumps(self.spec)
+
+    def _nonlinearity():
+        import altair as alt
+        import numpy as np
+        import polars as pl
+
+        mu = 10  # customers per hour
+        rho_values = np.linspace(0.01, 0.99, 100)
+        L_values = rho_values / (1 - rho_values)  # M/M/1 formula for L
+        Lq_values = rho_values**2 / (1 - rho_values)  # M/M/1 formula for Lq
+        # Little's Law: W = L/λ, Wq = Lq/λ, where λ = ρ × μ
+        W_values = L_values / (rho_values * mu) * 60  # in minutes
+        Wq_values = Lq_values / (rho_values * mu) * 60  # in minutes
+        df_nonlinear = pl.DataFrame({
+            "rho": np.round(rho_values, 2),
+            "L": np.round(L_values, 2),
+            "Lq": np.round(Lq_values, 2),
+            "W": np.round(W_values, 1),
+            "Wq": np.round(Wq_values, 1)
+        })
+
+        curve = alt.Chart(df_nonlinear).mark_line(strokeWidth=3, color="#2563eb").encode(
+            x=alt.X("rho:Q", title="Utilization (ρ)", scale=alt.Scale(domain=[0, 1])),
+            y=alt.Y("L:Q", title="Avg customers in system (L)", scale=alt.Scale(domain=[0, 30])),
+            tooltip=[
+                alt.Tooltip("rho:Q", title="ρ (utilization)", format=".0%"),
+                alt.Tooltip("L:Q", title="L (avg in system)"),
+                alt.Tooltip("W:Q", title="W (avg time, min)"),
+                alt.Tooltip("Lq:Q", title="Lq (avg in queue)"),
+                alt.Tooltip("Wq:Q", title="Wq (avg wait, min)"),
+            ]
+        )
+
+        # Reference points
+        ref_points = pl.DataFrame({
+            "rho": [0.5, 0.8, 0.9, 0.95],
+            "L": [1.0, 4.0, 9.0, 19.0],
+            "label": ["ρ=0.5: L=1", "ρ=0.8: L=4", "ρ=0.9: L=9", "ρ=0.95: L=19"]
+        })
+        points = alt.Chart(ref_points).mark_point(size=100, color="red", filled=True).encode(
+            x="rho:Q",
+            y="L:Q"
+        )
+        labels = alt.Chart(ref_points).mark_text(align="right", dx=-10, fontSize=12).encode(
+            x="rho:Q",
+            y="L:Q",
+            text="label:N"
+        )
+        return (curve + points + labels).properties(
+            width=500,
+            height=350,
+            title="Performance degrades nonlinearly as ρ → 1"
+        )
+
+    def _frontier():
+        # Same curve as slide 2.8, plus the operating point read from the "point" dataset
+        import altair as alt
+
+        current_point = alt.Chart(alt.NamedData("point")).mark_point(
+            size=200, color="red", filled=True
+        ).encode(x="rho:Q", y="L:Q")
+        point_label = alt.Chart(alt.NamedData("point")).mark_text(
+            align="right", dx=-10, dy=-10, fontSize=14, fontWeight="bold"
+        ).encode(x="rho:Q", y="L:Q", text="label:N")
+        return (_nonlinearity().layer[0] + current_point + point_label).properties(
+            width=450, height=350, title="Moving along the frontier"
+        )
+
+    CHART_BUILDERS = {"nonlinearity": _nonlinearity, "frontier": _frontier}
+
+    def load_chart_spec(name):
+        """The prebuilt spec public/charts/<name>.vl.json as a dict, or None if it has not been built."""
+        text = str(mo.notebook_location() / "public" / "charts" / f"{name}.vl.json")
+        if not text.startswith(("http://", "https://")):
+            try:
+                with open(text, encoding="utf-8") as f:
+                    return _load(f)
+            except FileNotFoundError:
+                return None
+        from urllib.request import urlopen as _urlopen
+        try:
+            with _urlopen(text) as response:
+                return _loads(response.read())
+        except OSError:
+            return None
+
+    @_cache
+    def static_chart(name):
+        """Spec for one of CHART_BUILDERS: the prebuilt file if present, otherwise built live.
+
+        Cached, so slider moves reuse it; callers must not modify the returned dict.
+        """
+        spec = load_chart_spec(name)
+        return spec if spec is not None else CHART_BUILDERS[name]().to_dict()
+
+    def with_data(spec, **datasets):
+        """A copy of `spec` with its named datasets replaced: the reactive part of a chart.
+
+        Layers reading {"name": ...} data keep their marks, encodings and tooltips in the
+        (cached) static spec; a slider move only supplies the rows as lists of dicts.
+        """
+        return {**spec, "datasets": {**spec.get("datasets", {}), **datasets}}
+    return CHART_BUILDERS, VegaLite, load_chart_spec, static_chart, with_data
 
 
 @app.cell(hide_code=True)
-def _(mo):
-    # Slide classes for consistent presentation layout
+def slide_classes(mo):
+    # Slide classes for consistent presentation layout (styled by d3.css, the app's css_file)
+    from asyncio import get_running_loop as _get_running_loop
     from dataclasses import dataclass
-    from typing import Optional as _Optional, Any as _Any
+    from functools import partial as _partial
+    from typing import Optional as _Optional, Any as _Any, Callable as _Callable
     import html as _html
 
-    # Slide constants
-    SLIDE_WIDTH = 1280
-    SLIDE_HEIGHT = 720
-    GAP = 24
-    PADDING_X = 24
-    PADDING_Y = 16
-    TITLE_FONT_SIZE = 28
-    FOOTER_FONT_SIZE = 12
-
     @dataclass
     class Slide:
         title: str
@@ -75,354 +1281,229 @@ def _(mo):
         subtitle: _Optional[str] = None
         content1: _Optional[_Any] = None
         content2: _Optional[_Any] = None
+        profiler: _Optional[_Any] = None
+        key: _Optional[str] = None
 
-        def _header(self) -> _Any:
+        def _header(self) -> str:
             safe_title = _html.escape(self.title)
-            return mo.Html(
-                f"""
+            return f"""
                 <div class="slide-header">
-                  <div class="slide-title" style="font-size: {TITLE_FONT_SIZE}px; font-weight: 700; line-height: 1.2; margin: 0;">{safe_title}</div>
-                  <div class="slide-hr" style="height: 1px; background: #E5E7EB; margin: 8px 0;"></div>
+                  <div class="slide-title">{safe_title}</div>
+                  <div class="slide-hr"></div>
                 </div>
                 """
-            )
 
-        def _footer(self) -> _Any:
+        def _footer(self) -> str:
             safe_page = _html.escape(str(self.page_number))
             safe_chair = _html.escape(self.chair)
             left_html = f"Page {safe_page} &nbsp;&nbsp;|&nbsp;&nbsp; {safe_chair}"
             center_img = (
-                f'<img class="slide-logo" src="{_html.escape(self.logo_url)}" alt="logo" style="display: block; max-height: 28px; max-width: 160px; margin: 0 auto; object-fit: contain;">'
+                f'<img class="slide-logo" src="{_html.escape(self.logo_url)}" alt="logo">'
                 if self.logo_url else "&nbsp;"
             )
-            return mo.Html(
-                f"""
+            return f"""
                 <div class="slide-footer">
-                  <div class="slide-hr" style="height: 1px; background: #E5E7EB; margin: 8px 0;"></div>
-                  <div class="slide-footer-row" style="display: grid; grid-template-columns: 1fr auto 1fr; align-items: center;">
-                    <div class="slide-footer-left" style="font-size: {FOOTER_FONT_SIZE}px; color: #6B7280; white-space: nowrap;">{left_html}</div>
+                  <div class="slide-hr"></div>
+                  <div class="slide-footer-row">
+                    <div class="slide-footer-left">{left_html}</div>
                     <div class="slide-footer-center">{center_img}</div>
                     <div class="slide-footer-right">&nbsp;</div>
                   </div>
                 </div>
                 """
-            )
 
-        def _title_layout(self) -> _Any:
-            safe_title = _html.escape(self.title)
-            sub = f'<div class="title-slide-sub" style="font-size: 40px; margin: 0 0 16px 0; color: #374151;">{_html.escape(self.subtitle)}</div>' if self.subtitle else ""
-            body = mo.Html(
-                f"""
-                <div class="slide-body title-center" style="flex: 1 1 auto; min-height: 0; display: flex; align-items: center; justify-content: center; height: 100%;">
-                  <div class="title-stack" style="text-align: center;">
-                    <div class="title-slide-title" style="font-size: 50px; font-weight: 800; margin: 0 0 8px 0;">{safe_title}</div>
-                    {sub}
-                    <div class="title-slide-meta" style="font-size: 30px; color: #6B7280;">{_html.escape(self.course)}</div>
-                    <div class="title-slide-meta" style="font-size: 22px; color: #6B7280;">{_html.escape(self.presenter)}</div>
-                  </div>
-                </div>
-                """
-            )
+        def _frame(self, body: str, header: bool = True) -> _Any:
             return mo.Html(
                 f"""
-                <div class="slide" style="width: {SLIDE_WIDTH}px; height: {SLIDE_HEIGHT}px; min-width: {SLIDE_WIDTH}px; min-height: {SLIDE_HEIGHT}px; max-width: {SLIDE_WIDTH}px; max-height: {SLIDE_HEIGHT}px; box-sizing: border-box; background: #ffffff; padding: {PADDING_Y}px {PADDING_X}px; display: flex; flex-direction: column; border-radius: 6px; box-shadow: 0 0 0 1px #f3f4f6; overflow: hidden; page-break-after: always; break-after: page;">
-                  {self._header()}
+                <div class="slide">
+                  {self._header() if header else ""}
                   {body}
                   {self._footer()}
                 </div>
                 """
             )
 
-        def _one_column_layout(self) -> _Any:
-            content = mo.md(self.content1) if isinstance(self.content1, str) else (self.content1 or mo.md(""))
-            content_wrapped = mo.vstack([content], gap=0).style({"gap": "0", "margin": "0", "padding": "0"})
-            body = mo.Html(
+        @staticmethod
+        def _column(content: _Any) -> _Any:
+            content = mo.md(content) if isinstance(content, str) else (content or mo.md(""))
+            return mo.vstack([content], gap=0).style({"gap": "0", "margin": "0", "padding": "0"})
+
+        def _title_layout(self) -> _Any:
+            safe_title = _html.escape(self.title)
+            sub = f'<div class="title-slide-sub">{_html.escape(self.subtitle)}</div>' if self.subtitle else ""
+            return self._frame(
                 f"""
-                <div class="slide-body" style="flex: 1 1 auto; min-height: 0; display: flex; flex-direction: column;">
-                    <div class="slide-col tight-md" style="min-height: 0; overflow: auto; padding-right: 2px;">
-                        <style>
-                            ul, ol {{ margin-top: -0.2em !important; }}
-                            .slide-col.tight-md .paragraph {{ margin-block: 0 !important; margin: 0 0 4px 0 !important; font-size: 19px !important; }}
-                            .slide-col.tight-md span.paragraph {{ margin-block: 0 !important; margin: 0 0 4px 0 !important; font-size: 19px !important; }}
-                            li {{ font-size: 19px !important; }}
-                            li * {{ font-size: 19px !important; }}
-                            /* Table styling */
-                            table {{ font-size: 14px !important; width: auto !important; max-width: 100% !important; }}
-                            th, td {{ font-size: 14px !important; padding: 4px 8px !important; }}
-                            thead {{ font-size: 14px !important; }}
-                            /* Code block styling */
-                            pre {{ font-size: 12px !important; padding: 6px 10px !important; margin: 4px 0 !important; max-width: 100% !important; overflow-x: auto !important; }}
-                            code {{ font-size: 12px !important; }}
-                            pre code {{ font-size: 12px !important; }}
-                        </style>
-                        {content_wrapped}
-                    </div>
+                <div class="slide-body title-center">
+                  <div class="title-stack">
+                    <div class="title-slide-title">{safe_title}</div>
+                    {sub}
+                    <div class="title-slide-meta">{_html.escape(self.course)}</div>
+                    <div class="title-slide-meta title-slide-presenter">{_html.escape(self.presenter)}</div>
+                  </div>
                 </div>
                 """
             )
-            return mo.Html(
+
+        def _one_column_layout(self) -> _Any:
+            return self._frame(
                 f"""
-                <div class="slide" style="width: {SLIDE_WIDTH}px; height: {SLIDE_HEIGHT}px; min-width: {SLIDE_WIDTH}px; min-height: {SLIDE_HEIGHT}px; max-width: {SLIDE_WIDTH}px; max-height: {SLIDE_HEIGHT}px; box-sizing: border-box; background: #ffffff; padding: {PADDING_Y}px {PADDING_X}px; display: flex; flex-direction: column; border-radius: 6px; box-shadow: 0 0 0 1px #f3f4f6; overflow: hidden; page-break-after: always; break-after: page;">
-                  {self._header()}
-                  {body}
-                  {self._footer()}
+                <div class="slide-body">
+                    <div class="slide-col tight-md">
+                        {self._column(self.content1)}
+                    </div>
                 </div>
                 """
             )
 
         def _side_by_side_layout(self) -> _Any:
-            left_content = mo.md(self.content1) if isinstance(self.content1, str) else (self.content1 or mo.md(""))
-            right_content = mo.md(self.content2) if isinstance(self.content2, str) else (self.content2 or mo.md(""))
-            left = mo.vstack([left_content], gap=0).style({"gap": "0", "margin": "0", "padding": "0"})
-            right = mo.vstack([right_content], gap=0).style({"gap": "0", "margin": "0", "padding": "0"})
-            body = mo.Html(
+            return self._frame(
                 f"""
-                <div class="slide-body" style="flex: 1 1 auto; min-height: 0; display: flex; flex-direction: column;">
-                    <style>
-                        ul, ol {{ margin-top: -0.2em !important; }}
-                        .slide-col.tight-md .paragraph {{ margin-block: 0 !important; margin: 0 0 4px 0 !important; font-size: 19px !important; }}
-                        .slide-col.tight-md span.paragraph {{ margin-block: 0 !important; margin: 0 0 4px 0 !important; font-size: 19px !important; }}
-                        li {{ font-size: 19px !important; }}
-                        li * {{ font-size: 19px !important; }}
-                        /* Table styling */
-                        table {{ font-size: 14px !important; width: auto !important; max-width: 100% !important; }}
-                        th, td {{ font-size: 14px !important; padding: 4px 8px !important; }}
-                        thead {{ font-size: 14px !important; }}
-                        /* Code block styling */
-                        pre {{ font-size: 12px !important; padding: 6px 10px !important; margin: 4px 0 !important; max-width: 100% !important; overflow-x: auto !important; }}
-                        code {{ font-size: 12px !important; }}
-                        pre code {{ font-size: 12px !important; }}
-                    </style>
-                    <div class="slide-cols" style="display: grid; grid-template-columns: 1fr 1fr; gap: {GAP}px; height: 100%; min-height: 0;">
-                        <div class="slide-col tight-md" style="min-height: 0; overflow: auto; padding-right: 2px;">
-                            {left}
+                <div class="slide-body">
+                    <div class="slide-cols">
+                        <div class="slide-col tight-md">
+                            {self._column(self.content1)}
                         </div>
-                        <div class="slide-col tight-md" style="min-height: 0; overflow: auto; padding-right: 2px;">
-                            {right}
+                        <div class="slide-col tight-md">
+                            {self._column(self.content2)}
                         </div>
                     </div>
                 </div>
                 """
             )
-            return mo.Html(
-                f"""
-                <div class="slide" style="width: {SLIDE_WIDTH}px; height: {SLIDE_HEIGHT}px; min-width: {SLIDE_WIDTH}px; min-height: {SLIDE_HEIGHT}px; max-width: {SLIDE_WIDTH}px; max-height: {SLIDE_HEIGHT}px; box-sizing: border-box; background: #ffffff; padding: {PADDING_Y}px {PADDING_X}px; display: flex; flex-direction: column; border-radius: 6px; box-shadow: 0 0 0 1px #f3f4f6; overflow: hidden; page-break-after: always; break-after: page;">
-                  {self._header()}
-                  {body}
-                  {self._footer()}
-                </div>
-                """
-            )
 
         def _section_layout(self) -> _Any:
             """Section/agenda separator slide with large centered section title and optional agenda."""
             safe_title = _html.escape(self.title)
             # subtitle contains the section number (e.g., "Section 1")
-            section_label = f'<div style="font-size: 20px; font-weight: 600; color: #6B7280; text-transform: uppercase; letter-spacing: 2px; margin-bottom: 12px;">{_html.escape(self.subtitle)}</div>' if self.subtitle else ""
+            section_label = f'<div class="section-label">{_html.escape(self.subtitle)}</div>' if self.subtitle else ""
             # content1 contains optional agenda/description
             agenda_content = ""
             if self.content1:
                 agenda_html = mo.md(self.content1) if isinstance(self.content1, str) else self.content1
-                agenda_content = f'<div style="margin-top: 32px; font-size: 18px; color: #4B5563; max-width: 600px; text-align: center;">{agenda_html}</div>'
-
-            body = mo.Html(
+                agenda_content = f'<div class="section-agenda">{agenda_html}</div>'
+            return self._frame(
                 f"""
-                <div class="slide-body section-center" style="flex: 1 1 auto; min-height: 0; display: flex; align-items: center; justify-content: center; height: 100%;">
-                  <div style="text-align: center;">
+                <div class="slide-body section-center">
+                  <div class="section-stack">
                     {section_label}
-                    <div style="font-size: 42px; font-weight: 700; color: #111827; margin: 0;">{safe_title}</div>
+                    <div class="section-title">{safe_title}</div>
                     {agenda_content}
                   </div>
                 </div>
-                """
-            )
-            return mo.Html(
-                f"""
-                <div class="slide" style="width: {SLIDE_WIDTH}px; height: {SLIDE_HEIGHT}px; min-width: {SLIDE_WIDTH}px; min-height: {SLIDE_HEIGHT}px; max-width: {SLIDE_WIDTH}px; max-height: {SLIDE_HEIGHT}px; box-sizing: border-box; background: #ffffff; padding: {PADDING_Y}px {PADDING_X}px; display: flex; flex-direction: column; border-radius: 6px; box-shadow: 0 0 0 1px #f3f4f6; overflow: hidden; page-break-after: always; break-after: page;">
-                  {body}
-                  {self._footer()}
-                </div>
-                """
+                """,
+                header=False,
             )
 
         def render(self) -> _Any:
             if self.layout_type == "title":
-                return self._title_layout()
+                html = self._title_layout()
             elif self.layout_type == "section":
-                return self._section_layout()
+                html = self._section_layout()
             elif self.layout_type == "1-column":
-                return self._one_column_layout()
-            return self._side_by_side_layout()
+                html = self._one_column_layout()
+            else:
+                html = self._side_by_side_layout()
+            if self.profiler is not None:
+                self.profiler.stop(self.key)
+            return html
 
     class SlideCreator:
-        def __init__(self, chair: str, course: str, presenter: str, logo_url: _Optional[str] = None):
+        def __init__(
+            self,
+            chair: str,
+            course: str,
+            presenter: str,
+            logo_url: _Optional[str] = None,
+            profiler: _Optional[_Any] = None,
+            lazy: bool = False,
+        ):
             self.chair = chair
             self.course = course
             self.presenter = presenter
             self.logo_url = logo_url
-            self._page_counter = 0
-
-        def styles(self) -> _Any:
-            return mo.Html(
-                f"""
-                <style>
-                  :root {{
-                    --slide-w: {SLIDE_WIDTH}px;
-                    --slide-h: {SLIDE_HEIGHT}px;
-                    --gap: {GAP}px;
-                    --pad-x: {PADDING_X}px;
-                    --pad-y: {PADDING_Y}px;
-                    --title-size: {TITLE_FONT_SIZE}px;
-                    --footer-size: {FOOTER_FONT_SIZE}px;
-                    --border-color: #E5E7EB;
-                    --text-muted: #6B7280;
-                    --bg: #ffffff;
-                  }}
-                  div.slide, .slide {{
-                    width: var(--slide-w) !important;
-                    height: var(--slide-h) !important;
-                    min-width: var(--slide-w) !important;
-                    min-height: var(--slide-h) !important;
-                    max-width: var(--slide-w) !important;
-                    max-height: var(--slide-h) !important;
-                    box-sizing: border-box !important;
-                    background: var(--bg) !important;
-                    padding: var(--pad-y) var(--pad-x) !important;
-                    display: flex !important;
-                    flex-direction: column !important;
-                    border-radius: 6px;
-                    box-shadow: 0 0 0 1px #f3f4f6;
-                    overflow: hidden !important;
-                  }}
-                  div.slide-title, .slide-title {{
-                    font-size: var(--title-size) !important;
-                    font-weight: 700 !important;
-                    line-height: 1.2 !important;
-                    margin: 0 !important;
-                  }}
-                  div.slide-hr, .slide-hr {{
-                    height: 1px !important;
-                    background: var(--border-color) !important;
-                    margin: 8px 0 !important;
-                  }}
-                  div.slide-body, .slide-body {{
-                    flex: 1 1 auto !important;
-                    min-height: 0 !important;
-                    display: flex !important;
-                    flex-direction: column !important;
-                  }}
-                  div.slide-cols, .slide-cols {{
-                    display: grid !important;
-                    grid-template-columns: 1fr 1fr !important;
-                    gap: var(--gap) !important;
-                    height: 100% !important;
-                    min-height: 0 !important;
-                  }}
-                  div.slide-col, .slide-col {{
-                    min-height: 0 !important;
-                    overflow: auto !important;
-                    padding-right: 2px !important;
-                  }}
-                  div.slide-footer div.slide-footer-row, .slide-footer .slide-footer-row {{
-                    display: grid !important;
-                    grid-template-columns: 1fr auto 1fr !important;
-                    align-items: center !important;
-                  }}
-                  div.slide-footer-left, .slide-footer-left {{
-                    font-size: var(--footer-size) !important;
-                    color: var(--text-muted) !important;
-                    white-space: nowrap !important;
-                  }}
-                  img.slide-logo, .slide-logo {{
-                    display: block !important;
-                    max-height: 28px !important;
-                    max-width: 160px !important;
-                    margin: 0 auto !important;
-                    object-fit: contain !important;
-                  }}
-                  div.title-center, .title-center {{
-                    display: flex !important;
-                    align-items: center !important;
-                    justify-content: center !important;
-                    height: 100% !important;
-                  }}
-                  div.title-stack, .title-stack {{
-                    text-align: center !important;
-                  }}
-                  div.title-slide-title, .title-slide-title {{
-                    font-size: 40px !important;
-                    font-weight: 800 !important;
-                    margin: 0 0 8px 0 !important;
-                  }}
-                  div.title-slide-sub, .title-slide-sub {{
-                    font-size: 20px !important;
-                    margin: 0 0 16px 0 !important;
-                    color: #374151 !important;
-                  }}
-                  div.title-slide-meta, .title-slide-meta {{
-                    font-size: 16px !important;
-                    color: var(--text-muted) !important;
-                  }}
-                  .tight-md p {{ margin: 0 0 4px 0 !important; }}
-                  .tight-md .paragraph {{ margin-block: 0 !important; margin: 0 0 4px 0 !important; display: block !important; font-size: 19px !important; }}
-                  .tight-md span.paragraph {{ margin-block: 0 !important; margin: 0 0 4px 0 !important; display: block !important; font-size: 19px !important; }}
-                  ul, ol {{ margin-top: -0.2em !important; margin-bottom: 6px !important; margin-left: 1.25em !important; margin-right: 0 !important; }}
-                  .tight-md li {{ margin: 2px 0 !important; font-size: 19px !important; }}
-                  li {{ font-size: 19px !important; }}
-                  li * {{ font-size: 19px !important; }}
-                  .tight-md h1, .tight-md h2, .tight-md h3, .tight-md h4 {{ margin: 0 0 6px 0 !important; }}
-
-                  /* Table styling for slides */
-                  .slide table, .slide-col table {{
-                    font-size: 14px !important;
-                    width: auto !important;
-                    max-width: 100% !important;
-                    border-collapse: collapse !important;
-                  }}
-                  .slide th, .slide td, .slide-col th, .slide-col td {{
-                    font-size: 14px !important;
-                    padding: 4px 8px !important;
-                    white-space: nowrap !important;
-                  }}
-                  .slide thead, .slide-col thead {{
-                    font-size: 14px !important;
-                  }}
-
-                  /* Code block styling for slides */
-                  .slide pre, .slide-col pre {{
-                    font-size: 13px !important;
-                    padding: 8px 12px !important;
-                    margin: 4px 0 !important;
-                    max-width: 100% !important;
-                    overflow-x: auto !important;
-                    white-space: pre !important;
-                    box-sizing: border-box !important;
-                  }}
-                  .slide code, .slide-col code {{
-                    font-size: 13px !important;
-                  }}
-                  .slide pre code, .slide-col pre code {{
-                    font-size: 13px !important;
-                    white-space: pre !important;
-                  }}
-
-                  /* Math display equations - consistent sizing across all views */
-                  .katex-display,
-                  .katex {{
-                    font-size: 22px !important;
-                  }}
-                  .katex-display {{
-                    margin: 0.5em 0 !important;
-                  }}
-                </style>
-                """
-            )
-
-        def create_slide(self, title: str, layout_type: str = "side-by-side", page_number: _Optional[int] = None) -> Slide:
+            self.profiler = profiler
+            self.lazy = lazy
+            self._pages = {}  # slide key -> page number
+            self._pending = {}  # slide key -> (inputs, build) not built yet
+            self._building = {}  # slide key -> (inputs, future) being built ahead on a thread
+            self._built = {}  # slide key -> (inputs, content)
+
+        def defer(self, slide: Slide, build: _Callable[[], _Any], *inputs: _Any) -> _Any:
+            """The slide content returned by build(): now, or in lazy mode once the slide is about to be shown.
+
+            In lazy mode this is a mo.lazy placeholder that the frontend loads when the slide
+            comes into view. Loading a slide also starts building the next pending slide on a
+            mo.Thread, one slide ahead, so the kernel stays free meanwhile. Built content is
+            kept per slide and reused for as long as `inputs` (e.g. slider values) stay the
+            same. With profiling on, each build is recorded as "<slide key>:content", since
+            it no longer falls between create_slide and render; builds ahead record no memory,
+            as tracemalloc's peak would mix in the cells running meanwhile. One deferred part
+            per slide.
+            """
+            if not self.lazy:
+                return build()
+            key = slide.key
+            built = self._built.get(key)
+            if built is not None and built[0] == inputs:
+                return built[1]
+            building = self._building.get(key)
+            if building is None or building[0] != inputs:
+                # A build ahead for other inputs is left to finish and dropped
+                self._building.pop(key, None)
+                self._pending[key] = (inputs, build)
+            return mo.lazy(_partial(self._load, key), show_loading_indicator=True)
+
+        async def _load(self, key: str) -> _Any:
+            if key in self._building:
+                inputs, future = self._building.pop(key)
+                self._built[key] = (inputs, await future)
+            elif key in self._pending:
+                inputs, build = self._pending.pop(key)
+                self._built[key] = (inputs, self._build(key, build))
+            ahead = [k for k in self._pending if self._pages[k] > self._pages[key]]
+            if ahead:
+                self._build_ahead(min(ahead, key=self._pages.get))
+            return self._built[key][1]
+
+        def _build_ahead(self, key: str) -> None:
+            inputs, build = self._pending.pop(key)
+            loop = _get_running_loop()
+            future = loop.create_future()
+
+            def run():
+                try:
+                    content = self._build(key, build, memory=False)
+                except Exception as error:
+                    loop.call_soon_threadsafe(future.set_exception, error)
+                else:
+                    loop.call_soon_threadsafe(future.set_result, content)
+
+            self._building[key] = (inputs, future)
+            mo.Thread(target=run, daemon=True).start()
+
+        def _build(self, key: str, build: _Callable[[], _Any], memory: bool = True) -> _Any:
+            if self.profiler is None:
+                return build()
+            with self.profiler.measure(f"{key}:content", "Deferred slide content", memory=memory):
+                return build()
+
+        def create_slide(
+            self,
+            title: str,
+            layout_type: str = "side-by-side",
+            page_number: _Optional[int] = None,
+            key: _Optional[str] = None,
+        ) -> Slide:
+            """A new slide; `key` names it in the profiler (the cell's variable, e.g. "slide_4_4").
+
+            Without a page number the slide follows the highest page so far, and keeps
+            that page when its cell runs again.
+            """
             if page_number is None:
-                self._page_counter += 1
-                page_number = self._page_counter
-            return Slide(
+                page_number = self._pages.get(key) or max(self._pages.values(), default=0) + 1
+            key = key or f"page_{page_number}"
+            self._pages[key] = page_number
+            slide = Slide(
                 title=title,
                 chair=self.chair,
                 course=self.course,
@@ -430,17 +1511,110 @@ def _(mo):
                 logo_url=self.logo_url,
                 page_number=page_number,
                 layout_type=layout_type,
+                profiler=self.profiler,
+                key=key,
             )
+            # Slide cells open with create_slide and end with render(): that span is what gets timed
+            if self.profiler is not None:
+                self.profiler.start(key, title)
+            return slide
 
-        def create_title_slide(self, title: str, subtitle: _Optional[str] = None, page_number: _Optional[int] = None) -> Slide:
-            slide = self.create_slide(title, layout_type="title", page_number=page_number)
+        def create_title_slide(
+            self,
+            title: str,
+            subtitle: _Optional[str] = None,
+            page_number: _Optional[int] = None,
+            key: _Optional[str] = None,
+        ) -> Slide:
+            slide = self.create_slide(title, layout_type="title", page_number=page_number, key=key)
             slide.subtitle = subtitle
             return slide
     return (SlideCreator,)
 
 
 @app.cell(hide_code=True)
-def _():
+def cell_profiler(mo):
+    # Cell profiler — opt-in timing per reactive cell: `marimo run capacity.py -- --profile` or `?profile=1`
+    # (`--profile memory` / `?profile=memory` also traces allocations, which slows every cell down)
+    import json as _json
+    import time as _time
+    import tracemalloc as _tracemalloc
+    from contextlib import contextmanager as _contextmanager, nullcontext as _nullcontext
+    from threading import Lock as _ProfilerLock
+
+    class CellProfiler:
+        """Wall time, executions and peak allocated memory per reactive cell, keyed by name.
+
+        SlideCreator calls start() in create_slide and stop() in render, with the slide's
+        key; other cells that do real work run their body under `profiled(name)`. Each
+        reactive re-run is one recorded call; a run that raises before stop() is simply
+        replaced by the next start() of the same key. Memory comes from tracemalloc and is
+        only traced when asked for; with profiling disabled no profiler is attached at all.
+        start() and stop() may come from the thread that builds lazy slides ahead, which
+        passes memory=False: tracemalloc's peak is process-wide, so resetting it there
+        would cut short the peak of whichever cell is running at the time.
+        """
+
+        def __init__(self, trace_memory=False):
+            self.records = {}
+            self._open = {}
+            self._lock = _ProfilerLock()
+            self.trace_memory = trace_memory
+            if trace_memory:
+                _tracemalloc.start()
+
+        def _memory(self, memory=True):
+            return _tracemalloc.get_traced_memory() if self.trace_memory and memory else (0, 0)
+
+        def start(self, key, title="", memory=True):
+            with self._lock:
+                if self.trace_memory and memory:
+                    _tracemalloc.reset_peak()
+                self._open[key] = (_time.perf_counter(), self._memory(memory)[0], title, memory)
+
+        def stop(self, key):
+            with self._lock:
+                opened = self._open.pop(key, None)
+                if opened is None:
+                    return
+                elapsed = _time.perf_counter() - opened[0]
+                allocated = self._memory(opened[3])[1] - opened[1]
+                r = self.records.setdefault(
+                    key, {"cell": key, "title": opened[2], "calls": 0, "total_ms": 0.0, "last_ms": 0.0, "max_ms": 0.0, "peak_kib": 0.0}
+                )
+                r["calls"] += 1
+                r["last_ms"] = elapsed * 1e3
+                r["total_ms"] += r["last_ms"]
+                r["max_ms"] = max(r["max_ms"], r["last_ms"])
+                r["peak_kib"] = max(r["peak_kib"], allocated / 1024)
+
+        def table(self):
+            """Records sorted by total time, slowest first."""
+            with self._lock:
+                return sorted((dict(r) for r in self.records.values()), key=lambda r: -r["total_ms"])
+
+        @_contextmanager
+        def measure(self, key, title="", memory=True):
+            self.start(key, title, memory)
+            try:
+                yield
+            finally:
+                self.stop(key)
+
+        def to_json(self):
+            return _json.dumps({"cells": self.table()}, indent=2)
+
+    _mode = mo.cli_args().get("profile", mo.query_params().get("profile"))
+    profiler = CellProfiler(trace_memory=_mode == "memory") if _mode is not None else None
+
+    def profiled(key, title=""):
+        """Time the enclosed cell body under `key` when profiling; a no-op otherwise."""
+        return profiler.measure(key, title) if profiler is not None else _nullcontext()
+    return CellProfiler, profiled, profiler
+
+
+@app.cell(hide_code=True)
+def course_metadata():
     # Course metadata
     lehrstuhl = "Chair of Logistics and Quantitative Methods"
     vorlesung = "Operations Management"
@@ -449,32 +1623,41 @@ def _():
 
 
 @app.cell(hide_code=True)
-def _(SlideCreator, lehrstuhl, presenter, vorlesung):
+def lazy_mode(mo):
+    # Lazy slides — opt-in: chart-heavy slide content is built just before its slide is shown
+    # (`marimo run capacity.py -- --lazy` or `?lazy=1`)
+    lazy_slides = mo.cli_args().get("lazy", mo.query_params().get("lazy")) is not None
+    return (lazy_slides,)
+
+
+@app.cell(hide_code=True)
+def slide_creator(SlideCreator, lazy_slides, lehrstuhl, presenter, profiler, vorlesung):
     # Initialize slide creator
-    sc = SlideCreator(lehrstuhl, vorlesung, presenter)
+    sc = SlideCreator(lehrstuhl, vorlesung, presenter, profiler=profiler, lazy=lazy_slides)
     return (sc,)
 
 
 @app.cell(hide_code=True)
-def _(sc):
+def title_slide(sc):
     # Title slide
     title_slide = sc.create_title_slide(
         "Capacity Management",
         subtitle="Staffing, Queues, and Trade-offs",
-        page_number=1
+        page_number=1,
+        key="title_slide"
     )
-    sc.styles()
     title_slide.render()
     return
 
 
 @app.cell(hide_code=True)
-def _(sc):
+def section_1(sc):
     # Section 1 separator
     section_1 = sc.create_slide(
         "The Capacity Challenge",
         layout_type="section",
-        page_number=2
+        page_number=2,
+        key="section_1"
     )
     section_1.subtitle = "Section 1"
     section_1.content1 = "Why do queues form? And why does it matter?"
@@ -483,12 +1666,13 @@ def _(sc):
 
 
 @app.cell(hide_code=True)
-def _(mo, sc):
+def slide_1_1(mo, sc):
     # Slide 1.1 — Two pictures, one problem: congestion vs idle capacity
     slide_1_1 = sc.create_slide(
         "Two pictures, one problem",
         layout_type="side-by-side",
-        page_number=3
+        page_number=3,
+        key="slide_1_1"
     )
 
     IMG_PATH = "public/images"
@@ -508,12 +1692,13 @@ def _(mo, sc):
 
 
 @app.cell(hide_code=True)
-def _(mo, sc):
+def slide_1_1b(mo, sc):
     # Slide 1.1b — Discussion prompt
     slide_1_1b = sc.create_slide(
         "Both settings lead to costs of mismatched capacity",
         layout_type="side-by-side",
-        page_number=4
+        page_number=4,
+        key="slide_1_1b"
     )
 
     slide_1_1b.content1 = mo.md(
@@ -545,12 +1730,13 @@ def _(mo, sc):
 
 
 @app.cell(hide_code=True)
-def _(mo, sc):
+def slide_1_2(mo, sc):
     # Slide 1.2 — The question for today
     slide_1_2 = sc.create_slide(
         "The question for today",
         layout_type="1-column",
-        page_number=5
+        page_number=5,
+        key="slide_1_2"
     )
 
     slide_1_2.content1 = mo.md(
@@ -576,12 +1762,13 @@ def _(mo, sc):
 
 
 @app.cell
-def _(sc):
+def section_2(sc):
     # Section 2 separator
     section_2 = sc.create_slide(
         "Queueing Fundamentals",
         layout_type="section",
-        page_number=6
+        page_number=6,
+        key="section_2"
     )
     section_2.subtitle = "Section 2"
     section_2.content1 = "The building blocks: arrivals, service, utilization, and performance"
@@ -590,12 +1777,13 @@ def _(sc):
 
 
 @app.cell(hide_code=True)
-def _(mo, sc):
+def slide_2_1(mo, sc):
     # Slide 2.1 — The basic queueing model (All variables defined here!)
     slide_2_1 = sc.create_slide(
         "The basic queueing model",
         layout_type="1-column",
-        page_number=7
+        page_number=7,
+        key="slide_2_1"
     )
 
     # Queue flow diagram using mermaid with larger size
@@ -634,12 +1822,13 @@ def _(mo, sc):
 
 
 @app.cell(hide_code=True)
-def _(mo, sc):
+def slide_2_2(mo, sc):
     # Slide 2.2 — Measuring queue performance
     slide_2_2 = sc.create_slide(
         "Measuring queue performance",
         layout_type="side-by-side",
-        page_number=8
+        page_number=8,
+        key="slide_2_2"
     )
 
     slide_2_2.content1 = mo.md(
@@ -678,12 +1867,13 @@ def _(mo, sc):
 
 
 @app.cell(hide_code=True)
-def _(mo, sc):
+def slide_2_3(mo, sc):
     # Slide 2.3 — Capacity and utilization
     slide_2_3 = sc.create_slide(
         "Capacity and utilization",
         layout_type="1-column",
-        page_number=9
+        page_number=9,
+        key="slide_2_3"
     )
 
     slide_2_3.content1 = mo.md(
@@ -705,12 +1895,13 @@ def _(mo, sc):
 
 
 @app.cell(hide_code=True)
-def _(mo, sc):
+def slide_2_4(mo, sc):
     # Slide 2.4 — Little's Law
     slide_2_4 = sc.create_slide(
         "Little's Law",
         layout_type="side-by-side",
-        page_number=10
+        page_number=10,
+        key="slide_2_4"
     )
 
     slide_2_4.content1 = mo.md(
@@ -762,12 +1953,13 @@ def _(mo, sc):
 
 
 @app.cell(hide_code=True)
-def _(mo, sc):
+def slide_2_5(mo, sc):
     # Slide 2.5 — Kendall notation
     slide_2_5 = sc.create_slide(
         "Classifying queues: Kendall notation",
         layout_type="side-by-side",
-        page_number=11
+        page_number=11,
+        key="slide_2_5"
     )
 
     slide_2_5.content1 = mo.md(
@@ -807,7 +1999,21 @@ def _(mo, sc):
 
 
 @app.cell(hide_code=True)
-def _(mo):
+async def chart_packages(packages_ready):
+    # Chart packages — placed before the first interactive slide so the slides above render first
+    # (install times are listed on the diagnostics slide)
+    if packages_ready is not None:
+        await packages_ready
+    import altair as alt
+    import polars as pl
+    import numpy as np
+    import warnings
+    warnings.filterwarnings("ignore", message=".*narwhals.*is_pandas_dataframe.*")
+    return alt, np, pl
+
+
+@app.cell(hide_code=True)
+def mm1_sliders(mo):
     # Sliders for slide 2.6 — M/M/1 interactive explorer
     mm1_lambda = mo.ui.slider(1, 15, value=8, label="λ (arrivals/hr)", step=1)
     mm1_mu = mo.ui.slider(5, 20, value=10, label="μ (service rate/hr)", step=1)
@@ -815,12 +2021,13 @@ def _(mo):
 
 
 @app.cell(hide_code=True)
-def _(mm1_lambda, mm1_mu, mo, sc):
+def slide_2_6(mm1_lambda, mm1_mu, mo, queue_cache, sc):
     # Slide 2.6 — M/M/1 formulas with interactive explorer
     slide_2_6 = sc.create_slide(
         "M/M/1: Queue metrics from steady-state solution",
         layout_type="side-by-side",
-        page_number=12
+        page_number=12,
+        key="slide_2_6"
     )
 
     slide_2_6.content1 = mo.md(
@@ -842,16 +2049,13 @@ def _(mm1_lambda, mm1_mu, mo, sc):
     _mu = mm1_mu.value
     _rho = _lam / _mu  # Always show utilization, even if > 100%
     _stable = _lam < _mu
+    _m = queue_cache(_lam, _mu, 1)  # M/M/1 = M/M/s with s = 1
 
     if _stable:
-        _W_min = (1 / (_mu - _lam)) * 60
-        _Wq_min = (_rho / (_mu - _lam)) * 60
-        _L = _rho / (1 - _rho)
-        _Lq = (_rho ** 2) / (1 - _rho)
-        _W_str = f"{_W_min:.1f} min"
-        _Wq_str = f"{_Wq_min:.1f} min"
-        _L_str = f"{_L:.1f}"
-        _Lq_str = f"{_Lq:.1f}"
+        _W_str = f"{_m.W * 60:.1f} min"
+        _Wq_str = f"{_m.Wq * 60:.1f} min"
+        _L_str = f"{_m.L:.1f}"
+        _Lq_str = f"{_m.Lq:.1f}"
     else:
         _W_str = "∞"
         _Wq_str = "∞"
@@ -860,7 +2064,7 @@ def _(mm1_lambda, mm1_mu, mo, sc):
 
     # Little's Law check: L = λW
     if _stable:
-        _W_hours = 1 / (_mu - _lam)  # W in hours
+        _W_hours = float(_m.W)  # W in hours
         _L_from_littles = _lam * _W_hours
         _littles_check = f"**Little's Law check:** L = λ × W = {_lam} × {_W_hours:.3f} = {_L_from_littles:.1f} ✓"
     else:
@@ -887,7 +2091,7 @@ def _(mm1_lambda, mm1_mu, mo, sc):
 
 
 @app.cell(hide_code=True)
-def _(mo):
+def stability_sliders(mo):
     # Sliders for Slide 2.7 — Stability (M/M/1 context: s=1)
     stability_lambda = mo.ui.slider(5, 20, value=8, label="λ (arrivals/hr)", step=1)
     stability_mu = mo.ui.slider(5, 20, value=10, label="μ (service rate/hr)", step=1)
@@ -895,12 +2099,13 @@ def _(mo):
 
 
 @app.cell(hide_code=True)
-def _(mo, sc, stability_lambda, stability_mu):
+def slide_2_7(mo, sc, stability_lambda, stability_mu):
     # Slide 2.7 — Stability: When do queues explode?
     slide_2_7 = sc.create_slide(
         "Stability: when do queues explode?",
         layout_type="side-by-side",
-        page_number=13
+        page_number=13,
+        key="slide_2_7"
     )
 
     slide_2_7.content1 = mo.md(
@@ -944,67 +2149,18 @@ def _(mo, sc, stability_lambda, stability_mu):
 
 
 @app.cell(hide_code=True)
-def _(alt, mo, np, pl, sc):
+def slide_2_8(VegaLite, mo, sc, static_chart):
     # Slide 2.8 — The nonlinearity insight
     slide_2_8 = sc.create_slide(
         "The nonlinearity insight",
         layout_type="side-by-side",
-        page_number=14
-    )
-
-    # Create data for the nonlinearity plot with all metrics for tooltip
-    _mu = 10  # customers per hour
-    rho_values = np.linspace(0.01, 0.99, 100)
-    L_values = rho_values / (1 - rho_values)  # M/M/1 formula for L
-    Lq_values = rho_values**2 / (1 - rho_values)  # M/M/1 formula for Lq
-    # Little's Law: W = L/λ, Wq = Lq/λ, where λ = ρ × μ
-    W_values = L_values / (rho_values * _mu) * 60  # in minutes
-    Wq_values = Lq_values / (rho_values * _mu) * 60  # in minutes
-
-    df_nonlinear = pl.DataFrame({
-        "rho": np.round(rho_values, 2),
-        "L": np.round(L_values, 2),
-        "Lq": np.round(Lq_values, 2),
-        "W": np.round(W_values, 1),
-        "Wq": np.round(Wq_values, 1)
-    })
-
-    nonlinear_chart = alt.Chart(df_nonlinear.to_pandas()).mark_line(strokeWidth=3, color="#2563eb").encode(
-        x=alt.X("rho:Q", title="Utilization (ρ)", scale=alt.Scale(domain=[0, 1])),
-        y=alt.Y("L:Q", title="Avg customers in system (L)", scale=alt.Scale(domain=[0, 30])),
-        tooltip=[
-            alt.Tooltip("rho:Q", title="ρ (utilization)", format=".0%"),
-            alt.Tooltip("L:Q", title="L (avg in system)"),
-            alt.Tooltip("W:Q", title="W (avg time, min)"),
-            alt.Tooltip("Lq:Q", title="Lq (avg in queue)"),
-            alt.Tooltip("Wq:Q", title="Wq (avg wait, min)"),
-        ]
-    ).properties(
-        width=500,
-        height=350,
-        title="Performance degrades nonlinearly as ρ → 1"
-    )
-
-    # Add reference points
-    ref_points = pl.DataFrame({
-        "rho": [0.5, 0.8, 0.9, 0.95],
-        "L": [1.0, 4.0, 9.0, 19.0],
-        "label": ["ρ=0.5: L=1", "ρ=0.8: L=4", "ρ=0.9: L=9", "ρ=0.95: L=19"]
-    })
-
-    points = alt.Chart(ref_points.to_pandas()).mark_point(size=100, color="red", filled=True).encode(
-        x="rho:Q",
-        y="L:Q"
-    )
-
-    labels = alt.Chart(ref_points.to_pandas()).mark_text(align="right", dx=-10, fontSize=12).encode(
-        x="rho:Q",
-        y="L:Q",
-        text="label:N"
+        page_number=14,
+        key="slide_2_8"
     )
 
+    # M/M/1 curve L(ρ) with reference points, prebuilt at deploy time (see static_charts)
     slide_2_8.content1 = mo.vstack([
-        mo.ui.altair_chart(nonlinear_chart + points + labels)
+        VegaLite(static_chart("nonlinearity"))
     ])
 
     slide_2_8.content2 = mo.md(
@@ -1031,12 +2187,13 @@ def _(alt, mo, np, pl, sc):
 
 
 @app.cell
-def _(sc):
+def section_3(sc):
     # Section 3 separator
     section_3 = sc.create_slide(
         "Design Levers",
         layout_type="section",
-        page_number=15
+        page_number=15,
+        key="section_3"
     )
     section_3.subtitle = "Section 3"
     section_3.content1 = "Pooling, standardization, and the efficiency-responsiveness frontier"
@@ -1045,19 +2202,20 @@ def _(sc):
 
 
 @app.cell
-def _(mo):
+def tradeoff_slider(mo):
     # Slider for Slide 3.1 — Trade-off explorer (ρ slider for smooth curve)
     tradeoff_rho = mo.ui.slider(0.1, 0.95, value=0.5, label="ρ (utilization)", step=0.05)
     return (tradeoff_rho,)
 
 
 @app.cell(hide_code=True)
-def _(alt, mo, np, pl, sc, tradeoff_rho):
+def slide_3_1(VegaLite, mo, sc, static_chart, tradeoff_rho, with_data):
     # Slide 3.1 — The efficiency-responsiveness trade-off
     slide_3_1 = sc.create_slide(
         "The efficiency-responsiveness trade-off",
         layout_type="side-by-side",
-        page_number=16
+        page_number=16,
+        key="slide_3_1"
     )
 
     slide_3_1.content1 = mo.md(
@@ -1079,62 +2237,17 @@ def _(alt, mo, np, pl, sc, tradeoff_rho):
         """
     )
 
-    # Interactive trade-off plot using L (avg in system) - same curve as slide 2.8
-    _mu = 10  # customers per hour
-    _rho_values = np.linspace(0.01, 0.99, 100)
-    _L_values = _rho_values / (1 - _rho_values)  # M/M/1 formula for L
-    _Lq_values = _rho_values**2 / (1 - _rho_values)  # M/M/1 formula for Lq
-    _W_values = _L_values / (_rho_values * _mu) * 60  # in minutes
-    _Wq_values = _Lq_values / (_rho_values * _mu) * 60  # in minutes
-
-    df_curve = pl.DataFrame({
-        "rho": np.round(_rho_values, 2),
-        "L": np.round(_L_values, 2),
-        "Lq": np.round(_Lq_values, 2),
-        "W": np.round(_W_values, 1),
-        "Wq": np.round(_Wq_values, 1)
-    })
-
-    # Current operating point from slider
+    # Static curve and point marks (prebuilt, cached); a slider move only sends the one-row "point" data
     _current_rho = tradeoff_rho.value
     _current_L = _current_rho / (1 - _current_rho)
-
-    df_point = pl.DataFrame({
-        "rho": [_current_rho],
-        "L": [_current_L],
-        "label": [f"ρ={_current_rho:.0%}"]
-    })
-
-    # Create the chart - same style as slide 2.8
-    frontier_line = alt.Chart(df_curve.to_pandas()).mark_line(
-        strokeWidth=3, color="#2563eb"
-    ).encode(
-        x=alt.X("rho:Q", title="Utilization (ρ)", scale=alt.Scale(domain=[0, 1])),
-        y=alt.Y("L:Q", title="Avg customers in system (L)", scale=alt.Scale(domain=[0, 30])),
-        tooltip=[
-            alt.Tooltip("rho:Q", title="ρ (utilization)", format=".0%"),
-            alt.Tooltip("L:Q", title="L (avg in system)"),
-            alt.Tooltip("W:Q", title="W (avg time, min)"),
-            alt.Tooltip("Lq:Q", title="Lq (avg in queue)"),
-            alt.Tooltip("Wq:Q", title="Wq (avg wait, min)"),
-        ]
-    )
-
-    current_point = alt.Chart(df_point.to_pandas()).mark_point(
-        size=200, color="red", filled=True
-    ).encode(x="rho:Q", y="L:Q")
-
-    point_label = alt.Chart(df_point.to_pandas()).mark_text(
-        align="right", dx=-10, dy=-10, fontSize=14, fontWeight="bold"
-    ).encode(x="rho:Q", y="L:Q", text="label:N")
-
-    tradeoff_chart = (frontier_line + current_point + point_label).properties(
-        width=450, height=350, title="Moving along the frontier"
+    tradeoff_chart = with_data(
+        static_chart("frontier"),
+        point=[{"rho": _current_rho, "L": _current_L, "label": f"ρ={_current_rho:.0%}"}],
     )
 
     slide_3_1.content2 = mo.vstack([
         tradeoff_rho,
-        mo.ui.altair_chart(tradeoff_chart),
+        VegaLite(tradeoff_chart),
         mo.md(f"**Current:** ρ={_current_rho:.0%}, L={_current_L:.1f} customers")
     ])
 
@@ -1143,12 +2256,13 @@ def _(alt, mo, np, pl, sc, tradeoff_rho):
 
 
 @app.cell(hide_code=True)
-def _(mo, sc):
+def slide_3_2(mo, sc):
     # Slide 3.2 — Two queue configurations (discussion)
     slide_3_2 = sc.create_slide(
         "Two ways to organize queues",
         layout_type="side-by-side",
-        page_number=17
+        page_number=17,
+        key="slide_3_2"
     )
 
     # Diagram: Separate queues (one queue per server) - vertical layout, bottom aligned
@@ -1225,7 +2339,7 @@ def _(mo, sc):
 
 
 @app.cell
-def _(mo):
+def pooling_checkboxes(mo):
     # Checkboxes for Slide 3.2b — Compare queue configurations
     show_separate = mo.ui.checkbox(value=True, label="Separate queues (s independent M/M/1)")
     show_pooled = mo.ui.checkbox(value=False, label="Pooled queue (M/M/s)")
@@ -1233,31 +2347,18 @@ def _(mo):
 
 
 @app.cell(hide_code=True)
-def _(alt, math, mo, np, pl, sc, show_pooled, show_separate):
+def slide_3_2b(alt, mo, np, pl, queue_cache, sc, show_pooled, show_separate):
     # Slide 3.2b — Interactive comparison: separate vs pooled queues
     slide_3_2b = sc.create_slide(
         "Comparing queue configurations",
         layout_type="side-by-side",
-        page_number=18
+        page_number=18,
+        key="slide_3_2b"
     )
 
     # Fixed number of servers for comparison
     s = 3  # 3 servers in both configurations
 
-    # Helper function: Erlang-C probability (probability of waiting in M/M/s)
-    def erlang_c(s, rho):
-        """Calculate Erlang-C probability for M/M/s queue."""
-        if rho >= 1:
-            return 1.0  # Unstable
-        a = s * rho  # offered load
-        # Calculate P0 (probability of empty system)
-        sum_term = sum((a ** k) / math.factorial(k) for k in range(s))
-        last_term = (a ** s) / (math.factorial(s) * (1 - rho))
-        p0 = 1.0 / (sum_term + last_term)
-        # Erlang-C = probability of waiting
-        c = ((a ** s) / math.factorial(s)) * (1 / (1 - rho)) * p0
-        return c
-
     # Calculate all metrics for both configurations across ρ values
     _rho_values = np.linspace(0.05, 0.95, 50)
     _mu = 10  # Service rate (customers/hour)
@@ -1274,65 +2375,62 @@ def _(alt, math, mo, np, pl, sc, show_pooled, show_separate):
         return L, Lq, W, Wq
 
     def calc_pooled_metrics(rho):
-        """Calculate metrics for M/M/s pooled queue."""
-        c = erlang_c(s, rho)
-        Lq = c * rho / (1 - rho)
-        L = Lq + s * rho  # L = Lq + average number in service
+        """Calculate metrics for M/M/s pooled queue (Erlang-C, via the shared cache)."""
         # Total arrival rate λ = s × ρ × μ
-        lam = s * rho * _mu
-        W = L / lam * 60  # in minutes
-        Wq = Lq / lam * 60  # in minutes
-        return L, Lq, W, Wq
-
-    # Build dataframe for plotting with all metrics
-    data_rows = []
-    if show_separate.value:
-        for rho in _rho_values:
-            L, Lq, W, Wq = calc_separate_metrics(rho)
-            data_rows.append({
-                "rho": round(rho, 2), "L": round(L, 2), "Lq": round(Lq, 2),
-                "W": round(W, 1), "Wq": round(Wq, 1), "System": "Separate queues"
-            })
-    if show_pooled.value:
-        for rho in _rho_values:
-            L, Lq, W, Wq = calc_pooled_metrics(rho)
-            data_rows.append({
-                "rho": round(rho, 2), "L": round(L, 2), "Lq": round(Lq, 2),
-                "W": round(W, 1), "Wq": round(Wq, 1), "System": "Pooled queue"
-            })
-
-    if data_rows:
-        df_compare = pl.DataFrame(data_rows)
-
-        comparison_chart = alt.Chart(df_compare.to_pandas()).mark_line(strokeWidth=3).encode(
-            x=alt.X("rho:Q", title="Utilization (ρ)", scale=alt.Scale(domain=[0, 1])),
-            y=alt.Y("L:Q", title="Avg customers in system (L)", scale=alt.Scale(domain=[0, 30])),
-            color=alt.Color("System:N",
-                scale=alt.Scale(
-                    domain=["Separate queues", "Pooled queue"],
-                    range=["#dc2626", "#2563eb"]  # Red for separate, Blue for pooled
+        m = queue_cache(s * rho * _mu, _mu, s)
+        return m.L, m.Lq, m.W * 60, m.Wq * 60  # W, Wq in minutes
+
+    def _chart():
+        # Build dataframe for plotting with all metrics (whole ρ grid at once)
+        data_rows = []
+        for _show, _calc, _label in [
+            (show_separate.value, calc_separate_metrics, "Separate queues"),
+            (show_pooled.value, calc_pooled_metrics, "Pooled queue"),
+        ]:
+            if _show:
+                _L, _Lq, _W, _Wq = _calc(_rho_values)
+                data_rows.append(pl.DataFrame({
+                    "rho": np.round(_rho_values, 2), "L": np.round(_L, 2), "Lq": np.round(_Lq, 2),
+                    "W": np.round(_W, 1), "Wq": np.round(_Wq, 1), "System": _label
+                }))
+
+        if data_rows:
+            df_compare = pl.concat(data_rows)
+
+            comparison_chart = alt.Chart(df_compare).mark_line(strokeWidth=3).encode(
+                x=alt.X("rho:Q", title="Utilization (ρ)", scale=alt.Scale(domain=[0, 1])),
+                y=alt.Y("L:Q", title="Avg customers in system (L)", scale=alt.Scale(domain=[0, 30])),
+                color=alt.Color("System:N",
+                    scale=alt.Scale(
+                        domain=["Separate queues", "Pooled queue"],
+                        range=["#dc2626", "#2563eb"]  # Red for separate, Blue for pooled
+                    ),
+                    legend=alt.Legend(orient="bottom", title=None)
                 ),
-                legend=alt.Legend(orient="bottom", title=None)
-            ),
-            strokeDash=alt.StrokeDash("System:N",
-                scale=alt.Scale(
-                    domain=["Separate queues", "Pooled queue"],
-                    range=[[1, 0], [1, 0]]  # Solid lines for both
+                strokeDash=alt.StrokeDash("System:N",
+                    scale=alt.Scale(
+                        domain=["Separate queues", "Pooled queue"],
+                        range=[[1, 0], [1, 0]]  # Solid lines for both
+                    ),
+                    legend=None  # Hide duplicate legend for strokeDash
                 ),
-                legend=None  # Hide duplicate legend for strokeDash
-            ),
-            tooltip=[
-                alt.Tooltip("rho:Q", title="ρ (utilization)", format=".0%"),
-                alt.Tooltip("L:Q", title="L (avg in system)"),
-                alt.Tooltip("W:Q", title="W (avg time, min)"),
-                alt.Tooltip("Lq:Q", title="Lq (avg in queue)"),
-                alt.Tooltip("Wq:Q", title="Wq (avg wait, min)"),
-            ]
-        ).properties(width=450, height=300, title=f"Separate vs Pooled queues (s = {s} servers)")
+                tooltip=[
+                    alt.Tooltip("rho:Q", title="ρ (utilization)", format=".0%"),
+                    alt.Tooltip("L:Q", title="L (avg in system)"),
+                    alt.Tooltip("W:Q", title="W (avg time, min)"),
+                    alt.Tooltip("Lq:Q", title="Lq (avg in queue)"),
+                    alt.Tooltip("Wq:Q", title="Wq (avg wait, min)"),
+                ]
+            ).properties(width=450, height=300, title=f"Separate vs Pooled queues (s = {s} servers)")
 
-        chart_display = mo.ui.altair_chart(comparison_chart)
-    else:
-        chart_display = mo.md("*Select at least one system to display*")
+            chart_display = mo.ui.altair_chart(comparison_chart)
+        else:
+            chart_display = mo.md("*Select at least one system to display*")
+
+        return chart_display
+
+    # Chart-heavy part: deferred in lazy mode
+    chart_display = sc.defer(slide_3_2b, _chart, show_separate.value, show_pooled.value)
 
     intro_text = mo.md(
         f"""
@@ -1386,65 +2484,69 @@ def _(alt, math, mo, np, pl, sc, show_pooled, show_separate):
 
 
 @app.cell(hide_code=True)
-def _(mo, sc):
+def slide_3_3(mo, sc):
     # Slide 3.3 — Three service environments (visual comparison)
     slide_3_3 = sc.create_slide(
         "Three service environments",
         layout_type="1-column",
-        page_number=19
+        page_number=19,
+        key="slide_3_3"
     )
 
-    # Visual diagrams showing service time distributions (fixed width for consistency)
-    deterministic_diagram = mo.Html("""
-    <div style="text-align: center; padding: 12px; background: #f0fdf4; border-radius: 8px; border: 2px solid #22c55e; width: 280px;">
-        <div style="font-weight: bold; color: #166534; margin-bottom: 8px;">Standardized Process</div>
-        <div style="font-size: 12px; color: #666; margin-bottom: 8px;">e.g., Self-checkout kiosk</div>
-        <div style="display: flex; justify-content: center; align-items: flex-end; gap: 4px; height: 60px;">
-            <div style="width: 20px; height: 40px; background: #22c55e;"></div>
-            <div style="width: 20px; height: 40px; background: #22c55e;"></div>
-            <div style="width: 20px; height: 40px; background: #22c55e;"></div>
-            <div style="width: 20px; height: 40px; background: #22c55e;"></div>
-            <div style="width: 20px; height: 40px; background: #22c55e;"></div>
-            <div style="width: 20px; height: 40px; background: #22c55e;"></div>
+    def _diagrams():
+        # Visual diagrams showing service time distributions (fixed width for consistency)
+        deterministic_diagram = mo.Html("""
+        <div style="text-align: center; padding: 12px; background: #f0fdf4; border-radius: 8px; border: 2px solid #22c55e; width: 280px;">
+            <div style="font-weight: bold; color: #166534; margin-bottom: 8px;">Standardized Process</div>
+            <div style="font-size: 12px; color: #666; margin-bottom: 8px;">e.g., Self-checkout kiosk</div>
+            <div style="display: flex; justify-content: center; align-items: flex-end; gap: 4px; height: 60px;">
+                <div style="width: 20px; height: 40px; background: #22c55e;"></div>
+                <div style="width: 20px; height: 40px; background: #22c55e;"></div>
+                <div style="width: 20px; height: 40px; background: #22c55e;"></div>
+                <div style="width: 20px; height: 40px; background: #22c55e;"></div>
+                <div style="width: 20px; height: 40px; background: #22c55e;"></div>
+                <div style="width: 20px; height: 40px; background: #22c55e;"></div>
+            </div>
+            <div style="font-size: 11px; color: #666; margin-top: 4px;">Every customer: exactly 6 min</div>
+            <div style="font-weight: bold; color: #166534; margin-top: 4px;">CV = 0</div>
         </div>
-        <div style="font-size: 11px; color: #666; margin-top: 4px;">Every customer: exactly 6 min</div>
-        <div style="font-weight: bold; color: #166534; margin-top: 4px;">CV = 0</div>
-    </div>
-    """)
-
-    standard_diagram = mo.Html("""
-    <div style="text-align: center; padding: 12px; background: #fefce8; border-radius: 8px; border: 2px solid #eab308; width: 280px;">
-        <div style="font-weight: bold; color: #854d0e; margin-bottom: 8px;">Typical Service</div>
-        <div style="font-size: 12px; color: #666; margin-bottom: 8px;">e.g., Regular pharmacy counter</div>
-        <div style="display: flex; justify-content: center; align-items: flex-end; gap: 4px; height: 60px;">
-            <div style="width: 20px; height: 25px; background: #eab308;"></div>
-            <div style="width: 20px; height: 50px; background: #eab308;"></div>
-            <div style="width: 20px; height: 35px; background: #eab308;"></div>
-            <div style="width: 20px; height: 55px; background: #eab308;"></div>
-            <div style="width: 20px; height: 30px; background: #eab308;"></div>
-            <div style="width: 20px; height: 45px; background: #eab308;"></div>
+        """)
+
+        standard_diagram = mo.Html("""
+        <div style="text-align: center; padding: 12px; background: #fefce8; border-radius: 8px; border: 2px solid #eab308; width: 280px;">
+            <div style="font-weight: bold; color: #854d0e; margin-bottom: 8px;">Typical Service</div>
+            <div style="font-size: 12px; color: #666; margin-bottom: 8px;">e.g., Regular pharmacy counter</div>
+            <div style="display: flex; justify-content: center; align-items: flex-end; gap: 4px; height: 60px;">
+                <div style="width: 20px; height: 25px; background: #eab308;"></div>
+                <div style="width: 20px; height: 50px; background: #eab308;"></div>
+                <div style="width: 20px; height: 35px; background: #eab308;"></div>
+                <div style="width: 20px; height: 55px; background: #eab308;"></div>
+                <div style="width: 20px; height: 30px; background: #eab308;"></div>
+                <div style="width: 20px; height: 45px; background: #eab308;"></div>
+            </div>
+            <div style="font-size: 11px; color: #666; margin-top: 4px;">Average 6 min, moderate variation</div>
+            <div style="font-weight: bold; color: #854d0e; margin-top: 4px;">CV = 1</div>
         </div>
-        <div style="font-size: 11px; color: #666; margin-top: 4px;">Average 6 min, moderate variation</div>
-        <div style="font-weight: bold; color: #854d0e; margin-top: 4px;">CV = 1</div>
-    </div>
-    """)
-
-    high_var_diagram = mo.Html("""
-    <div style="text-align: center; padding: 12px; background: #fef2f2; border-radius: 8px; border: 2px solid #dc2626; width: 280px;">
-        <div style="font-weight: bold; color: #991b1b; margin-bottom: 8px;">Unpredictable Service</div>
-        <div style="font-size: 12px; color: #666; margin-bottom: 8px;">e.g., Mixed quick pickups + complex cases</div>
-        <div style="display: flex; justify-content: center; align-items: flex-end; gap: 4px; height: 60px;">
-            <div style="width: 20px; height: 10px; background: #dc2626;"></div>
-            <div style="width: 20px; height: 60px; background: #dc2626;"></div>
-            <div style="width: 20px; height: 15px; background: #dc2626;"></div>
-            <div style="width: 20px; height: 55px; background: #dc2626;"></div>
-            <div style="width: 20px; height: 8px; background: #dc2626;"></div>
-            <div style="width: 20px; height: 50px; background: #dc2626;"></div>
+        """)
+
+        high_var_diagram = mo.Html("""
+        <div style="text-align: center; padding: 12px; background: #fef2f2; border-radius: 8px; border: 2px solid #dc2626; width: 280px;">
+            <div style="font-weight: bold; color: #991b1b; margin-bottom: 8px;">Unpredictable Service</div>
+            <div style="font-size: 12px; color: #666; margin-bottom: 8px;">e.g., Mixed quick pickups + complex cases</div>
+            <div style="display: flex; justify-content: center; align-items: flex-end; gap: 4px; height: 60px;">
+                <div style="width: 20px; height: 10px; background: #dc2626;"></div>
+                <div style="width: 20px; height: 60px; background: #dc2626;"></div>
+                <div style="width: 20px; height: 15px; background: #dc2626;"></div>
+                <div style="width: 20px; height: 55px; background: #dc2626;"></div>
+                <div style="width: 20px; height: 8px; background: #dc2626;"></div>
+                <div style="width: 20px; height: 50px; background: #dc2626;"></div>
+            </div>
+            <div style="font-size: 11px; color: #666; margin-top: 4px;">Average 6 min, but 1 min to 15 min range</div>
+            <div style="font-weight: bold; color: #991b1b; margin-top: 4px;">CV = 1.5</div>
         </div>
-        <div style="font-size: 11px; color: #666; margin-top: 4px;">Average 6 min, but 1 min to 15 min range</div>
-        <div style="font-weight: bold; color: #991b1b; margin-top: 4px;">CV = 1.5</div>
-    </div>
-    """)
+        """)
+
+        return mo.hstack([deterministic_diagram, standard_diagram, high_var_diagram], justify="space-around", gap=2)
 
     slide_3_3.content1 = mo.vstack([
         mo.md("""
@@ -1454,7 +2556,8 @@ def _(mo, sc):
 
         **Coefficient of Variation (CV)** = standard deviation / mean
         """),
-        mo.hstack([deterministic_diagram, standard_diagram, high_var_diagram], justify="space-around", gap=2),
+        # Large inline HTML: deferred in lazy mode
+        sc.defer(slide_3_3, _diagrams),
     ])
 
     slide_3_3.render()
@@ -1462,21 +2565,62 @@ def _(mo, sc):
 
 
 @app.cell(hide_code=True)
-def _(mo):
+def observed_service(ServiceStats, mo, open_log, profiled):
+    # Observed service variability for Slide 3.3b — from public/service_times.parquet when it exists
+    with profiled("observed_service", "Observed service CV (slide 3.3b)"):
+        _log = open_log(mo.notebook_location() / "public" / "service_times.parquet")
+        observed_cv = float(ServiceStats(by=()).update(_log).summary()["cv"][0]) if _log is not None else None
+    return (observed_cv,)
+
+
+@app.cell(hide_code=True)
+def variability_checkboxes(mo, observed_cv):
     # Checkboxes for Slide 3.3b — Compare variability settings
     show_cv_0 = mo.ui.checkbox(value=False, label="CV = 0 (deterministic)")
     show_cv_1 = mo.ui.checkbox(value=True, label="CV = 1 (standard)")
     show_cv_15 = mo.ui.checkbox(value=False, label="CV = 1.5 (high variability)")
-    return show_cv_0, show_cv_1, show_cv_15
+    show_cv_obs = mo.ui.checkbox(value=False, label=f"CV = {observed_cv:.2f} (observed)" if observed_cv is not None else "Observed")
+    show_var_sim = mo.ui.checkbox(value=False, label="Simulated points")
+    return show_cv_0, show_cv_1, show_cv_15, show_cv_obs, show_var_sim
+
+
+@app.cell(hide_code=True)
+def variability_simulation(exponential, gamma_cv, pl, profiled, show_var_sim, simulate_lindley):
+    # Simulated points for Slide 3.3b — G/G/1 via the Lindley recursion, Poisson arrivals
+    with profiled("df_var_sim", "Simulated points (slide 3.3b)"):
+        _mu = 10  # customers per hour
+        _sim_rows = []
+        if show_var_sim.value:
+            for _cv, _label in [(0, "CV = 0 (deterministic)"), (1, "CV = 1 (standard)"), (1.5, "CV = 1.5 (high var)")]:
+                for _rho in (0.5, 0.7, 0.8, 0.9):
+                    _r = simulate_lindley(exponential(_rho * _mu), gamma_cv(1 / _mu, _cv), n_customers=400_000, seed=42)
+                    _sim_rows.append({"rho": _rho, "L": round(_r.L, 2), "Setting": _label})
+        df_var_sim = pl.DataFrame(_sim_rows, schema={"rho": pl.Float64, "L": pl.Float64, "Setting": pl.String})
+    return (df_var_sim,)
 
 
 @app.cell(hide_code=True)
-def _(alt, mo, np, pl, sc, show_cv_0, show_cv_1, show_cv_15):
+def slide_3_3b(
+    alt,
+    df_var_sim,
+    mo,
+    np,
+    observed_cv,
+    pl,
+    queue_cache,
+    sc,
+    show_cv_0,
+    show_cv_1,
+    show_cv_15,
+    show_cv_obs,
+    show_var_sim,
+):
     # Slide 3.3b — Variability explorer (interactive comparison)
     slide_3_3b = sc.create_slide(
         "Comparing variability levels",
         layout_type="side-by-side",
-        page_number=20
+        page_number=20,
+        key="slide_3_3b"
     )
 
     # Calculate L for different CV values
@@ -1485,69 +2629,85 @@ def _(alt, mo, np, pl, sc, show_cv_0, show_cv_1, show_cv_15):
     rho_vals = np.linspace(0.05, 0.95, 50)
     cv_a = 1  # Fixed arrival variability (Poisson)
 
-    def calc_L(rho, cv_s):
-        """Calculate L using Kingman-based approximation."""
-        variability_factor = (cv_a**2 + cv_s**2) / 2
-        Lq = (rho**2 / (1 - rho)) * variability_factor
-        return Lq + rho
-
     # Build data for plotting with all metrics for tooltip
     # Using Little's Law: W = L/λ, and λ = ρ × μ, with μ = 10/hour
     _mu = 10  # customers per hour
 
     def calc_all_metrics(rho, cv_s):
-        """Calculate L, Lq, W, Wq using Kingman-based approximation."""
-        variability_factor = (cv_a**2 + cv_s**2) / 2
-        Lq = (rho**2 / (1 - rho)) * variability_factor
-        L = Lq + rho
-        # Little's Law: W = L/λ, Wq = Lq/λ, where λ = ρ × μ
-        lam = rho * _mu
-        W = L / lam * 60  # in minutes
-        Wq = Lq / lam * 60  # in minutes
-        return L, Lq, W, Wq
+        """Calculate L, Lq, W, Wq using Kingman-based approximation (via the shared cache)."""
+        # Kingman scales the M/M/1 queue by (CVa² + CVs²)/2; CVa = 1 matches the cache
+        m = queue_cache(rho * _mu, _mu, 1, cv_s)
+        return m.L, m.Lq, m.W * 60, m.Wq * 60  # W, Wq in minutes
 
-    var_data_rows = []
-    if show_cv_0.value:
-        for _rho in rho_vals:
-            _L, _Lq, _W, _Wq = calc_all_metrics(_rho, 0)
-            var_data_rows.append({"rho": round(_rho, 2), "L": round(_L, 2), "Lq": round(_Lq, 2),
-                                  "W": round(_W, 1), "Wq": round(_Wq, 1), "Setting": "CV = 0 (deterministic)"})
-    if show_cv_1.value:
-        for _rho in rho_vals:
-            _L, _Lq, _W, _Wq = calc_all_metrics(_rho, 1)
-            var_data_rows.append({"rho": round(_rho, 2), "L": round(_L, 2), "Lq": round(_Lq, 2),
-                                  "W": round(_W, 1), "Wq": round(_Wq, 1), "Setting": "CV = 1 (standard)"})
-    if show_cv_15.value:
-        for _rho in rho_vals:
-            _L, _Lq, _W, _Wq = calc_all_metrics(_rho, 1.5)
-            var_data_rows.append({"rho": round(_rho, 2), "L": round(_L, 2), "Lq": round(_Lq, 2),
-                                  "W": round(_W, 1), "Wq": round(_Wq, 1), "Setting": "CV = 1.5 (high var)"})
-
-    if var_data_rows:
-        df_var = pl.DataFrame(var_data_rows)
-
-        var_chart = alt.Chart(df_var.to_pandas()).mark_line(strokeWidth=3).encode(
-            x=alt.X("rho:Q", title="Utilization (ρ)", scale=alt.Scale(domain=[0, 1])),
-            y=alt.Y("L:Q", title="Avg customers in system (L)", scale=alt.Scale(domain=[0, 30])),
-            color=alt.Color("Setting:N",
-                scale=alt.Scale(
-                    domain=["CV = 0 (deterministic)", "CV = 1 (standard)", "CV = 1.5 (high var)"],
-                    range=["#22c55e", "#eab308", "#dc2626"]
+    def calc_L(rho, cv_s):
+        """Calculate L using Kingman-based approximation."""
+        return calc_all_metrics(rho, cv_s)[0]
+
+    def _chart():
+        var_data_rows = []
+        _shown = []
+        for _show, _cv, _label in [
+            (show_cv_0.value, 0, "CV = 0 (deterministic)"),
+            (show_cv_1.value, 1, "CV = 1 (standard)"),
+            (show_cv_15.value, 1.5, "CV = 1.5 (high var)"),
+            # Only offered when a service-time log is available
+            (show_cv_obs.value and observed_cv is not None, observed_cv, "Observed"),
+        ]:
+            if _show:
+                _shown.append(_label)
+                _L, _Lq, _W, _Wq = calc_all_metrics(rho_vals, _cv)
+                var_data_rows.append(pl.DataFrame({
+                    "rho": np.round(rho_vals, 2), "L": np.round(_L, 2), "Lq": np.round(_Lq, 2),
+                    "W": np.round(_W, 1), "Wq": np.round(_Wq, 1), "Setting": _label
+                }))
+
+        if var_data_rows:
+            df_var = pl.concat(var_data_rows)
+
+            var_chart = alt.Chart(df_var).mark_line(strokeWidth=3).encode(
+                x=alt.X("rho:Q", title="Utilization (ρ)", scale=alt.Scale(domain=[0, 1])),
+                y=alt.Y("L:Q", title="Avg customers in system (L)", scale=alt.Scale(domain=[0, 30])),
+                color=alt.Color("Setting:N",
+                    scale=alt.Scale(
+                        domain=["CV = 0 (deterministic)", "CV = 1 (standard)", "CV = 1.5 (high var)",
+                                *(["Observed"] if observed_cv is not None else [])],
+                        range=["#22c55e", "#eab308", "#dc2626", "#2563eb"]
+                    ),
+                    legend=alt.Legend(orient="bottom", title=None)
                 ),
-                legend=alt.Legend(orient="bottom", title=None)
-            ),
-            tooltip=[
-                alt.Tooltip("rho:Q", title="ρ (utilization)", format=".0%"),
-                alt.Tooltip("L:Q", title="L (avg in system)"),
-                alt.Tooltip("W:Q", title="W (avg time, min)"),
-                alt.Tooltip("Lq:Q", title="Lq (avg in queue)"),
-                alt.Tooltip("Wq:Q", title="Wq (avg wait, min)"),
-            ]
-        ).properties(width=450, height=300, title="Impact of service time variability")
-
-        var_chart_display = mo.ui.altair_chart(var_chart)
-    else:
-        var_chart_display = mo.md("*Select at least one setting to display*")
+                tooltip=[
+                    alt.Tooltip("rho:Q", title="ρ (utilization)", format=".0%"),
+                    alt.Tooltip("L:Q", title="L (avg in system)"),
+                    alt.Tooltip("W:Q", title="W (avg time, min)"),
+                    alt.Tooltip("Lq:Q", title="Lq (avg in queue)"),
+                    alt.Tooltip("Wq:Q", title="Wq (avg wait, min)"),
+                ]
+            ).properties(width=450, height=300, title="Impact of service time variability")
+
+            # Simulated L (hollow points) should sit on the Kingman curves
+            _df_sim_shown = df_var_sim.filter(pl.col("Setting").is_in(_shown))
+            if _df_sim_shown.height:
+                var_chart = var_chart + alt.Chart(_df_sim_shown).mark_point(size=80, strokeWidth=2).encode(
+                    x="rho:Q",
+                    y="L:Q",
+                    color=alt.Color("Setting:N", legend=None),
+                    tooltip=[
+                        alt.Tooltip("rho:Q", title="ρ (utilization)", format=".0%"),
+                        alt.Tooltip("L:Q", title="L (simulated)"),
+                    ]
+                )
+
+            var_chart_display = mo.ui.altair_chart(var_chart)
+        else:
+            var_chart_display = mo.md("*Select at least one setting to display*")
+
+        return var_chart_display
+
+    # Chart-heavy part: deferred in lazy mode
+    var_chart_display = sc.defer(
+        slide_3_3b, _chart,
+        show_cv_0.value, show_cv_1.value, show_cv_15.value, show_cv_obs.value, show_var_sim.value,
+    )
 
     # Math content in accordion
     var_math_content = mo.md(
@@ -1587,7 +2747,10 @@ def _(alt, mo, np, pl, sc, show_cv_0, show_cv_1, show_cv_15):
     ])
 
     slide_3_3b.content2 = mo.vstack([
-        mo.hstack([show_cv_0, show_cv_1, show_cv_15], justify="start", gap=2),
+        mo.hstack(
+            [show_cv_0, show_cv_1, show_cv_15, *([show_cv_obs] if observed_cv is not None else []), show_var_sim],
+            justify="start", gap=2
+        ),
         var_chart_display,
         mo.accordion({"Insight": mo.md("Reducing variability **shifts the frontier** — less waiting at any utilization level!")})
     ])
@@ -1597,12 +2760,13 @@ def _(alt, mo, np, pl, sc, show_cv_0, show_cv_1, show_cv_15):
 
 
 @app.cell(hide_code=True)
-def _(mo, sc):
+def slide_3_4(mo, sc):
     # Slide 3.4 — Summary: Move along vs shift the frontier
     slide_3_4 = sc.create_slide(
         "Summary: move along vs shift the frontier",
         layout_type="side-by-side",
-        page_number=21
+        page_number=21,
+        key="slide_3_4"
     )
 
     slide_3_4.content1 = mo.md(
@@ -1647,12 +2811,13 @@ def _(mo, sc):
 
 
 @app.cell
-def _(sc):
+def section_4(sc):
     # Section 4 separator
     section_4 = sc.create_slide(
         "From Theory to Practice",
         layout_type="section",
-        page_number=22
+        page_number=22,
+        key="section_4"
     )
     section_4.subtitle = "Section 4"
     section_4.content1 = "Time-varying demand and staffing decisions"
@@ -1661,12 +2826,49 @@ def _(sc):
 
 
 @app.cell(hide_code=True)
-def _(mo, sc):
+def arrival_profile(estimate_arrival_rates, mo, open_log, pl, profiled):
+    # Arrival profile for section 4 — estimated from public/arrivals.parquet when it exists
+    def _clock(h):
+        return f"{(h - 1) % 12 + 1}{'am' if h % 24 < 12 else 'pm'}"
+
+    def _period(h):
+        start, end = _clock(h), _clock(h + 1)
+        return f"{start[:-2]}-{end}" if start[-2:] == end[-2:] else f"{start}-{end}"
+
+    with profiled("arrival_profile", "Arrival profile (section 4)"):
+        _log = open_log(mo.notebook_location() / "public" / "arrivals.parquet")
+        if _log is not None:
+            # A "season" column in the log becomes one profile column per season, most common first
+            _by = "season" if "season" in _log.collect_schema() else None
+            _rates = estimate_arrival_rates(_log, by=_by).with_columns(pl.col("rate").round(1))
+            _hours = _rates["start_hour"].unique(maintain_order=True).cast(pl.Int64).to_list()
+            _columns = (
+                {str(k[0]): g["rate"] for k, g in sorted(_rates.group_by(_by), key=lambda kg: -kg[1]["days"][0])}
+                if _by else {"Observed": _rates["rate"]}
+            )
+            arrival_caption = "Arrival pattern from arrivals.parquet (customers/hour):"
+        else:
+            _hours = list(range(8, 18))
+            _columns = {
+                "Normal Day": [20, 25, 20, 15, 10, 15, 25, 32, 35, 20],
+                "Flu Season": [30, 40, 35, 25, 20, 25, 35, 40, 50, 40],
+            }
+            arrival_caption = "Example arrival pattern (customers/hour):"
+        arrival_profile = pl.DataFrame({"Time": [_period(h) for h in _hours], **_columns})
+        # The staffing slides use the first profile and short block labels ("8-9", "12-1")
+        time_blocks = [f"{(h - 1) % 12 + 1}-{h % 12 + 1}" for h in _hours]
+        arrival_rates = arrival_profile[arrival_profile.columns[1]].to_list()
+    return arrival_caption, arrival_profile, arrival_rates, time_blocks
+
+
+@app.cell(hide_code=True)
+def slide_4_1(arrival_caption, arrival_profile, mo, sc):
     # Slide 4.1 — Arrivals vary over the day (problem setup)
     slide_4_1 = sc.create_slide(
         "Arrivals vary over the day",
         layout_type="side-by-side",
-        page_number=23
+        page_number=23,
+        key="slide_4_1"
     )
 
     slide_4_1.content1 = mo.md(
@@ -1689,133 +2891,194 @@ def _(mo, sc):
         """
     )
 
-    slide_4_1.content2 = mo.md(
-        """
-        **Example arrival pattern (customers/hour):**
-
-        | Time | Normal Day | Flu Season |
-        |------|------------|------------|
-        | 8-9am | 20 | 30 |
-        | 9-10am | 25 | 40 |
-        | 10-11am | 20 | 35 |
-        | 11am-12pm | 15 | 25 |
-        | 12-1pm | 10 | 20 |
-        | 1-2pm | 15 | 25 |
-        | 2-3pm | 25 | 35 |
-        | 3-4pm | 32 | 40 |
-        | 4-5pm | 35 | 50 |
-        | 5-6pm | 20 | 40 |
-        """
-    )
+    _table = [
+        "| " + " | ".join(arrival_profile.columns) + " |",
+        "|" + "|".join("-" * (len(c) + 2) for c in arrival_profile.columns) + "|",
+        *("| " + " | ".join(f"{v:g}" if isinstance(v, float) else str(v) for v in row) + " |"
+          for row in arrival_profile.iter_rows()),
+    ]
+    slide_4_1.content2 = mo.md("\n".join([f"**{arrival_caption}**", "", *_table]))
     slide_4_1.render()
     return
 
 
 @app.cell(hide_code=True)
-def _(mo):
+def staffing_charts(alt, profiled, time_blocks):
+    # Static layers for slides 4.2 and 4.4 — marks, scales, tooltips and threshold rules, built once;
+    # the slides fill the "blocks" and "queue" datasets on every slider move (see with_data)
+    def _utilization(high, staff):
+        bars = alt.Chart(alt.NamedData("blocks")).mark_bar().encode(
+            x=alt.X("Time:N", sort=list(time_blocks), title="Time Block"),
+            y=alt.Y("Utilization:Q", title="Utilization (ρ)", scale=alt.Scale(domain=[0, 1.5])),
+            color=alt.Color("Status:N",
+                scale=alt.Scale(
+                    domain=["OK", "High", "Unstable"],
+                    range=["#22c55e", "#f59e0b", "#dc2626"]  # Green, Amber, Red
+                ),
+                legend=alt.Legend(title="Status", orient="right")
+            ),
+            tooltip=[
+                alt.Tooltip("Time:N", title="Time"),
+                alt.Tooltip("λ (arrivals/hr):Q", title="λ (arrivals/hr)"),
+                *([alt.Tooltip("Staff:Q", title="Staff (s)")] if staff else []),
+                alt.Tooltip("ρ (%):N", title="ρ"),
+                alt.Tooltip("L (customers):N", title="L (in system)"),
+                alt.Tooltip("W (min):N", title="W (total time)"),
+                alt.Tooltip("Lq (waiting):N", title="Lq (in queue)"),
+                alt.Tooltip("Wq (min):N", title="Wq (wait time)"),
+                alt.Tooltip("Wq simulated (min):N", title="Wq (simulated day)"),
+                alt.Tooltip("Abandon (%):N", title="Leave unserved (10-min patience)"),
+                alt.Tooltip("Wq abandonment (min):N", title="Wq (with abandonment)")
+            ]
+        )
+        # Threshold lines
+        unstable = alt.Chart().mark_rule(
+            color="#dc2626", strokeDash=[5, 5], strokeWidth=2
+        ).encode(y=alt.datum(1.0))
+        busy = alt.Chart().mark_rule(
+            color="#f59e0b", strokeDash=[3, 3], strokeWidth=1
+        ).encode(y=alt.datum(high))
+        return bars + unstable + busy
+
+    with profiled("staffing_charts", "Chart layers (slides 4.2 and 4.4)"):
+        utilization_chart_4_2 = _utilization(0.85, staff=False).properties(width=900, height=280).to_dict()
+        utilization_chart_4_4 = _utilization(0.90, staff=True).properties(width=850, height=250).to_dict()
+
+        # Expected queue over the day: forward equations (carry-over) vs per-hour steady state
+        queue_day_chart = alt.Chart(alt.NamedData("queue")).mark_line(strokeWidth=2, interpolate="step-after").encode(
+            x=alt.X("Hour:Q", title="Time of day (h)", scale=alt.Scale(domain=[8, 18])),
+            y=alt.Y("Lq:Q", title="Customers waiting (Lq)"),
+            color=alt.Color("Model:N",
+                scale=alt.Scale(
+                    domain=["Transient (with carry-over)", "Steady state per hour"],
+                    range=["#2563eb", "#9CA3AF"]
+                ),
+                legend=alt.Legend(orient="bottom", title=None)
+            ),
+            tooltip=[
+                alt.Tooltip("Hour:Q", title="Time (h)", format=".2f"),
+                alt.Tooltip("Lq:Q", title="Lq (in queue)"),
+                alt.Tooltip("Model:N", title="Model")
+            ]
+        ).properties(width=850, height=160).to_dict()
+    return queue_day_chart, utilization_chart_4_2, utilization_chart_4_4
+
+
+@app.cell(hide_code=True)
+def constant_staff_slider(mo):
     # Slider for Slide 4.2 — Constant staff level
     constant_staff_slider = mo.ui.slider(1, 5, value=1, label="Staff level (constant all day)", step=1)
     return (constant_staff_slider,)
 
 
 @app.cell(hide_code=True)
-def _(alt, constant_staff_slider, math, mo, pl, sc):
+def slide_4_2(
+    VegaLite,
+    arrival_rates,
+    constant_staff_slider,
+    erlang_a_metrics,
+    min_staff,
+    mo,
+    np,
+    pl,
+    queue_cache,
+    queue_day_chart,
+    sc,
+    simulate_day,
+    solve_transient,
+    time_blocks,
+    utilization_chart_4_2,
+    with_data,
+):
     # Slide 4.2 — Can constant staffing work? (Interactive failure experience)
     slide_4_2 = sc.create_slide(
         "Can constant staffing work?",
         layout_type="1-column",
-        page_number=24
+        page_number=24,
+        key="slide_4_2"
     )
 
     # Time block data (same λ(t) pattern from 4.1)
-    _time_blocks = ["8-9", "9-10", "10-11", "11-12", "12-1", "1-2", "2-3", "3-4", "4-5", "5-6"]
-    _arrival_rates = [20, 25, 20, 15, 10, 15, 25, 32, 35, 20]
+    _time_blocks = time_blocks
+    _arrival_rates = arrival_rates
     _mu_rate = 10  # Service rate per server (customers/hour)
+    _theta = 6  # Abandonment rate: customers give up after 10 minutes on average
 
     # Calculate utilization for each block with constant staffing
     _s = constant_staff_slider.value
     _utilizations = [arr / (_s * _mu_rate) for arr in _arrival_rates]
 
-    # M/M/s queueing metrics calculation
-    def _calc_mms_metrics(lam, mu, s):
-        """Calculate M/M/s queueing metrics. Returns (rho, L, W, Lq, Wq) or None if unstable."""
-        rho = lam / (s * mu)
-        if rho >= 1:
-            return (rho, None, None, None, None)  # Unstable
-
-        # Erlang-C formula for P0
-        sum_terms = sum((s * rho) ** n / math.factorial(n) for n in range(s))
-        last_term = ((s * rho) ** s) / (math.factorial(s) * (1 - rho))
-        P0 = 1 / (sum_terms + last_term)
-
-        # Lq = P0 * (s*rho)^s * rho / (s! * (1-rho)^2)
-        Lq = P0 * ((s * rho) ** s) * rho / (math.factorial(s) * (1 - rho) ** 2)
-        L = Lq + lam / mu
-        Wq = Lq / lam * 60  # Convert to minutes
-        W = Wq + (1 / mu) * 60  # Convert to minutes
-        return (rho, L, W, Lq, Wq)
-
-    _metrics = [_calc_mms_metrics(arr, _mu_rate, _s) for arr in _arrival_rates]
-
-    _df_util = pl.DataFrame({
-        "Time": _time_blocks,
-        "λ (arrivals/hr)": _arrival_rates,
-        "Utilization": _utilizations,
-        "ρ (%)": [f"{u*100:.0f}%" for u in _utilizations],
-        "L (customers)": [f"{m[1]:.1f}" if m[1] is not None else "∞" for m in _metrics],
-        "W (min)": [f"{m[2]:.1f}" if m[2] is not None else "∞" for m in _metrics],
-        "Lq (waiting)": [f"{m[3]:.1f}" if m[3] is not None else "∞" for m in _metrics],
-        "Wq (min)": [f"{m[4]:.1f}" if m[4] is not None else "∞" for m in _metrics],
-        "Status": ["Unstable" if u >= 1 else ("High" if u >= 0.85 else "OK") for u in _utilizations]
-    })
-
-    _util_chart = alt.Chart(_df_util.to_pandas()).mark_bar().encode(
-        x=alt.X("Time:N", sort=_time_blocks, title="Time Block"),
-        y=alt.Y("Utilization:Q", title="Utilization (ρ)", scale=alt.Scale(domain=[0, 1.5])),
-        color=alt.Color("Status:N",
-            scale=alt.Scale(
-                domain=["OK", "High", "Unstable"],
-                range=["#22c55e", "#f59e0b", "#dc2626"]  # Green, Amber, Red
-            ),
-            legend=alt.Legend(title="Status", orient="right")
-        ),
-        tooltip=[
-            alt.Tooltip("Time:N", title="Time"),
-            alt.Tooltip("λ (arrivals/hr):Q", title="λ (arrivals/hr)"),
-            alt.Tooltip("ρ (%):N", title="ρ"),
-            alt.Tooltip("L (customers):N", title="L (in system)"),
-            alt.Tooltip("W (min):N", title="W (total time)"),
-            alt.Tooltip("Lq (waiting):N", title="Lq (in queue)"),
-            alt.Tooltip("Wq (min):N", title="Wq (wait time)")
-        ]
-    ).properties(width=900, height=280, title=f"Utilization by hour with constant s = {_s}")
-
-    # Add threshold lines
-    _threshold_100 = alt.Chart(pl.DataFrame({"y": [1.0]}).to_pandas()).mark_rule(
-        color="#dc2626", strokeDash=[5, 5], strokeWidth=2
-    ).encode(y="y:Q")
-    _threshold_85 = alt.Chart(pl.DataFrame({"y": [0.85]}).to_pandas()).mark_rule(
-        color="#f59e0b", strokeDash=[3, 3], strokeWidth=1
-    ).encode(y="y:Q")
-
-    # Count issues
-    _unstable_count = sum(1 for u in _utilizations if u >= 1)
-    _high_count = sum(1 for u in _utilizations if 0.85 <= u < 1)
-    _ok_count = sum(1 for u in _utilizations if u < 0.85)
-
-    # Status message
-    if _unstable_count > 0:
-        _status_msg = f"⛔ **System unstable** in {_unstable_count} hour(s)"
-    elif _high_count > 0:
-        _status_msg = f"⚠️ High utilization in {_high_count} hour(s)"
-    else:
-        _status_msg = "✅ All hours under control"
-
+    def _content():
+        # M/M/s queueing metrics for all blocks at once (times converted to minutes)
+        _metrics = queue_cache(_arrival_rates, _mu_rate, _s)
+        # Simulated days keep the queue left over from one hour to the next
+        _day = simulate_day(_arrival_rates, [_s] * len(_arrival_rates), _mu_rate, n_days=1000, seed=0)
+        # Erlang-A: with impatient customers even overloaded hours have a finite queue
+        _abandon = erlang_a_metrics(_arrival_rates, _mu_rate, _s, _theta)
+
+        _df_util = pl.DataFrame({
+            "Time": _time_blocks,
+            "λ (arrivals/hr)": _arrival_rates,
+            "Utilization": _utilizations,
+            "ρ (%)": [f"{u*100:.0f}%" for u in _utilizations],
+            "L (customers)": [f"{v:.1f}" if np.isfinite(v) else "∞" for v in _metrics.L],
+            "W (min)": [f"{v * 60:.1f}" if np.isfinite(v) else "∞" for v in _metrics.W],
+            "Lq (waiting)": [f"{v:.1f}" if np.isfinite(v) else "∞" for v in _metrics.Lq],
+            "Wq (min)": [f"{v * 60:.1f}" if np.isfinite(v) else "∞" for v in _metrics.Wq],
+            "Wq simulated (min)": [f"{v * 60:.1f}" for v in _day.Wq],
+            "Abandon (%)": [f"{p * 100:.0f}%" for p in _abandon.p_abandon],
+            "Wq abandonment (min)": [f"{v * 60:.1f}" for v in _abandon.Wq],
+            "Status": ["Unstable" if u >= 1 else ("High" if u >= 0.85 else "OK") for u in _utilizations]
+        })
+
+        _util_chart = {
+            **with_data(utilization_chart_4_2, blocks=_df_util.to_dicts()),
+            "title": f"Utilization by hour with constant s = {_s}",
+        }
+
+        # Count issues
+        _unstable_count = sum(1 for u in _utilizations if u >= 1)
+        _high_count = sum(1 for u in _utilizations if 0.85 <= u < 1)
+        _ok_count = sum(1 for u in _utilizations if u < 0.85)
+
+        # Status message
+        if _unstable_count > 0:
+            _lost = float(np.sum(np.asarray(_arrival_rates) - _abandon.throughput))
+            _status_msg = (
+                f"⛔ **System unstable** in {_unstable_count} hour(s): with 10 minutes of patience, "
+                f"about {_lost:.0f} of {sum(_arrival_rates):.0f} customers leave unserved"
+            )
+        elif _high_count > 0:
+            _status_msg = f"⚠️ High utilization in {_high_count} hour(s)"
+        else:
+            _status_msg = "✅ All hours under control"
+
+        # Expected queue over the day: forward equations (carry-over) vs per-hour steady state
+        _transient = solve_transient(_arrival_rates, [_s] * len(_arrival_rates), _mu_rate)
+        _steady_lq = np.where(np.isfinite(_metrics.Lq), np.round(_metrics.Lq, 2), np.nan)
+        _df_queue = pl.concat([
+            pl.DataFrame({"Hour": 8 + _transient.t, "Lq": np.round(_transient.Lq, 2), "Model": "Transient (with carry-over)"}),
+            pl.DataFrame({"Hour": 8.0 + np.arange(len(_time_blocks) + 1), "Lq": np.append(_steady_lq, _steady_lq[-1]), "Model": "Steady state per hour"}),
+        ])
+        _queue_chart = with_data(queue_day_chart, queue=_df_queue.fill_nan(None).to_dicts())
+
+        # Minimum staff per hour that keeps every block below the 85% line
+        _needed = min_staff(_arrival_rates, _mu_rate, max_rho=0.85)
+        _needed_text = " &nbsp;|&nbsp; ".join(f"{t}: **{n}**" for t, n in zip(_time_blocks, _needed))
+
+        return mo.vstack([
+            VegaLite(_util_chart),
+            mo.md(_status_msg),
+            mo.accordion({
+                "Queue over the day": VegaLite(_queue_chart),
+                "Minimum staff per hour (ρ < 85%)": mo.md(_needed_text)
+            })
+        ], gap=0.5)
 
+    # Queueing metrics, simulation and charts: deferred in lazy mode
     slide_4_2.content1 = mo.vstack([
         mo.hstack([constant_staff_slider, mo.md(f"Service rate μ = 10 customers/hour per server")], justify="start", gap=2),
-        mo.ui.altair_chart(_util_chart + _threshold_100 + _threshold_85),
-        mo.md(_status_msg)
+        sc.defer(slide_4_2, _content, _s, tuple(_arrival_rates)),
     ], gap=0.5)
 
     slide_4_2.render()
@@ -1823,12 +3086,13 @@ def _(alt, constant_staff_slider, math, mo, pl, sc):
 
 
 @app.cell(hide_code=True)
-def _(mo, sc):
+def slide_4_3(mo, sc):
     # Slide 4.3 — The staffing lever: introducing s(t)
     slide_4_3 = sc.create_slide(
         "The staffing lever",
         layout_type="side-by-side",
-        page_number=25
+        page_number=25,
+        key="slide_4_3"
     )
 
     slide_4_3.content1 = mo.md(
@@ -1879,131 +3143,160 @@ def _(mo, sc):
 
 
 @app.cell(hide_code=True)
-def _(mo):
-    # Sliders for Slide 4.4 — Two-shift staffing decision
-    morning_staff_slider = mo.ui.slider(1, 5, value=1, label="Morning shift (8am-1pm)", step=1)
-    afternoon_staff_slider = mo.ui.slider(1, 5, value=1, label="Afternoon shift (1pm-6pm)", step=1)
+def shift_sliders(mo, time_blocks):
+    # Sliders for Slide 4.4 — Two-shift staffing decision (morning: first half of the blocks)
+    _n_morning = len(time_blocks) // 2
+    _morning = f"{time_blocks[0].split('-')[0]}-{time_blocks[_n_morning - 1].split('-')[1]}"
+    _afternoon = f"{time_blocks[_n_morning].split('-')[0]}-{time_blocks[-1].split('-')[1]}"
+    morning_staff_slider = mo.ui.slider(1, 5, value=1, label=f"Morning shift ({_morning})", step=1)
+    afternoon_staff_slider = mo.ui.slider(1, 5, value=1, label=f"Afternoon shift ({_afternoon})", step=1)
     return afternoon_staff_slider, morning_staff_slider
 
 
 @app.cell(hide_code=True)
-def _(afternoon_staff_slider, alt, math, mo, morning_staff_slider, pl, sc):
+def slide_4_4(
+    VegaLite,
+    afternoon_staff_slider,
+    arrival_rates,
+    erlang_a_metrics,
+    min_staff,
+    mo,
+    morning_staff_slider,
+    np,
+    pl,
+    plan_shifts,
+    queue_cache,
+    queue_day_chart,
+    sc,
+    simulate_day,
+    solve_transient,
+    time_blocks,
+    utilization_chart_4_4,
+    with_data,
+):
     # Slide 4.4 — Two-shift staffing decision (interactive exercise)
     slide_4_4 = sc.create_slide(
         "Two-shift staffing decision",
         layout_type="1-column",
-        page_number=26
+        page_number=26,
+        key="slide_4_4"
     )
 
-    # Time block data
-    _time_blocks = ["8-9", "9-10", "10-11", "11-12", "12-1", "1-2", "2-3", "3-4", "4-5", "5-6"]
-    _arrival_rates = [20, 25, 20, 15, 10, 15, 25, 32, 35, 20]
+    # Time block data (same λ(t) pattern from 4.1)
+    _time_blocks = time_blocks
+    _arrival_rates = arrival_rates
     _mu_rate = 10  # Service rate per server
+    _theta = 6  # Abandonment rate: customers give up after 10 minutes on average
 
-    # Morning blocks: 8-9, 9-10, 10-11, 11-12, 12-1 (indices 0-4)
-    # Afternoon blocks: 1-2, 2-3, 3-4, 4-5, 5-6 (indices 5-9)
+    # Morning shift: first half of the blocks (8-9 to 12-1 in the example), afternoon: the rest
+    _n_morning = len(_time_blocks) // 2
+    _n_afternoon = len(_time_blocks) - _n_morning
     _s_morning = morning_staff_slider.value
     _s_afternoon = afternoon_staff_slider.value
 
-    _staffing = [_s_morning] * 5 + [_s_afternoon] * 5
+    _staffing = [_s_morning] * _n_morning + [_s_afternoon] * _n_afternoon
     _utilizations = [arr / (s * _mu_rate) for arr, s in zip(_arrival_rates, _staffing)]
 
-    # M/M/s queueing metrics calculation
-    def _calc_mms_metrics(lam, mu, s):
-        """Calculate M/M/s queueing metrics. Returns (rho, L, W, Lq, Wq) or None if unstable."""
-        rho = lam / (s * mu)
-        if rho >= 1:
-            return (rho, None, None, None, None)  # Unstable
-
-        # Erlang-C formula for P0
-        sum_terms = sum((s * rho) ** n / math.factorial(n) for n in range(s))
-        last_term = ((s * rho) ** s) / (math.factorial(s) * (1 - rho))
-        P0 = 1 / (sum_terms + last_term)
-
-        # Lq = P0 * (s*rho)^s * rho / (s! * (1-rho)^2)
-        Lq = P0 * ((s * rho) ** s) * rho / (math.factorial(s) * (1 - rho) ** 2)
-        L = Lq + lam / mu
-        Wq = Lq / lam * 60  # Convert to minutes
-        W = Wq + (1 / mu) * 60  # Convert to minutes
-        return (rho, L, W, Lq, Wq)
-
-    _metrics = [_calc_mms_metrics(arr, _mu_rate, s) for arr, s in zip(_arrival_rates, _staffing)]
-
-    _df_util = pl.DataFrame({
-        "Time": _time_blocks,
-        "λ (arrivals/hr)": _arrival_rates,
-        "Staff": _staffing,
-        "Utilization": _utilizations,
-        "ρ (%)": [f"{u*100:.0f}%" for u in _utilizations],
-        "L (customers)": [f"{m[1]:.1f}" if m[1] is not None else "∞" for m in _metrics],
-        "W (min)": [f"{m[2]:.1f}" if m[2] is not None else "∞" for m in _metrics],
-        "Lq (waiting)": [f"{m[3]:.1f}" if m[3] is not None else "∞" for m in _metrics],
-        "Wq (min)": [f"{m[4]:.1f}" if m[4] is not None else "∞" for m in _metrics],
-        "Status": ["Unstable" if u >= 1 else ("High" if u >= 0.90 else "OK") for u in _utilizations],
-        "Shift": ["Morning"] * 5 + ["Afternoon"] * 5
-    })
-
-    _util_chart = alt.Chart(_df_util.to_pandas()).mark_bar().encode(
-        x=alt.X("Time:N", sort=_time_blocks, title="Time Block"),
-        y=alt.Y("Utilization:Q", title="Utilization (ρ)", scale=alt.Scale(domain=[0, 1.5])),
-        color=alt.Color("Status:N",
-            scale=alt.Scale(
-                domain=["OK", "High", "Unstable"],
-                range=["#22c55e", "#f59e0b", "#dc2626"]
-            ),
-            legend=alt.Legend(title="Status", orient="right")
-        ),
-        tooltip=[
-            alt.Tooltip("Time:N", title="Time"),
-            alt.Tooltip("λ (arrivals/hr):Q", title="λ (arrivals/hr)"),
-            alt.Tooltip("Staff:Q", title="Staff (s)"),
-            alt.Tooltip("ρ (%):N", title="ρ"),
-            alt.Tooltip("L (customers):N", title="L (in system)"),
-            alt.Tooltip("W (min):N", title="W (total time)"),
-            alt.Tooltip("Lq (waiting):N", title="Lq (in queue)"),
-            alt.Tooltip("Wq (min):N", title="Wq (wait time)")
-        ]
-    ).properties(width=850, height=250)
-
-    # Threshold lines
-    _threshold_100 = alt.Chart(pl.DataFrame({"y": [1.0]}).to_pandas()).mark_rule(
-        color="#dc2626", strokeDash=[5, 5], strokeWidth=2
-    ).encode(y="y:Q")
-    _threshold_90 = alt.Chart(pl.DataFrame({"y": [0.90]}).to_pandas()).mark_rule(
-        color="#f59e0b", strokeDash=[3, 3], strokeWidth=1
-    ).encode(y="y:Q")
-
-    # Calculate cost and status
-    _daily_cost = 5 * _s_morning * 25 + 5 * _s_afternoon * 25
-    _hours_over_90 = sum(1 for u in _utilizations if u >= 0.90)
-    _hours_unstable = sum(1 for u in _utilizations if u >= 1)
-
-    if _hours_unstable > 0:
-        _status_text = f"⛔ {_hours_unstable} hour(s) unstable (ρ ≥ 100%)"
-        _status_color = "#dc2626"
-    elif _hours_over_90 > 0:
-        _status_text = f"⚠️ {_hours_over_90} hour(s) exceed 90% utilization"
-        _status_color = "#f59e0b"
-    else:
-        _status_text = "✅ All hours OK (ρ < 90%)"
-        _status_color = "#22c55e"
+    def _content():
+        # M/M/s queueing metrics for all blocks at once (times converted to minutes);
+        # the cache only evaluates blocks whose (λ, s) changed since the last move
+        _metrics = queue_cache(_arrival_rates, _mu_rate, _staffing)
+        # Simulated days keep the queue left over from one hour to the next
+        _day = simulate_day(_arrival_rates, _staffing, _mu_rate, n_days=1000, seed=0)
+        # Erlang-A: with impatient customers even overloaded hours have a finite queue
+        _abandon = erlang_a_metrics(_arrival_rates, _mu_rate, _staffing, _theta)
+
+        _df_util = pl.DataFrame({
+            "Time": _time_blocks,
+            "λ (arrivals/hr)": _arrival_rates,
+            "Staff": _staffing,
+            "Utilization": _utilizations,
+            "ρ (%)": [f"{u*100:.0f}%" for u in _utilizations],
+            "L (customers)": [f"{v:.1f}" if np.isfinite(v) else "∞" for v in _metrics.L],
+            "W (min)": [f"{v * 60:.1f}" if np.isfinite(v) else "∞" for v in _metrics.W],
+            "Lq (waiting)": [f"{v:.1f}" if np.isfinite(v) else "∞" for v in _metrics.Lq],
+            "Wq (min)": [f"{v * 60:.1f}" if np.isfinite(v) else "∞" for v in _metrics.Wq],
+            "Wq simulated (min)": [f"{v * 60:.1f}" for v in _day.Wq],
+            "Abandon (%)": [f"{p * 100:.0f}%" for p in _abandon.p_abandon],
+            "Wq abandonment (min)": [f"{v * 60:.1f}" for v in _abandon.Wq],
+            "Status": ["Unstable" if u >= 1 else ("High" if u >= 0.90 else "OK") for u in _utilizations],
+            "Shift": ["Morning"] * _n_morning + ["Afternoon"] * _n_afternoon
+        })
+
+        _util_chart = with_data(utilization_chart_4_4, blocks=_df_util.to_dicts())
+
+        # Calculate cost and status
+        _daily_cost = _n_morning * _s_morning * 25 + _n_afternoon * _s_afternoon * 25
+        _hours_over_90 = sum(1 for u in _utilizations if u >= 0.90)
+        _hours_unstable = sum(1 for u in _utilizations if u >= 1)
+
+        if _hours_unstable > 0:
+            _lost = float(np.sum(np.asarray(_arrival_rates) - _abandon.throughput))
+            _status_text = f"⛔ {_hours_unstable} hour(s) unstable (ρ ≥ 100%), ≈{_lost:.0f} customers leave unserved"
+            _status_color = "#dc2626"
+        elif _hours_over_90 > 0:
+            _status_text = f"⚠️ {_hours_over_90} hour(s) exceed 90% utilization"
+            _status_color = "#f59e0b"
+        else:
+            _status_text = "✅ All hours OK (ρ < 90%)"
+            _status_color = "#22c55e"
+
+        _cost_box = mo.md(f"""
+        **Daily Cost: €{_daily_cost}** &nbsp;&nbsp; | &nbsp;&nbsp;
+        Morning: {_s_morning} × {_n_morning}h × €25 = €{_s_morning * _n_morning * 25} &nbsp;&nbsp; | &nbsp;&nbsp;
+        Afternoon: {_s_afternoon} × {_n_afternoon}h × €25 = €{_s_afternoon * _n_afternoon * 25}
+        """)
+
+        _exercise_prompt = mo.callout(
+            mo.md("**Exercise:** Find the lowest-cost staffing plan where no hour exceeds 90% utilization."),
+            kind="info"
+        )
 
-    _cost_box = mo.md(f"""
-    **Daily Cost: €{_daily_cost}** &nbsp;&nbsp; | &nbsp;&nbsp;
-    Morning: {_s_morning} × 5h × €25 = €{_s_morning * 5 * 25} &nbsp;&nbsp; | &nbsp;&nbsp;
-    Afternoon: {_s_afternoon} × 5h × €25 = €{_s_afternoon * 5 * 25}
-    """)
+        # Expected queue over the day: forward equations (carry-over) vs per-hour steady state
+        _transient = solve_transient(_arrival_rates, _staffing, _mu_rate)
+        _steady_lq = np.where(np.isfinite(_metrics.Lq), np.round(_metrics.Lq, 2), np.nan)
+        _df_queue = pl.concat([
+            pl.DataFrame({"Hour": 8 + _transient.t, "Lq": np.round(_transient.Lq, 2), "Model": "Transient (with carry-over)"}),
+            pl.DataFrame({"Hour": 8.0 + np.arange(len(_time_blocks) + 1), "Lq": np.append(_steady_lq, _steady_lq[-1]), "Model": "Steady state per hour"}),
+        ])
+        _queue_chart = with_data(queue_day_chart, queue=_df_queue.fill_nan(None).to_dicts())
+
+        # Solution: cheapest shifts covering the per-hour minimum (€25 per staff-hour)
+        _needed = min_staff(_arrival_rates, _mu_rate, max_rho=0.90)
+        _best = plan_shifts(_needed, [(0, _n_morning), (_n_morning, _n_afternoon)], block_cost=25)
+        _best_morning, _best_afternoon = _best.counts
+        # Same target if any 4- or 5-hour shift were allowed
+        _flex_shifts = [(b, n) for n in (4, 5) for b in range(len(_time_blocks) - n + 1)]
+        _flex = plan_shifts(_needed, _flex_shifts, block_cost=25)
+        _flex_text = ", ".join(
+            f"{k} × {8 + b}:00–{8 + b + n}:00" for (b, n), k in zip(_flex_shifts, _flex.counts) if k
+        )
+        _solution = mo.accordion({
+            "Queue over the day": mo.vstack([
+                VegaLite(_queue_chart),
+                mo.md(
+                    "*Transient curve: morning staff leaving at the shift change hand their customers "
+                    "back to the queue. The simulated Wq in the tooltips lets them finish their customer.*"
+                ),
+            ]),
+            "Solution": mo.md(
+                f"Morning **{_best_morning}**, afternoon **{_best_afternoon}** → "
+                f"€{_best.cost:.0f}/day\n\n"
+                f"With flexible 4–5 hour shifts: {_flex_text} → €{_flex.cost:.0f}/day"
+            )
+        })
 
-    _exercise_prompt = mo.callout(
-        mo.md("**Exercise:** Find the lowest-cost staffing plan where no hour exceeds 90% utilization."),
-        kind="info"
-    )
+        return mo.vstack([
+            VegaLite(_util_chart),
+            mo.hstack([_cost_box, mo.md(f"<span style='color:{_status_color}'>{_status_text}</span>")], justify="space-between"),
+            _exercise_prompt,
+            _solution
+        ], gap=0.5)
 
+    # Queueing metrics, simulation, charts and the shift plan: deferred in lazy mode
     slide_4_4.content1 = mo.vstack([
         mo.hstack([morning_staff_slider, afternoon_staff_slider], justify="start", gap=2),
-        mo.ui.altair_chart(_util_chart + _threshold_100 + _threshold_90),
-        mo.hstack([_cost_box, mo.md(f"<span style='color:{_status_color}'>{_status_text}</span>")], justify="space-between"),
-        _exercise_prompt
+        sc.defer(slide_4_4, _content, _s_morning, _s_afternoon, tuple(_arrival_rates)),
     ], gap=0.5)
 
     slide_4_4.render()
@@ -2011,12 +3304,13 @@ def _(afternoon_staff_slider, alt, math, mo, morning_staff_slider, pl, sc):
 
 
 @app.cell(hide_code=True)
-def _(sc):
+def section_5(sc):
     # Section 5 separator
     section_5 = sc.create_slide(
         "Wrap-up",
         layout_type="section",
-        page_number=27
+        page_number=27,
+        key="section_5"
     )
     section_5.subtitle = "Section 5"
     section_5.content1 = "Key takeaways and next steps"
@@ -2025,12 +3319,13 @@ def _(sc):
 
 
 @app.cell(hide_code=True)
-def _(mo, sc):
+def slide_5_1(mo, sc):
     # Slide 5.1 — Key takeaways
     slide_5_1 = sc.create_slide(
         "Key takeaways",
         layout_type="side-by-side",
-        page_number=28
+        page_number=28,
+        key="slide_5_1"
     )
 
     slide_5_1.content1 = mo.md(
@@ -2070,12 +3365,13 @@ def _(mo, sc):
 
 
 @app.cell(hide_code=True)
-def _(mo, sc):
+def slide_5_2(mo, sc):
     # Slide 5.2 — What's next: shaping demand
     slide_5_2 = sc.create_slide(
         "What's next: shaping demand",
         layout_type="1-column",
-        page_number=29
+        page_number=29,
+        key="slide_5_2"
     )
 
     slide_5_2.content1 = mo.md(
@@ -2099,5 +3395,42 @@ def _(mo, sc):
     return
 
 
+@app.cell(hide_code=True)
+def diagnostics_refresh(mo):
+    # Refresh button for the diagnostics slide (only shown while profiling)
+    refresh_diagnostics = mo.ui.button(label="Refresh timings")
+    return (refresh_diagnostics,)
+
+
+@app.cell(hide_code=True)
+def slide_diagnostics(install_times, mo, profiler, refresh_diagnostics, sc):
+    # Slide D — Diagnostics: time per reactive cell (hidden unless profiling is enabled)
+    mo.stop(profiler is None)
+    slide_diagnostics = sc.create_slide(
+        "Diagnostics: cell timings",
+        layout_type="1-column",
+        key="slide_diagnostics"
+    )
+
+    slide_diagnostics.content1 = mo.vstack([
+        mo.hstack([
+            refresh_diagnostics,
+            mo.download(data=profiler.to_json().encode(), filename="cell_timings.json", label="Export JSON")
+        ], justify="start", gap=1),
+        mo.ui.table(profiler.table(), selection=None, page_size=12),
+        mo.md(
+            "Package installs: " + ", ".join(f"{pkg} {t:.1f} s" for pkg, t in install_times.items())
+            if install_times else "Packages were preinstalled (local mode)."
+        ),
+        mo.md(
+            "Calls count reactive re-runs; *peak KiB* is the largest allocation peak of a single run "
+            "(0 unless started with `--profile memory`)."
+        )
+    ], gap=0.5)
+
+    slide_diagnostics.render()
+    return
+
+
 if __name__ == "__main__":
     app.run()
@@ -0,0 +1,205 @@
+"""Time the queueing kernels and the chart-building slide cells against a stored baseline.
+
+The notebook runs once as a script, then each kernel is timed across input sizes
+and each interactive slide cell is re-executed on the notebook's definitions,
+which is what a slider move costs. Results are written as JSON and compared with
+the baseline on the fastest run of each case, the least noisy estimate of its
+cost, divided by the fastest run of a fixed calibration workload timed alongside,
+so a machine that is busy or clocked down as a whole does not read as a
+regression. A case slower than --threshold times its baseline is re-timed
+--confirm more times, with a fresh calibration each round, and only a case that
+is slower every time is reported and makes the command exit with status 1.
+
+Run from the repository root:
+
+    python -m scripts.benchmark                   # compare with benchmarks/baseline.json
+    python -m scripts.benchmark --save-baseline   # record a new baseline on this machine
+
+Baselines are only saved on an interpreter the project supports (requires-python
+in pyproject.toml).
+"""
+
+import argparse
+import contextlib
+import functools
+import io
+import json
+import platform
+import re
+import statistics
+import sys
+import time
+import tomllib
+from datetime import datetime, timezone
+from importlib.metadata import version
+from pathlib import Path
+
+import numpy as np
+
+import capacity
+from scripts.notebook import load_cells
+
+BASELINE = Path("benchmarks/baseline.json")
+PYPROJECT = Path(__file__).resolve().parent.parent / "pyproject.toml"
+SIZES = (10, 1_000, 100_000)
+SLIDES = ("2.8", "3.1", "3.2b", "3.3b", "4.2", "4.4")
+
+
+def timed(fn, repeat: int) -> dict:
+    """Median and minimum wall time of `repeat` calls, after one warm-up call."""
+    fn()
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return {"median_s": statistics.median(runs), "min_s": min(runs), "repeat": repeat}
+
+
+def calibration_workload() -> None:
+    """Fixed mix of NumPy array work and interpreted Python, like the cases themselves."""
+    x = np.sin(np.arange(200_000, dtype=float))
+    np.sort(x)
+    np.exp(-x).cumsum()
+    sum(i * i for i in range(50_000))
+
+
+def calibrate(repeat: int) -> float:
+    """Fastest run of the calibration workload, the unit that case timings are compared in."""
+    return timed(calibration_workload, repeat)["min_s"]
+
+
+def supported_python() -> bool:
+    """Whether this interpreter satisfies the lower bound of requires-python in pyproject.toml."""
+    spec = tomllib.loads(PYPROJECT.read_text())["project"].get("requires-python", "")
+    match = re.search(r">=\s*(\d+)\.(\d+)", spec)
+    return match is None or sys.version_info[:2] >= (int(match[1]), int(match[2]))
+
+
+def benchmark_cases(only: str | None = None) -> dict:
+    """Callable per case name, on the definitions of one notebook run."""
+    cells = load_cells()
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, defs = capacity.app.run()
+    ns = {"__name__": "__benchmark__", **defs}
+
+    rng = np.random.default_rng(0)
+    cases = {}
+    for n in SIZES:
+        rho = rng.uniform(0.05, 0.95, n)
+        s = rng.integers(1, 51, n)
+        lam = rho * s * 10
+        cases[f"erlang_c[n={n}]"] = lambda s=s, rho=rho: ns["erlang_c"](s, rho)
+        cases[f"mms_metrics[n={n}]"] = lambda lam=lam, s=s: ns["mms_metrics"](lam, 10, s)
+        # Caches sized to hold every scenario, so larger n is not passed straight through
+        cache = functools.partial(ns["MetricsCache"], ns["table_metrics"], maxsize=n)
+        cases[f"queue_cache_cold[n={n}]"] = lambda lam=lam, s=s, cache=cache: cache()(lam, 10, s)
+        cases[f"queue_cache_warm[n={n}]"] = lambda lam=lam, s=s, c=cache(): c(lam, 10, s)
+        cases[f"calc_separate_metrics[n={n}]"] = lambda rho=rho: ns["calc_separate_metrics"](rho)
+        cases[f"calc_pooled_metrics[n={n}]"] = lambda rho=rho: ns["calc_pooled_metrics"](rho)
+        cases[f"calc_all_metrics[n={n}]"] = lambda rho=rho: ns["calc_all_metrics"](rho, 1.5)
+        # Fast lane: 30% of arrivals served first, without and with preemption
+        classes = lam[:, None] * np.array([0.3, 0.7])
+        cases[f"priority_mms_metrics[n={n}]"] = lambda c=classes, s=s: ns["priority_mms_metrics"](c, 10, s)
+        cases[f"priority_mms_preemptive[n={n}]"] = lambda c=classes, s=s: ns["priority_mms_metrics"](c, 10, s, True)
+        cases[f"priority_mg1_metrics[n={n}]"] = lambda c=classes, s=s: ns["priority_mg1_metrics"](c / s[:, None], 10, 1.5)
+        # Erlang-A with patience from 1 to 60 minutes, including overloaded scenarios
+        theta = 60 / np.random.default_rng(n).uniform(1, 60, n)  # own stream: keeps the baseline inputs
+        cases[f"erlang_a_metrics[n={n}]"] = lambda lam=lam, s=s, theta=theta: ns["erlang_a_metrics"](lam * 1.5, 10, s, theta)
+    for slide in SLIDES:
+        code = next(cell.code for cell in cells if cell.label.startswith(f"Slide {slide} "))
+        cases[f"slide_{slide}"] = lambda code=code: exec(code, ns)
+    return {name: fn for name, fn in cases.items() if only is None or only in name}
+
+
+def run_benchmarks(cases: dict, repeat: int = 7) -> dict:
+    return {name: timed(fn, repeat) for name, fn in cases.items()}
+
+
+def slowdowns(results: dict, calibration: float, stored: dict) -> dict[str, float]:
+    """Fastest run relative to the baseline's, both in units of their calibration run."""
+    baseline, base_calibration = stored["results"], stored["meta"]["calibration_s"]
+    return {
+        name: (r["min_s"] / calibration) / (baseline[name]["min_s"] / base_calibration)
+        for name, r in results.items()
+        if name in baseline
+    }
+
+
+def confirm(cases: dict, suspects: dict[str, float], stored: dict, args) -> dict[str, list[float]]:
+    """Slowdowns over the first and --confirm further rounds of the cases still slower than --threshold."""
+    ratios = {name: [ratio] for name, ratio in suspects.items()}
+    for _ in range(args.confirm):
+        calibration = calibrate(args.repeat)
+        again = run_benchmarks({name: cases[name] for name in ratios}, args.repeat)
+        for name, ratio in slowdowns(again, calibration, stored).items():
+            ratios[name].append(ratio)
+        ratios = {name: r for name, r in ratios.items() if r[-1] > args.threshold}
+    return ratios
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", type=Path, default=Path("benchmarks/results.json"))
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=1.25, help="allowed slowdown factor")
+    parser.add_argument("--repeat", type=int, default=7, help="timed runs per case")
+    parser.add_argument("--confirm", type=int, default=2, help="extra rounds a slowdown has to repeat in")
+    parser.add_argument("-k", "--only", help="run only cases whose name contains this text")
+    args = parser.parse_args()
+    if args.save_baseline and not supported_python():
+        parser.error(f"Python {platform.python_version()} is below the project's requires-python; "
+                     "record the baseline on a supported interpreter")
+
+    cases = benchmark_cases(args.only)
+    calibration = calibrate(args.repeat)
+    results = run_benchmarks(cases, args.repeat)
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": f"{platform.system()} {platform.machine()}",
+            "calibration_s": calibration,
+            **{pkg: version(pkg) for pkg in ("numpy", "polars", "altair", "marimo")},
+        },
+        "results": results,
+    }
+    output = args.baseline if args.save_baseline else args.output
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n")
+
+    stored = {} if args.save_baseline or not args.baseline.exists() else json.loads(args.baseline.read_text())
+    if stored and "calibration_s" not in stored["meta"]:
+        print(f"{args.baseline} has no calibration run; re-record it with --save-baseline")
+        stored = {}
+    ratios = slowdowns(results, calibration, stored) if stored else {}
+    print(f"{'case':<36}{'median ms':>12}{'min ms':>12}{'vs baseline':>14}")
+    for name, r in results.items():
+        vs = f"{ratios[name]:.2f}×" if name in ratios else "-"
+        print(f"{name:<36}{r['median_s'] * 1e3:>12.3f}{r['min_s'] * 1e3:>12.3f}{vs:>14}")
+    print(f"Wrote {output}")
+    if not stored:
+        if not args.save_baseline and not args.baseline.exists():
+            print(f"No baseline at {args.baseline}; record one with --save-baseline")
+        return
+    changed = [
+        f"{key} {stored['meta'].get(key)} → {value}"
+        for key, value in report["meta"].items()
+        if key not in ("created", "machine", "calibration_s") and stored["meta"].get(key) != value
+    ]
+    if changed:
+        print(f"Note: baseline recorded with different versions ({', '.join(changed)}); "
+              "re-record it with --save-baseline if timings differ")
+
+    suspects = {name: ratio for name, ratio in ratios.items() if ratio > args.threshold}
+    slower = confirm(cases, suspects, stored, args) if suspects else {}
+    if slower:
+        print(f"\n{len(slower)} case(s) slower than {args.threshold}× baseline in all {args.confirm + 1} rounds:")
+        for name, r in slower.items():
+            print(f"  {name}: {', '.join(f'{ratio:.2f}×' for ratio in r)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Precompute the Erlang-C lookup table shipped with the WebAssembly build.
+
+The table holds P(wait), Lq·(1-ρ) and μW·(1-ρ) for s = 1..s_max servers and
+ρ_k = k / n_rho, stored as one float32 .npy array of shape (3, s_max, n_rho).
+The notebook memory-maps it and interpolates in ρ instead of evaluating
+Erlang-C on every slider move.
+
+Run from the repository root:
+
+    python -m scripts.build_erlang_table
+"""
+
+import argparse
+from pathlib import Path
+from typing import NamedTuple
+
+import marimo as mo
+import numpy as np
+
+from capacity import erlang_tables, queueing_engine
+from scripts.notebook import run_cell
+
+
+def build_table(erlang_c, s_max: int, n_rho: int) -> np.ndarray:
+    s = np.arange(1, s_max + 1)[:, None]
+    rho = np.arange(n_rho)[None, :] / n_rho
+    c = erlang_c(s, rho)
+    return np.stack([c, c * rho, (1 - rho) + c / s]).astype(np.float32)
+
+
+def max_errors(table: np.ndarray, erlang_c, lookup) -> tuple[float, float, float]:
+    """Worst interpolation error at the midpoints between grid nodes."""
+    s_max, n_rho = table.shape[1:]
+    s = np.arange(1, s_max + 1)[:, None]
+    rho = (np.arange(n_rho - 1)[None, :] + 0.5) / n_rho
+    s, rho = np.broadcast_arrays(s, rho)
+    c = erlang_c(s, rho)
+    exact_lq, exact_w = c * rho / (1 - rho), (1 - rho) + c / s
+    approx_c, approx_lq, approx_w = lookup(table, s, rho)
+    # Lq error relative to max(Lq, 1): relative for long queues, absolute for short ones
+    lq_err = np.abs(approx_lq / (1 - rho) - exact_lq) / np.maximum(exact_lq, 1)
+    return float(np.abs(approx_c - c).max()), float(lq_err.max()), float(np.abs(approx_w / exact_w - 1).max())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--s-max", type=int, default=50, help="largest number of servers in the table")
+    parser.add_argument("--n-rho", type=int, default=1000, help="grid points per row (ρ step = 1/n_rho)")
+    parser.add_argument("-o", "--output", type=Path, default=Path("public/erlang_table.npy"))
+    args = parser.parse_args()
+
+    _, engine = run_cell(queueing_engine, NamedTuple=NamedTuple, np=np)
+    _, tables = run_cell(
+        erlang_tables, np=np, mo=mo, QueueMetrics=engine["QueueMetrics"], ggs_metrics=engine["ggs_metrics"]
+    )
+    table = build_table(engine["erlang_c"], args.s_max, args.n_rho)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    np.save(args.output, table)
+
+    dc, dlq, dw = max_errors(table, engine["erlang_c"], tables["erlang_table_lookup"])
+    print(f"Wrote {args.output} ({args.output.stat().st_size / 1024:.0f} KiB, shape {table.shape})")
+    print(f"Max error: |ΔP(wait)| = {dc:.1e}, |ΔLq| / max(Lq, 1) = {dlq:.1e}, rel. W = {dw:.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Prebuild the Vega-Lite specs of the charts that do not depend on any input.
+
+Slide 2.8 (the M/M/1 nonlinearity chart) and the curve under slide 3.1's
+operating point are the same for every visitor. Building them here, with the
+notebook's own chart code, lets the WebAssembly build fetch a small JSON file
+instead of waiting for Altair, NumPy and Polars to install before showing them.
+
+Run from the repository root:
+
+    python -m scripts.build_static_charts
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+import marimo as mo
+
+from capacity import static_charts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", type=Path, default=Path("public/charts"))
+    args = parser.parse_args()
+
+    _, charts = static_charts.run(mo=mo)
+    args.output.mkdir(parents=True, exist_ok=True)
+    for name, build in charts["CHART_BUILDERS"].items():
+        path = args.output / f"{name}.vl.json"
+        path.write_text(json.dumps(build().to_dict(), ensure_ascii=False, separators=(",", ":")))
+        print(f"Wrote {path} ({path.stat().st_size / 1024:.1f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
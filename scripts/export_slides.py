@@ -0,0 +1,179 @@
+"""Export the slide deck as one static HTML page, re-rendering only the slides that changed.
+
+Every slide cell (one that calls sc.create_slide and ends with .render()) is keyed
+on a hash of its inputs: its own source, which holds the title, layout_type,
+page_number and content, the keys of the cells it reads from, and the files under
+public/ that it names. Since a cell's key includes its parents' keys, editing an
+upstream cell invalidates every slide built on it, and nothing else; the versions
+of marimo and the chart packages are part of every key. Rendered slides are
+stored as <key>.html in the cache directory; on the next export only the stale
+slide cells and their ancestors are run, through marimo's cell.run(), and
+everything else is read back from disk. The page inlines the app's stylesheet
+once; charts and formulas are drawn by vega-embed and KaTeX, while widgets (sliders, checkboxes and
+mo.ui.altair_chart charts) need the live notebook and are left out.
+
+Run from the repository root:
+
+    python -m scripts.export_slides                 # writes site/slides/index.html
+    python -m scripts.export_slides --force         # re-render every slide
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import time
+from importlib.metadata import version
+from pathlib import Path
+
+from scripts.notebook import Cell, load_cells, run_cell
+
+ROOT = Path(__file__).resolve().parent.parent
+STYLESHEET = ROOT / "d3.css"
+PUBLIC = ROOT / "public"
+# Definitions the export provides instead of running their cells, which read the
+# command line and query string of a live app: no profiling and no lazy slides
+PROVIDED = {
+    "CellProfiler": None,
+    "profiler": None,
+    "profiled": lambda key, title="": contextlib.nullcontext(),
+    "lazy_slides": False,
+}
+# Bumped whenever the fragment format changes, so old cache entries are not reused
+FORMAT = "1"
+# Packages whose upgrades can change a rendered slide (deploy.yml installs them unpinned)
+PACKAGES = ("marimo", "altair", "numpy", "polars")
+
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/katex@0.16/dist/katex.min.css">
+<script src="https://cdn.jsdelivr.net/npm/vega@6"></script>
+<script src="https://cdn.jsdelivr.net/npm/vega-lite@6"></script>
+<script src="https://cdn.jsdelivr.net/npm/vega-embed@7"></script>
+<script src="https://cdn.jsdelivr.net/npm/katex@0.16/dist/katex.min.js"></script>
+<style>
+body {{ margin: 0; padding: 24px; background: #f3f4f6; display: flex; flex-direction: column; align-items: center; gap: 24px; }}
+marimo-ui-element {{ display: none; }}
+{css}
+</style>
+</head>
+<body>
+{slides}
+<script>
+// Draw the outputs marimo's frontend would render: Vega-Lite charts and TeX
+for (const el of document.querySelectorAll("marimo-mime-renderer")) {{
+  const mime = JSON.parse(el.dataset.mime);
+  if (mime.includes("vegalite")) vegaEmbed(el, JSON.parse(JSON.parse(el.dataset.data)), {{actions: false}});
+}}
+for (const el of document.querySelectorAll("marimo-tex")) {{
+  const tex = el.textContent, display = tex.startsWith("||[");
+  katex.render(tex.slice(3, -3), el, {{displayMode: display, throwOnError: false}});
+}}
+</script>
+</body>
+</html>
+"""
+
+
+def _data_files(names: frozenset[str]) -> list[Path]:
+    """Files under public/ named by a cell: "arrivals.parquet", "public/images/x.png" or a bare stem ("frontier")."""
+    files = sorted(p for p in PUBLIC.rglob("*") if p.is_file()) if PUBLIC.exists() else []
+    return [p for p in files if p.name.split(".")[0] in names or any(p.name in n for n in names)]
+
+
+def cell_keys(cells: list[Cell]) -> list[str]:
+    """Content hash per cell over its source, its parents' keys and the data files it names."""
+    producer = {name: i for i, cell in enumerate(cells) for name in cell.defs}
+    versions = "\0".join(f"{pkg}={version(pkg)}" for pkg in PACKAGES)
+    keys: dict[int, str] = {}
+
+    def key(i: int) -> str:
+        if i not in keys:
+            digest = hashlib.sha256(f"{FORMAT}\0{versions}\0{cells[i].source}".encode())
+            for ref in sorted(cells[i].refs):
+                digest.update(f"\0{ref}={key(producer[ref]) if ref in producer else ''}".encode())
+            for path in _data_files(cells[i].names):
+                digest.update(f"\0{path.relative_to(ROOT)}=".encode() + hashlib.sha256(path.read_bytes()).digest())
+            keys[i] = digest.hexdigest()
+        return keys[i]
+
+    return [key(i) for i in range(len(cells))]
+
+
+def render_slides(cells: list[Cell], wanted: list[int]) -> dict[int, str | None]:
+    """Run the wanted slide cells and their ancestors; HTML per slide (None if the cell stopped itself)."""
+    import capacity
+
+    producer = {name: i for i, cell in enumerate(cells) for name in cell.defs}
+    needed, stack = set(), list(wanted)
+    while stack:
+        i = stack.pop()
+        if i not in needed:
+            needed.add(i)
+            stack.extend(producer[r] for r in cells[i].refs if r in producer and r not in PROVIDED)
+    ns, done, html = dict(PROVIDED), set(), {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        while len(done) < len(needed):
+            # Topological order, ties broken by file order (as marimo does); cells below a
+            # stopped cell never get their inputs and are skipped, as in marimo
+            i = next((i for i in sorted(needed - done) if all(r in ns for r in cells[i].refs)), None)
+            if i is None:
+                break
+            output, defs = run_cell(getattr(capacity, cells[i].name), **{r: ns[r] for r in cells[i].refs})
+            ns.update(defs)
+            if cells[i].slide:
+                html[i] = getattr(output, "text", None)
+            done.add(i)
+    return {i: html.get(i) for i in wanted}
+
+
+def update_cache(cache: Path, force: bool = False) -> tuple[list[Path], list[str]]:
+    """Render the stale slides into `cache`; return (fragment file per slide in deck order, labels rendered)."""
+    cells = load_cells()
+    keys = cell_keys(cells)
+    slides = [i for i, cell in enumerate(cells) if cell.slide]
+    cache.mkdir(parents=True, exist_ok=True)
+    stale = [i for i in slides if force or not (cache / f"{keys[i]}.html").exists()]
+    for i, html in (render_slides(cells, stale) if stale else {}).items():
+        # A stopped cell (e.g. the diagnostics slide without --profile) is cached as empty
+        (cache / f"{keys[i]}.html").write_text(html or "")
+    current = {f"{keys[i]}.html" for i in slides}
+    for old in cache.glob("*.html"):
+        if old.name not in current:
+            old.unlink()
+    return [cache / f"{keys[i]}.html" for i in slides], [cells[i].label for i in stale]
+
+
+def page(fragments: list[str], title: str = "Capacity Management") -> str:
+    """A standalone HTML page showing the given slide fragments one below the other."""
+    return PAGE.format(title=title, css=STYLESHEET.read_text(), slides="\n".join(f for f in fragments if f))
+
+
+def export(output: Path, cache: Path, force: bool = False) -> tuple[list[str], int]:
+    """Write the deck to `output`; return (labels of the slides rendered, slides read from the cache)."""
+    fragments, rendered = update_cache(cache, force)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(page([path.read_text() for path in fragments]))
+    return rendered, len(fragments) - len(rendered)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", type=Path, default=Path("site/slides/index.html"))
+    parser.add_argument("--cache", type=Path, default=Path(".slide_cache"), help="directory of rendered slides")
+    parser.add_argument("--force", action="store_true", help="ignore the cache and re-render every slide")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    rendered, reused = export(args.output, args.cache, args.force)
+    print(f"Wrote {args.output}: {len(rendered)} slide(s) rendered, {reused} from cache "
+          f"in {time.perf_counter() - started:.1f} s")
+    for label in rendered:
+        print(f"  {label}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Helpers shared by the scripts: the notebook's cells as parsed from its source, and running one cell.
+
+load_cells reads capacity.py without importing it, so cache keys and labels cost
+no notebook run; run_cell executes a named cell through marimo's cell.run().
+"""
+
+import ast
+import asyncio
+import inspect
+from pathlib import Path
+from typing import NamedTuple
+
+NOTEBOOK = Path(__file__).resolve().parent.parent / "capacity.py"
+
+
+class Cell(NamedTuple):
+    name: str  # function name, the attribute of the capacity module holding the cell
+    label: str  # first comment line, e.g. "Slide 2.8 — The nonlinearity insight"
+    refs: tuple[str, ...]
+    defs: tuple[str, ...]
+    source: str
+    code: object  # body without the return, to re-execute on known definitions
+    slide: bool  # creates a slide and ends with its .render()
+    names: frozenset[str]  # string constants, to find the data files a cell reads
+
+
+def load_cells(path: Path = NOTEBOOK) -> list[Cell]:
+    """Every @app.cell of the notebook, in file order."""
+    source = path.read_text()
+    lines = source.splitlines(keepends=True)
+    cells = []
+    for node in ast.parse(source).body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) or not any(
+            "app.cell" in ast.unparse(d) for d in node.decorator_list
+        ):
+            continue
+        body = [stmt for stmt in node.body if not isinstance(stmt, ast.Return)]
+        last = body[-1] if body else None
+        returned = next((stmt.value for stmt in node.body if isinstance(stmt, ast.Return)), None)
+        defs = tuple(ast.unparse(e) for e in returned.elts) if isinstance(returned, ast.Tuple) else ()
+        # Cells are top-level functions: whole lines (ast.get_source_segment re-splits the file per call)
+        segment = "".join(lines[node.lineno - 1 : node.end_lineno]).rstrip("\n")
+        cells.append(Cell(
+            name=node.name,
+            label=next((line.strip()[2:] for line in segment.splitlines() if line.strip().startswith("# ")), ""),
+            refs=tuple(arg.arg for arg in node.args.args),
+            defs=defs,
+            source=segment,
+            code=compile(
+                ast.Module(body=body, type_ignores=[]), str(path), "exec", flags=ast.PyCF_ALLOW_TOP_LEVEL_AWAIT
+            ),
+            slide=(".create_slide(" in segment or ".create_title_slide(" in segment)
+            and isinstance(last, ast.Expr) and ast.unparse(last.value).endswith(".render()"),
+            names=frozenset(n.value for n in ast.walk(node) if isinstance(n, ast.Constant) and isinstance(n.value, str)),
+        ))
+    return cells
+
+
+def run_cell(cell, **refs) -> tuple:
+    """(output, definitions) of a notebook cell; cells below the async package-loading cell return a coroutine."""
+    result = cell.run(**refs)
+    return asyncio.run(result) if inspect.isawaitable(result) else result
@@ -0,0 +1,125 @@
+"""Write every slide as its own static HTML page, and optionally as a PNG, across worker processes.
+
+The notebook is evaluated once, through the slide cache of scripts/export_slides.py
+(so the notebook is not even run when no slide changed), and each slide becomes
+`<output>/slide-<n>.html`. With --png, the pages are rasterized to `slide-<n>.png`
+by worker processes that each keep one headless Chromium (Playwright) open.
+Workers receive file paths and write their results to disk, so memory stays at
+one browser page per worker however long the deck is, and each worker is
+replaced after --recycle slides to bound what a long-lived browser accumulates.
+
+Throughput target: a deck of several hundred slides in well under a minute, i.e.
+at least 200 slides/s for HTML and 2 slides/s per worker for PNG. The measured
+rate is printed, and --target makes the command exit with status 1 below it
+(per worker with --png, as the PNG target is stated).
+
+Run from the repository root:
+
+    python -m scripts.render_slides                      # site/slides/slide-*.html
+    python -m scripts.render_slides --png --workers 4    # plus slide-*.png (needs Playwright)
+
+PNG output needs `pip install playwright && playwright install chromium`. Charts
+and formulas are drawn from the jsDelivr CDN, so rasterizing needs network access.
+"""
+
+import argparse
+import functools
+import multiprocessing
+import multiprocessing.util
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from scripts.export_slides import page, update_cache
+
+VIEWPORT = {"width": 1280 + 2 * 24, "height": 720 + 2 * 24}  # slide plus the page's padding
+
+
+@functools.cache
+def _browser():
+    """One headless Chromium per worker process, started on its first slide and closed when the worker exits."""
+    from playwright.sync_api import sync_playwright
+
+    playwright = sync_playwright().start()
+    browser = playwright.chromium.launch()
+
+    def close():
+        browser.close()
+        playwright.stop()
+
+    # Workers are replaced after --recycle slides; finalizers run on every worker exit
+    multiprocessing.util.Finalize(None, close, exitpriority=10)
+    return browser
+
+
+def _rasterize(html: str) -> str:
+    tab = _browser().new_page(viewport=VIEWPORT)
+    try:
+        tab.goto(Path(html).resolve().as_uri(), wait_until="networkidle")
+        png = str(Path(html).with_suffix(".png"))
+        tab.locator(".slide").screenshot(path=png)
+    finally:
+        tab.close()
+    return png
+
+
+def render(fragments: list[Path], output: Path, png: bool = False, max_workers: int | None = None, recycle: int = 100) -> int:
+    """Write slide-<n>.html (and .png) for every non-empty fragment; return the slides written."""
+    output.mkdir(parents=True, exist_ok=True)
+    pages = []
+    for n, path in enumerate((p for p in fragments if p.stat().st_size), start=1):
+        # Writing HTML is cheap; only rasterizing is worth the worker processes
+        html = output / f"slide-{n:03d}.html"
+        html.write_text(page([path.read_text()], title=f"Slide {n}"))
+        pages.append(str(html))
+    if png:
+        # Playwright's driver threads do not survive fork(), so workers start fresh
+        with ProcessPoolExecutor(
+            max_workers, mp_context=multiprocessing.get_context("spawn"), max_tasks_per_child=recycle
+        ) as pool:
+            for _ in pool.map(_rasterize, pages):
+                pass
+    return len(pages)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", type=Path, default=Path("site/slides"))
+    parser.add_argument("--cache", type=Path, default=Path(".slide_cache"), help="directory of rendered slides")
+    parser.add_argument("--force", action="store_true", help="ignore the cache and re-run every slide cell")
+    parser.add_argument("--png", action="store_true", help="also rasterize every slide (needs Playwright)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--recycle", type=int, default=100, help="slides per worker before it is replaced")
+    parser.add_argument(
+        "--target", type=float, default=None, help="minimum slides/s (per worker with --png), else exit with status 1"
+    )
+    args = parser.parse_args()
+
+    if args.png:
+        try:
+            import playwright  # noqa: F401
+        except ImportError:
+            parser.error("--png needs Playwright: pip install playwright && playwright install chromium")
+
+    started = time.perf_counter()
+    fragments, rendered = update_cache(args.cache, args.force)
+    evaluated = time.perf_counter()
+    written = render(fragments, args.output, args.png, args.workers, args.recycle)
+    elapsed = time.perf_counter() - evaluated
+    rate = written / elapsed
+    print(f"Evaluated {len(rendered)} slide cell(s) in {evaluated - started:.1f} s, "
+          f"{len(fragments) - len(rendered)} from cache")
+    if args.png:
+        # The pool's default size; it never starts more workers than there are slides
+        workers = max(1, min(args.workers or os.process_cpu_count(), written))
+        rate /= workers
+    print(f"Wrote {written} slide(s){' with PNGs' if args.png else ''} to {args.output} in {elapsed:.1f} s "
+          f"({rate:.1f}/s{f' per worker, {workers} workers' if args.png else ''})")
+    if args.target is not None and rate < args.target:
+        print(f"Below the target of {args.target:g} slides/s{' per worker' if args.png else ''}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
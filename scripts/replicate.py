@@ -0,0 +1,146 @@
+"""Run independent simulation replications in parallel and report confidence intervals.
+
+Each replication draws from its own stream spawned from one master
+numpy SeedSequence, so results depend only on the master seed, not on the
+number of workers or the order in which they finish.
+
+Run from the repository root, e.g. M/G/1 at ρ = 0.9 with service CV 1.5:
+
+    python -m scripts.replicate --lam 9 --mu 10 --cv 1.5 --reps 48 --seed 2026
+"""
+
+import argparse
+import functools
+import heapq
+import math
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import NamedTuple
+
+import numpy as np
+
+from capacity import des_engine, lindley_engine, queueing_engine
+from scripts.notebook import run_cell
+
+METRICS = ("L", "Lq", "W", "Wq", "utilization")
+SIMULATORS = {"lindley": "simulate_lindley", "des": "simulate_queue"}
+
+
+@functools.cache
+def _engine() -> dict:
+    """Simulators and samplers from the notebook, built once per worker process."""
+    _, des = run_cell(des_engine, NamedTuple=NamedTuple, heapq=heapq, np=np)
+    _, lindley = run_cell(lindley_engine, np=np, SimResult=des["SimResult"])
+    return {**des, **lindley}
+
+
+def _replicate(simulator: str, interarrival: tuple, service: tuple, seed, kwargs: dict) -> tuple:
+    # Samplers travel as (factory name, args) because the notebook's closures cannot be pickled
+    engine = _engine()
+    result = engine[SIMULATORS[simulator]](
+        engine[interarrival[0]](*interarrival[1]), engine[service[0]](*service[1]), seed=seed, **kwargs
+    )
+    return tuple(getattr(result, m) for m in METRICS)
+
+
+def _t_cdf(t: float, df: int) -> float:
+    """Student-t CDF for integer df, from the finite series in cos θ, θ = atan(t / √df)."""
+    theta = math.atan(t / math.sqrt(df))
+    c2, term, total = math.cos(theta) ** 2, 1.0, 1.0
+    for k in range(2 if df % 2 else 1, df - 1, 2):
+        term *= c2 * k / (k + 1)
+        total += term
+    if df % 2:
+        inside = (2 / math.pi) * (theta + (math.sin(theta) * math.cos(theta) * total if df > 1 else 0))
+    else:
+        inside = math.sin(theta) * total
+    return (1 + inside) / 2  # inside = P(|T| < t), signed with t
+
+
+def t_quantile(p: float, df: int) -> float:
+    """Student-t quantile: closed form for df = 1 and 2, else Newton steps on the exact CDF.
+
+    The Cornish-Fisher expansion around the normal quantile is the starting point; on its
+    own it is too small for few replications (9.71 instead of 12.71 at df = 1, p = 0.975).
+    """
+    if df == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if df == 2:
+        return (2 * p - 1) / math.sqrt(2 * p * (1 - p))
+    z = statistics.NormalDist().inv_cdf(p)
+    t = (
+        z
+        + (z ** 3 + z) / (4 * df)
+        + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+        + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * df ** 3)
+    )
+    log_norm = math.lgamma((df + 1) / 2) - math.lgamma(df / 2) - 0.5 * math.log(df * math.pi)
+    for _ in range(50):
+        step = (_t_cdf(t, df) - p) / math.exp(log_norm - (df + 1) / 2 * math.log1p(t * t / df))
+        t -= step
+        if abs(step) <= 1e-12 * max(1.0, abs(t)):
+            break
+    return t
+
+
+def run_replications(
+    simulator: str,
+    interarrival: tuple,
+    service: tuple,
+    n_reps: int = 32,
+    seed: int = 0,
+    confidence: float = 0.95,
+    max_workers: int | None = None,
+    **kwargs,
+) -> dict[str, tuple[float, float, float]]:
+    """Run n_reps replications across processes; return {metric: (mean, ci_low, ci_high)}.
+
+    `interarrival` and `service` are sampler specs such as ("exponential", (9,)) or
+    ("gamma_cv", (0.1, 1.5)); extra keyword arguments go to the simulator.
+    """
+    if n_reps < 2:
+        raise ValueError("Need at least two replications for a confidence interval")
+    seeds = np.random.SeedSequence(seed).spawn(n_reps)
+    with ProcessPoolExecutor(max_workers) as pool:
+        runs = np.array(list(pool.map(_replicate, repeat(simulator), repeat(interarrival), repeat(service), seeds, repeat(kwargs))))
+    mean = runs.mean(axis=0)
+    half = t_quantile((1 + confidence) / 2, n_reps - 1) * runs.std(axis=0, ddof=1) / math.sqrt(n_reps)
+    return {m: (float(mean[i]), float(mean[i] - half[i]), float(mean[i] + half[i])) for i, m in enumerate(METRICS)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--simulator", choices=sorted(SIMULATORS), default="lindley")
+    parser.add_argument("--lam", type=float, required=True, help="arrival rate λ (Poisson arrivals)")
+    parser.add_argument("--mu", type=float, required=True, help="service rate μ per server")
+    parser.add_argument("--cv", type=float, default=1.0, help="service-time CV (gamma distributed)")
+    parser.add_argument("--servers", type=int, default=1, help="servers s (des simulator only)")
+    parser.add_argument("--customers", type=int, default=1_000_000, help="measured customers per replication")
+    parser.add_argument("--reps", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=0, help="master seed")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    args = parser.parse_args()
+
+    kwargs = {"n_customers": args.customers}
+    if args.simulator == "des":
+        kwargs["s"] = args.servers
+    elif args.servers != 1:
+        parser.error("the lindley simulator is single-server; use --simulator des for s > 1")
+    summary = run_replications(
+        args.simulator, ("exponential", (args.lam,)), ("gamma_cv", (1 / args.mu, args.cv)),
+        n_reps=args.reps, seed=args.seed, confidence=args.confidence, max_workers=args.workers, **kwargs,
+    )
+
+    _, engine = run_cell(queueing_engine, NamedTuple=NamedTuple, np=np)
+    formula = engine["ggs_metrics"](args.lam, args.mu, args.servers, args.cv)
+    reference = {"L": formula.L, "Lq": formula.Lq, "W": formula.W, "Wq": formula.Wq, "utilization": formula.rho}
+    print(f"{args.reps} replications, {args.confidence:.0%} confidence intervals")
+    print(f"{'metric':<12}{'mean':>12}{'ci low':>12}{'ci high':>12}{'formula':>12}")
+    for m, (mean, low, high) in summary.items():
+        print(f"{m:<12}{mean:>12.4f}{low:>12.4f}{high:>12.4f}{float(reference[m]):>12.4f}")
+
+
+if __name__ == "__main__":
+    main()
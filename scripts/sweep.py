@@ -0,0 +1,171 @@
+"""Evaluate a grid of queueing scenarios headlessly and write the results to Parquet.
+
+Every scenario (λ, μ, s, CV, pooling) goes through the notebook's G/G/s formulas:
+"pooled" is one queue served by s servers, "separate" is s single-server queues
+with λ/s each (L and Lq are summed over the queues). Scenarios are evaluated in
+vectorized batches on all cores, and each worker writes its results to
+`<output>/pooling=<...>/part-<batch>.parquet`. Grid workers rebuild their own rows
+from the batch bounds; a scenario file is read once in a streaming pass and its
+batches are handed out a few at a time. Either way memory stays at a few batches
+no matter how many scenarios there are.
+
+Run from the repository root, e.g. 10 million scenarios:
+
+    python -m scripts.sweep --lam 0.05:500:0.05 --mu 10 --servers 1:50 --cv 0:2.25:0.25 --pooling pooled,separate -o sweeps/grid
+
+Axes take comma-separated values or an inclusive start:stop[:step] range. A
+scenario file (CSV or Parquet with columns lam, mu, s and optionally cv, pooling)
+can replace the axes:
+
+    python -m scripts.sweep --scenarios whatif.csv -o sweeps/whatif
+
+Read the results back with `pl.scan_parquet("sweeps/grid/**/*.parquet", hive_partitioning=True)`.
+"""
+
+import argparse
+import functools
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import polars as pl
+
+from capacity import queueing_engine
+from scripts.notebook import run_cell
+
+AXES = ("lam", "mu", "s", "cv", "pooling")
+POOLING = ("pooled", "separate")
+
+
+@functools.cache
+def _engine() -> dict:
+    """Queueing formulas from the notebook, built once per worker process."""
+    _, engine = run_cell(queueing_engine, NamedTuple=NamedTuple, np=np)
+    return engine
+
+
+def parse_axis(text: str, dtype=float) -> np.ndarray:
+    """Parse "1,2,5" or an inclusive range "start:stop[:step]" (step defaults to 1)."""
+    if ":" not in text:
+        return np.array([dtype(v) for v in text.split(",")])
+    start, stop, *step = (float(v) for v in text.split(":"))
+    step = step[0] if step else 1.0
+    values = start + step * np.arange(int(np.floor((stop - start) / step + 1e-9)) + 1)
+    return values.astype(dtype)
+
+
+def evaluate(lam, mu, s, cv, pooled) -> dict[str, np.ndarray]:
+    """System-level metrics for arrays of scenarios (times in hours, as in the notebook)."""
+    queues = np.where(pooled, 1, s)
+    m = _engine()["ggs_metrics"](lam / queues, mu, np.where(pooled, s, 1), cv)
+    return {
+        "rho": m.rho, "p_wait": m.p_wait, "L": m.L * queues, "Lq": m.Lq * queues, "W": m.W, "Wq": m.Wq,
+    }
+
+
+def _grid_rows(axes: dict, start: int, stop: int) -> dict[str, np.ndarray]:
+    index = np.unravel_index(np.arange(start, stop), [len(axes[a]) for a in AXES])
+    return {a: axes[a][i] for a, i in zip(AXES, index)}
+
+
+def _file_batches(path: str, batch_size: int):
+    """Rows of a scenario file in batches of up to `batch_size`, from one streaming pass."""
+    scan = pl.scan_parquet(path) if path.endswith(".parquet") else pl.scan_csv(path)
+    columns = scan.collect_schema().names()
+    scan = scan.select(
+        pl.col("lam").cast(pl.Float64),
+        pl.col("mu").cast(pl.Float64),
+        pl.col("s").cast(pl.Int64),
+        pl.col("cv").cast(pl.Float64) if "cv" in columns else pl.lit(1.0).alias("cv"),
+        (
+            pl.col("pooling").replace_strict({p: i for i, p in enumerate(POOLING)}, return_dtype=pl.Int8)
+            if "pooling" in columns else pl.lit(0, pl.Int8).alias("pooling")
+        ),
+    )
+    for frame in scan.collect_batches(chunk_size=batch_size):
+        yield {a: frame[a].to_numpy() for a in AXES}
+
+
+def _write_batch(batch: int, rows: dict[str, np.ndarray], output: str) -> int:
+    metrics = evaluate(rows["lam"], rows["mu"], rows["s"], rows["cv"], rows["pooling"] == 0)
+    frame = pl.DataFrame({**{a: rows[a] for a in AXES if a != "pooling"}, **metrics})
+    for code, name in enumerate(POOLING):
+        part = frame.filter(pl.Series(rows["pooling"] == code))
+        if part.height:
+            folder = Path(output) / f"pooling={name}"
+            folder.mkdir(parents=True, exist_ok=True)
+            part.write_parquet(folder / f"part-{batch:05d}.parquet")
+    return len(rows["lam"])
+
+
+def _grid_batch(batch: int, axes: dict, start: int, stop: int, output: str) -> int:
+    return _write_batch(batch, _grid_rows(axes, start, stop), output)
+
+
+def run_sweep(source: tuple, output: Path, batch_size: int = 1_000_000, max_workers: int | None = None) -> int:
+    """Evaluate every row of a ("grid", axes) or ("file", path) source; return the rows written."""
+    kind, spec = source
+    workers = max_workers or os.cpu_count()
+    # Polars' thread pool does not survive fork(), so workers start fresh
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        if kind == "grid":
+            n_rows = int(np.prod([len(v) for v in spec.values()]))
+            jobs = (
+                pool.submit(_grid_batch, b, spec, lo, min(lo + batch_size, n_rows), str(output))
+                for b, lo in enumerate(range(0, n_rows, batch_size))
+            )
+        else:
+            jobs = (
+                pool.submit(_write_batch, b, rows, str(output))
+                for b, rows in enumerate(_file_batches(spec, batch_size))
+            )
+        # Submitting lazily keeps at most two batches per worker in flight
+        pending, written = deque(), 0
+        for job in jobs:
+            pending.append(job)
+            if len(pending) > 2 * workers:
+                written += pending.popleft().result()
+        return written + sum(f.result() for f in pending)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lam", default="9", help="arrival rates λ per hour")
+    parser.add_argument("--mu", default="10", help="service rates μ per server and hour")
+    parser.add_argument("--servers", default="1", help="servers s")
+    parser.add_argument("--cv", default="1", help="service-time CVs (arrivals are Poisson)")
+    parser.add_argument("--pooling", default="pooled", help="comma-separated subset of pooled,separate")
+    parser.add_argument("--scenarios", type=Path, help="CSV/Parquet scenario file instead of the axes")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="output directory (must be empty)")
+    parser.add_argument("--batch-size", type=int, default=1_000_000, help="scenarios per vectorized batch")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    if args.output.exists() and any(args.output.iterdir()):
+        parser.error(f"{args.output} is not empty")
+    if args.scenarios:
+        source = ("file", str(args.scenarios))
+    else:
+        pooling = args.pooling.split(",")
+        if not set(pooling) <= set(POOLING):
+            parser.error(f"--pooling takes values from {','.join(POOLING)}")
+        axes = {
+            "lam": parse_axis(args.lam), "mu": parse_axis(args.mu), "s": parse_axis(args.servers, int),
+            "cv": parse_axis(args.cv), "pooling": np.array([POOLING.index(p) for p in pooling], dtype=np.int8),
+        }
+        source = ("grid", axes)
+
+    started = time.perf_counter()
+    written = run_sweep(source, args.output, args.batch_size, args.workers)
+    elapsed = time.perf_counter() - started
+    print(f"Wrote {written:,} scenarios to {args.output} in {elapsed:.1f} s "
+          f"({written / elapsed:,.0f}/s on {args.workers or os.cpu_count()} workers)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""Notebook cells run once per test session on the definitions they need."""
+
+import heapq
+from typing import NamedTuple
+
+import numpy as np
+import pytest
+
+from capacity import queueing_engine
+from scripts.notebook import run_cell
+
+
+@pytest.fixture(scope="session")
+def engine() -> dict:
+    """Definitions of the queueing engine cell: erlang_b, erlang_c, mms_metrics, ..."""
+    _, defs = run_cell(queueing_engine, NamedTuple=NamedTuple, np=np)
+    return defs
+
+
+@pytest.fixture(scope="session")
+def imports() -> dict:
+    """What the notebook's imports and chart packages cells provide to the engine cells."""
+    return {"NamedTuple": NamedTuple, "heapq": heapq, "np": np}
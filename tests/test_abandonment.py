@@ -0,0 +1,63 @@
+"""Erlang-A metrics against the stationary distribution of a truncated birth-death chain."""
+
+import math
+
+import numpy as np
+import pytest
+
+from capacity import abandonment_engine
+from scripts.notebook import run_cell
+
+
+@pytest.fixture(scope="module")
+def erlang_a_metrics(engine, imports):
+    refs = {name: engine[name] for name in ("erlang_b", "log_incomplete_gamma", "mms_metrics")}
+    _, defs = run_cell(abandonment_engine, NamedTuple=imports["NamedTuple"], np=imports["np"], **refs)
+    return defs["erlang_a_metrics"]
+
+
+def chain_metrics(lam, mu, s, theta):
+    """(P(wait), P(abandon), Wq) of M/M/s+M from its birth-death chain, cut where states stop mattering.
+
+    In state n customers leave at rate min(n, s)·μ + (n - s)⁺·θ; arrivals see the
+    stationary distribution (PASTA) and abandonments happen at rate θ per waiting customer.
+    """
+    log_p, n = [0.0], 0
+    while n < s or log_p[-1] > log_p[s] - 60:
+        n += 1
+        log_p.append(log_p[-1] + math.log(lam / (min(n, s) * mu + max(n - s, 0) * theta)))
+    log_p = np.array(log_p)
+    p = np.exp(log_p - log_p.max())
+    p /= p.sum()
+    waiting = np.maximum(np.arange(p.size) - s, 0)
+    Lq = p @ waiting
+    return p[s:].sum(), theta * Lq / lam, Lq / lam
+
+
+@pytest.mark.parametrize("theta", [0.5, 4.0, 30.0])
+@pytest.mark.parametrize("rho", [0.3, 0.95, 1.0, 1.4, 3.0])
+@pytest.mark.parametrize("s", [1, 4, 20, 80])
+def test_erlang_a_matches_birth_death_chain(erlang_a_metrics, s, rho, theta):
+    mu = 12.0
+    lam = rho * s * mu
+    p_wait, p_abandon, Wq = chain_metrics(lam, mu, s, theta)
+    m = erlang_a_metrics(lam, mu, s, theta)
+    assert m.p_wait == pytest.approx(p_wait, rel=1e-8)
+    assert m.p_abandon == pytest.approx(p_abandon, rel=1e-8, abs=1e-15)
+    assert m.Wq == pytest.approx(Wq, rel=1e-8, abs=1e-15)
+    assert m.Lq == pytest.approx(lam * Wq, rel=1e-8, abs=1e-15)
+    assert m.throughput == pytest.approx(lam * (1 - p_abandon), rel=1e-8)
+
+
+def test_erlang_a_batch_and_patient_limit(erlang_a_metrics, engine):
+    s = np.array([1, 4, 20, 80, 5, 5])
+    lam = np.array([6.0, 40.0, 200.0, 1500.0, 30.0, 0.0])
+    theta = np.array([0.5, 4.0, 30.0, 4.0, 0.0, 2.0])
+    m = erlang_a_metrics(lam, 12.0, s, theta)
+    for i in range(4):
+        p_wait, p_abandon, Wq = chain_metrics(lam[i], 12.0, s[i], theta[i])
+        assert (m.p_wait[i], m.p_abandon[i], m.Wq[i]) == pytest.approx((p_wait, p_abandon, Wq), rel=1e-8)
+    # θ = 0 is M/M/s, and λ = 0 never waits
+    mms = engine["mms_metrics"](30.0, 12.0, 5)
+    assert (m.p_wait[4], m.p_abandon[4], m.Wq[4]) == pytest.approx((mms.p_wait, 0.0, mms.Wq))
+    assert (m.p_wait[5], m.p_abandon[5], m.Wq[5]) == (0.0, 0.0, 0.0)
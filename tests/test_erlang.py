@@ -0,0 +1,61 @@
+"""Erlang-B and Erlang-C against their defining sums, on both sides of the switch to the closed form."""
+
+import math
+
+import numpy as np
+import pytest
+
+SERVERS = (1, 2, 10, 63, 64, 65, 100, 250)  # erlang_b recurses up to s = 64, then uses Γ(s + 1, a)
+LOADS = (0.1, 0.8, 0.99, 1.5)
+
+
+def log_terms(s: int, a: float) -> list[float]:
+    """log(a^k / k!) for k = 0..s."""
+    return [k * math.log(a) - math.lgamma(k + 1) for k in range(s + 1)]
+
+
+def erlang_b_sum(s: int, a: float) -> float:
+    """B(s, a) = (a^s / s!) / Σ_k a^k / k!"""
+    logs = log_terms(s, a)
+    top = max(logs)
+    return math.exp(logs[-1] - top) / math.fsum(math.exp(x - top) for x in logs)
+
+
+def erlang_c_sum(s: int, a: float) -> float:
+    """C(s, a) = (a^s / s!) · s/(s - a) / (Σ_{k<s} a^k / k! + (a^s / s!) · s/(s - a))"""
+    logs = log_terms(s, a)
+    top = max(logs)
+    waiting = math.exp(logs[-1] - top) * s / (s - a)
+    return waiting / (math.fsum(math.exp(x - top) for x in logs[:-1]) + waiting)
+
+
+@pytest.mark.parametrize("rho", LOADS)
+@pytest.mark.parametrize("s", SERVERS)
+def test_erlang_b_matches_sum(engine, s, rho):
+    assert engine["erlang_b"](s, s * rho) == pytest.approx(erlang_b_sum(s, s * rho), rel=1e-9)
+
+
+def test_recursion_and_closed_form_agree(engine):
+    s, rho = np.meshgrid(np.arange(1, 200), np.linspace(0.05, 2, 40))
+    a = s * rho
+    recursion = engine["erlang_b"](s, a, recursion_max_s=10**6)
+    closed = engine["erlang_b"](s, a, recursion_max_s=0)
+    np.testing.assert_allclose(closed, recursion, rtol=1e-9)
+
+
+def test_erlang_b_batch_mixes_both_methods(engine):
+    s = np.array(SERVERS * len(LOADS))
+    a = s * np.repeat(LOADS, len(SERVERS))
+    expected = [erlang_b_sum(int(k), float(x)) for k, x in zip(s, a)]
+    np.testing.assert_allclose(engine["erlang_b"](s, a), expected, rtol=1e-9)
+    np.testing.assert_array_equal(engine["erlang_b"](np.array([5, 500]), 0.0), [0.0, 0.0])
+
+
+@pytest.mark.parametrize("rho", (0.1, 0.8, 0.99))
+@pytest.mark.parametrize("s", SERVERS)
+def test_erlang_c_matches_sum(engine, s, rho):
+    assert engine["erlang_c"](s, rho) == pytest.approx(erlang_c_sum(s, s * rho), rel=1e-9)
+
+
+def test_erlang_c_is_one_when_unstable(engine):
+    np.testing.assert_array_equal(engine["erlang_c"]([1, 10, 100], [1.0, 1.2, 3.0]), 1.0)
@@ -0,0 +1,30 @@
+"""Student-t quantiles of the replication runner against printed t tables."""
+
+import pytest
+
+from scripts.replicate import t_quantile
+
+# (p, df, quantile) to four decimals, as printed in standard t tables
+TABLE = [
+    (0.975, 1, 12.7062),
+    (0.975, 2, 4.3027),
+    (0.975, 3, 3.1824),
+    (0.975, 4, 2.7764),
+    (0.975, 9, 2.2622),
+    (0.975, 29, 2.0452),
+    (0.975, 100, 1.9840),
+    (0.95, 6, 1.9432),
+    (0.995, 10, 3.1693),
+    (0.9995, 5, 6.8688),
+    (0.9995, 1000, 3.3003),
+]
+
+
+@pytest.mark.parametrize(("p", "df", "expected"), TABLE)
+def test_t_quantile_matches_table(p, df, expected):
+    assert t_quantile(p, df) == pytest.approx(expected, abs=5e-5)
+
+
+@pytest.mark.parametrize(("p", "df", "expected"), TABLE)
+def test_t_quantile_is_symmetric(p, df, expected):
+    assert t_quantile(1 - p, df) == pytest.approx(-t_quantile(p, df), rel=1e-9)
@@ -0,0 +1,85 @@
+"""Staffing solver and shift planner against brute force."""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from capacity import shift_planner, staffing_solver
+from scripts.notebook import run_cell
+
+SHIFTS = [(0, 3), (1, 3), (2, 4), (3, 3), (0, 6), (4, 2)]  # (first_block, n_blocks) over 6 blocks
+
+
+@pytest.fixture(scope="module")
+def min_staff(engine, imports):
+    _, defs = run_cell(staffing_solver, mms_metrics=engine["mms_metrics"], np=imports["np"])
+    return defs["min_staff"]
+
+
+@pytest.fixture(scope="module")
+def plan_shifts(imports):
+    _, defs = run_cell(shift_planner, **imports)
+    return defs["plan_shifts"]
+
+
+def brute_min_staff(mms_metrics, lam, mu, max_wq=None, max_wait_prob=None, wait_time=0.0, max_rho=1.0):
+    """First s = 1, 2, ... that meets every target."""
+    s = 1
+    while True:
+        m = mms_metrics(lam, mu, s)
+        ok = m.rho < max_rho
+        if max_wq is not None:
+            ok &= m.Wq <= max_wq
+        if max_wait_prob is not None:
+            ok &= m.p_wait * np.exp(-(s * mu - lam) * wait_time) <= max_wait_prob
+        if ok:
+            return s
+        s += 1
+
+
+@pytest.mark.parametrize("targets", [
+    {},
+    {"max_rho": 0.85},
+    {"max_wq": 0.01},
+    {"max_wait_prob": 0.2, "wait_time": 1 / 60},
+    {"max_wq": 0.005, "max_wait_prob": 0.1, "wait_time": 0.01, "max_rho": 0.9},
+])
+def test_min_staff_matches_brute_force(engine, min_staff, targets):
+    lam = np.concatenate([[0.0, 0.3, 10.0, 40.0], np.random.default_rng(0).uniform(1, 600, 30)])
+    expected = [brute_min_staff(engine["mms_metrics"], x, 12.0, **targets) for x in lam]
+    np.testing.assert_array_equal(min_staff(lam, 12.0, **targets), expected)
+
+
+def test_min_staff_rejects_impossible_targets(min_staff):
+    for targets in ({"max_wq": 0}, {"max_wait_prob": 0}, {"max_rho": 1.5}):
+        with pytest.raises(ValueError):
+            min_staff(10.0, 12.0, **targets)
+
+
+def brute_plan_cost(required, block_cost, shift_cost):
+    """Cheapest cover found by trying every count from 0 to max(required) for every shift."""
+    covers = np.zeros((len(SHIFTS), required.size), dtype=np.int64)
+    for i, (start, length) in enumerate(SHIFTS):
+        covers[i, start : start + length] = 1
+    costs = covers @ block_cost + shift_cost
+    counts = np.array(list(itertools.product(range(required.max() + 1), repeat=len(SHIFTS))))
+    feasible = (counts @ covers >= required).all(axis=1)
+    return (counts[feasible] @ costs).min()
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_plan_shifts_matches_brute_force(plan_shifts, seed):
+    rng = np.random.default_rng(seed)
+    required = rng.integers(0, 4, 6)
+    block_cost = rng.uniform(1, 3, 6)
+    shift_cost = float(rng.choice([0.0, 0.5, 4.0]))
+    plan = plan_shifts(required, SHIFTS, block_cost, shift_cost)
+    assert plan.cost == pytest.approx(brute_plan_cost(required, block_cost, shift_cost))
+    assert (plan.coverage >= required).all()
+    assert (plan.counts >= 0).all()
+
+
+def test_plan_shifts_rejects_uncovered_blocks(plan_shifts):
+    with pytest.raises(ValueError, match="no shift covers"):
+        plan_shifts([1, 1, 1], [(0, 1), (2, 1)])